@@ -0,0 +1,184 @@
+"""
+Vectorized anomaly detection cho EDA.
+
+Hai lớp detector, đều chạy theo chunk (row groups) song song theo file:
+    - Univariate: robust z-score |x - median| / (IQR / 1.349) > ``ROBUST_Z_THRESHOLD``;
+      median/IQR lấy từ KLL sketch của profile nên không cần thêm pass để fit. Columns
+      dương và lệch phải (e.g. price, lognormal trộn theo category) được score trên
+      log1p(x) - quantiles của log1p(x) chính là log1p của quantiles nên không cần sketch
+      riêng. Columns dẫn xuất tuyến tính (``*_normalized``, ``*_encoded``) không được
+      flag riêng vì chỉ đếm lại outliers của column gốc.
+    - Multivariate: IsolationForest fit trên reservoir sample của profile (đã chuẩn hóa
+      robust), sau đó score từng chunk. Chi phí fit cố định, chi phí score tuyến tính
+      theo số rows và chia đều cho các threads.
+
+scikit-learn chỉ được import khi fit IsolationForest (chiếm phần lớn import time của
+component), nên chạy với ANOMALY_MULTIVARIATE=false không phải trả chi phí đó.
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .correlation import batch_matrix
+from .stats_engine import DatasetProfile, scan_fragments
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest
+
+ROBUST_Z_THRESHOLD = 3.5
+# Anomaly score s(x) của Liu et al.: ~0.5 là bình thường, gần 1 là bất thường rõ ràng.
+# Dùng ngưỡng tuyệt đối thay cho contamination cố định để outlier_rate phản ánh data thật.
+ISOLATION_SCORE_THRESHOLD = 0.7
+IQR_TO_SIGMA = 1.349
+# Tail skewness (P99 + P1 - 2 * median) / (P99 - P1) trên ngưỡng này -> score trên log1p(x)
+# (nếu log1p làm distribution đối xứng hơn). Quartile skewness không thấy được độ lệch của
+# price trộn nhiều categories (nằm ở tail), còn moments bị kéo bởi chính các outliers.
+LOG_SKEW_THRESHOLD = 0.25
+DERIVED_SUFFIXES = ("_normalized", "_encoded")
+
+
+def _tail_skewness(tails: np.ndarray) -> np.ndarray:
+    """(P99 + P1 - 2 * median) / (P99 - P1) theo từng row; 0 khi range = 0."""
+    spread = tails[:, 2] - tails[:, 0]
+    skew = tails[:, 2] + tails[:, 0] - 2 * tails[:, 1]
+    return np.divide(skew, spread, out=np.zeros_like(skew), where=spread > 0)
+
+
+class RobustScaler:
+    """
+    Median/IQR scaling lấy từ quantile sketches của profile.
+
+    Columns có min > 0 và lệch phải (tail skewness > ``LOG_SKEW_THRESHOLD`` và giảm sau
+    log1p) được scale trên log1p(x).
+    """
+
+    def __init__(self, profile: DatasetProfile, columns: Sequence[str]):
+        self.columns = list(columns)
+        # P1, Q1, median, Q3, P99
+        quantiles = np.array([
+            profile.columns[c].quantiles.quantile([0.01, 0.25, 0.5, 0.75, 0.99])
+            for c in self.columns
+        ]).reshape(len(self.columns), 5)
+        positive = np.array([profile.columns[c].moments.min > 0 for c in self.columns], dtype=bool)
+        tails = quantiles[:, [0, 2, 4]]
+        skew = _tail_skewness(tails)
+        log_skew = _tail_skewness(np.log1p(np.where(positive[:, None], tails, 0.0)))
+        self.log = positive & (skew > LOG_SKEW_THRESHOLD) & (np.abs(log_skew) < skew)
+        quantiles[self.log] = np.log1p(quantiles[self.log])
+        self.median = quantiles[:, 2]
+        self.scale = (quantiles[:, 3] - quantiles[:, 1]) / IQR_TO_SIGMA
+        # Columns gần như hằng (IQR = 0) không có robust scale -> bỏ qua univariate check
+        self.active = self.scale > 0
+        self.univariate = self.active & np.array(
+            [not c.endswith(DERIVED_SUFFIXES) for c in self.columns], dtype=bool
+        )
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        if self.log.any():
+            matrix = matrix.copy()
+            # Giá trị âm (ngoài range của profile) được score như 0 -> vẫn bị flag
+            matrix[:, self.log] = np.log1p(np.maximum(matrix[:, self.log], 0.0))
+        scale = np.where(self.active, self.scale, 1.0)
+        return (matrix - self.median) / scale
+
+
+class AnomalyCounts:
+    """Mergeable counters kết quả detect trên một shard."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.rows = 0
+        self.outlier_rows = 0
+        self.multivariate = 0
+        self.per_feature = dict.fromkeys(columns, 0)
+
+    def merge(self, other: "AnomalyCounts") -> "AnomalyCounts":
+        self.rows += other.rows
+        self.outlier_rows += other.outlier_rows
+        self.multivariate += other.multivariate
+        for name, count in other.per_feature.items():
+            self.per_feature[name] += count
+        return self
+
+
+def fit_isolation_forest(
+    sample: np.ndarray, scaler: RobustScaler, seed: int = 0
+) -> Optional["IsolationForest"]:
+    """Fit IsolationForest trên reservoir sample (rows có NaN bị loại)."""
+    sample = sample[~np.isnan(sample).any(axis=1)]
+    if sample.shape[0] < 256:
+        return None
+    from sklearn.ensemble import IsolationForest
+
+    model = IsolationForest(n_estimators=100, max_samples=256, random_state=seed, n_jobs=1)
+    return model.fit(scaler.transform(sample))
+
+
+def detect_dataset_anomalies(
+    dataset: ds.Dataset,
+    profile: DatasetProfile,
+    filter_expr: Optional[ds.Expression] = None,
+    max_workers: Optional[int] = None,
+    multivariate: bool = True,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Detect outliers trên toàn bộ dataset (một pass chỉ đọc numeric columns).
+
+    Args:
+        dataset: Arrow dataset
+        profile: Profile từ pass thống kê (quantiles + reservoir sample)
+        filter_expr: Filter pushdown
+        max_workers: Số threads
+        multivariate: Bật IsolationForest
+        seed: Random seed
+
+    Returns:
+        Dict counters: rows, outlier_rows, multivariate, per_feature (chỉ columns được
+        flag univariate), log_scaled (columns score trên log1p)
+    """
+    columns = list(profile.numeric)
+    scaler = RobustScaler(profile, columns)
+    model = None
+    if multivariate and profile.sample is not None:
+        model = fit_isolation_forest(profile.sample.rows, scaler, seed)
+
+    def detect_fragment(index: int, batches: Iterator[pa.RecordBatch]) -> AnomalyCounts:
+        counts = AnomalyCounts(columns)
+        for batch in batches:
+            matrix = batch_matrix(batch, columns)
+            scaled = scaler.transform(matrix)
+            with np.errstate(invalid="ignore"):
+                flags = (np.abs(scaled) > ROBUST_Z_THRESHOLD) & scaler.univariate
+            per_column = flags.sum(axis=0)
+            outliers = flags.any(axis=1)
+
+            if model is not None:
+                complete = ~np.isnan(matrix).any(axis=1)
+                unusual = np.zeros(batch.num_rows, dtype=bool)
+                if complete.any():
+                    scores = -model.score_samples(scaled[complete])
+                    unusual[complete] = scores > ISOLATION_SCORE_THRESHOLD
+                counts.multivariate += int(unusual.sum())
+                outliers |= unusual
+
+            counts.rows += batch.num_rows
+            counts.outlier_rows += int(outliers.sum())
+            for name, count in zip(columns, per_column.tolist()):
+                counts.per_feature[name] += count
+        return counts
+
+    result = AnomalyCounts(columns)
+    for counts in scan_fragments(dataset, columns, detect_fragment, filter_expr, max_workers):
+        result.merge(counts)
+    return {
+        "rows": result.rows,
+        "outlier_rows": result.outlier_rows,
+        "multivariate": result.multivariate,
+        "per_feature": {
+            name: result.per_feature[name]
+            for name, flagged in zip(columns, scaler.univariate) if flagged
+        },
+        "log_scaled": [name for name, log in zip(columns, scaler.log) if log],
+    }
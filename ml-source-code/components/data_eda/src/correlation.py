@@ -0,0 +1,170 @@
+"""
+Blocked correlation và multicollinearity analysis.
+
+Thay vì ``DataFrame.corr()`` trên toàn bộ data, mỗi row group được tóm tắt thành
+(count, mean vector, co-moment matrix) float64 bằng một matmul ``D.T @ D``; các block
+được merge theo công thức Chan et al. nên memory chỉ là O(p^2) bất kể số rows.
+
+Mode sampled dùng ``ReservoirSample`` (random-key reservoir, mergeable giữa các file)
+và tính cùng accumulators trên sample. VIF = diag(R^-1) tính từ correlation matrix.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+HIGH_CORRELATION_THRESHOLD = 0.7
+REDUNDANT_CORRELATION_THRESHOLD = 0.95
+VIF_THRESHOLD = 10.0
+VIF_RIDGE = 1e-9
+
+
+def batch_matrix(batch: pa.RecordBatch, columns: Sequence[str]) -> np.ndarray:
+    """RecordBatch -> float64 matrix (rows x columns), null -> NaN."""
+    matrix = np.empty((batch.num_rows, len(columns)), dtype=np.float64)
+    for j, name in enumerate(columns):
+        matrix[:, j] = batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+    return matrix
+
+
+class CorrelationAccumulator:
+    """Mergeable (count, mean, co-moment) accumulator cho p columns."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(p, dtype=np.float64)
+        self.comoment = np.zeros((p, p), dtype=np.float64)
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        self.update_matrix(batch_matrix(batch, self.columns))
+
+    def update_matrix(self, matrix: np.ndarray) -> None:
+        matrix = matrix[~np.isnan(matrix).any(axis=1)]
+        if matrix.shape[0] == 0:
+            return
+        block = CorrelationAccumulator(self.columns)
+        block.count = matrix.shape[0]
+        block.mean = matrix.mean(axis=0)
+        centered = matrix - block.mean
+        block.comoment = centered.T @ centered
+        self.merge(block)
+
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + np.outer(delta, delta) * (self.count * other.count / total)
+        self.mean += delta * (other.count / total)
+        self.count = total
+        return self
+
+    def correlation(self) -> np.ndarray:
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        corr[~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1.0, 1.0)
+
+    def vif(self) -> np.ndarray:
+        """
+        Variance inflation factors; constant columns bị loại (VIF = NaN).
+
+        Ridge nhỏ trên diagonal giữ inverse ổn định: columns collinear hoàn toàn
+        (e.g. price vs price_normalized) nhận VIF rất lớn thay vì lỗi singular matrix.
+        """
+        vif = np.full(len(self.columns), np.nan)
+        varying = np.flatnonzero(np.diag(self.comoment) > 0)
+        if varying.size < 2:
+            vif[varying] = 1.0
+            return vif
+        corr = self.correlation()[np.ix_(varying, varying)]
+        vif[varying] = np.diag(np.linalg.inv(corr + VIF_RIDGE * np.eye(varying.size)))
+        return vif
+
+
+class ReservoirSample:
+    """
+    Uniform row sample kích thước cố định (random-key reservoir).
+
+    Mỗi row nhận key ~ U(0, 1); giữ ``size`` rows có key nhỏ nhất. Merge hai sample
+    bằng cách giữ key nhỏ nhất trên hợp của chúng -> vẫn là uniform sample.
+    """
+
+    def __init__(self, columns: Sequence[str], size: int, seed: Optional[int] = None):
+        self.columns = list(columns)
+        self.size = size
+        self.seen = 0
+        self.keys = np.empty(0, dtype=np.float64)
+        self.rows = np.empty((0, len(self.columns)), dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        matrix = batch_matrix(batch, self.columns)
+        self.seen += matrix.shape[0]
+        self._keep(np.concatenate((self.keys, self._rng.random(matrix.shape[0]))),
+                   np.concatenate((self.rows, matrix)))
+
+    def merge(self, other: "ReservoirSample") -> "ReservoirSample":
+        self.seen += other.seen
+        self._keep(np.concatenate((self.keys, other.keys)), np.concatenate((self.rows, other.rows)))
+        return self
+
+    def _keep(self, keys: np.ndarray, rows: np.ndarray) -> None:
+        if keys.size > self.size:
+            idx = np.argpartition(keys, self.size)[: self.size]
+            keys, rows = keys[idx], rows[idx]
+        self.keys, self.rows = keys, rows
+
+    def accumulator(self) -> CorrelationAccumulator:
+        accumulator = CorrelationAccumulator(self.columns)
+        accumulator.update_matrix(self.rows)
+        return accumulator
+
+
+def summarize_correlations(
+    accumulator: CorrelationAccumulator,
+    threshold: float = HIGH_CORRELATION_THRESHOLD,
+    vif_threshold: float = VIF_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Chuyển accumulator thành kết quả correlation analysis.
+
+    Returns:
+        Dict với high_correlations, multicollinearity, vif, matrix, recommendations
+    """
+    columns = accumulator.columns
+    corr = accumulator.correlation()
+    vif = accumulator.vif()
+
+    i, j = np.triu_indices(len(columns), k=1)
+    strong = np.flatnonzero(np.abs(corr[i, j]) >= threshold)
+    strong = strong[np.argsort(-np.abs(corr[i, j][strong]), kind="stable")]
+    high_correlations = [
+        {"feature1": columns[i[k]], "feature2": columns[j[k]], "correlation": round(float(corr[i[k], j[k]]), 4)}
+        for k in strong
+    ]
+
+    inflated = [c for c, v in zip(columns, vif) if np.isfinite(v) and v > vif_threshold]
+    recommendations: List[str] = []
+    for pair in high_correlations:
+        if abs(pair["correlation"]) >= REDUNDANT_CORRELATION_THRESHOLD:
+            recommendations.append(
+                f"Consider removing {pair['feature2']} (highly correlated with {pair['feature1']})"
+            )
+    if inflated:
+        recommendations.append(
+            f"Multicollinearity (VIF > {vif_threshold:g}): {', '.join(inflated)}"
+        )
+
+    return {
+        "high_correlations": high_correlations,
+        "multicollinearity": bool(inflated),
+        "vif": {c: (round(float(v), 4) if np.isfinite(v) else None) for c, v in zip(columns, vif)},
+        "matrix": {"features": columns, "values": np.round(corr, 4).tolist()},
+        "rows_used": accumulator.count,
+        "recommendations": recommendations,
+    }
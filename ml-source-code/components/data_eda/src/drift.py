@@ -0,0 +1,185 @@
+"""
+Data drift detection từ cached feature summaries.
+
+Mỗi ngày EDA persist ``eda/{date}/feature_summaries.json`` (vài KB): với numeric
+features là 101 quantile points + histogram, với categorical features là top-k
+frequencies. Drift của hôm nay so với N ngày trước được tính chỉ từ các summaries này
+(không đọc lại data cũ):
+    - PSI (Population Stability Index) trên decile bins của ngày tham chiếu
+    - KS statistic xấp xỉ: max |F_today(x) - F_ref(x)| trên union các quantile points
+    - Jensen-Shannon divergence (base 2, trong [0, 1]) trên cùng bins
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .stats_engine import DatasetProfile
+from .storage import exists, resolve
+
+SUMMARY_QUANTILES = np.linspace(0.0, 1.0, 101)
+HISTOGRAM_BINS = 30
+SUMMARY_TOP_K = 50
+PSI_BINS = 10
+PSI_DRIFT_THRESHOLD = 0.25
+KS_DRIFT_THRESHOLD = 0.1
+_EPS = 1e-6
+
+
+def build_feature_summaries(profile: DatasetProfile) -> Dict[str, Any]:
+    """Tóm tắt profile thành summaries gọn để cache theo ngày."""
+    features: Dict[str, Any] = {}
+    for name, column in profile.numeric.items():
+        count = column.moments.count
+        if count == 0:
+            continue
+        quantiles = column.quantiles.quantile(SUMMARY_QUANTILES)
+        edges = np.linspace(column.moments.min, column.moments.max, HISTOGRAM_BINS + 1)
+        if edges[-1] == edges[0]:
+            edges = np.array([edges[0], edges[0] + 1.0])
+        cdf = column.quantiles.cdf(edges)
+        cdf[0] = 0.0  # bin đầu chứa cả min
+        cdf[-1] = 1.0
+        features[name] = {
+            "type": "numeric",
+            "count": count,
+            "quantiles": quantiles.tolist(),
+            "histogram": {
+                "edges": edges.tolist(),
+                "counts": np.round(np.diff(cdf) * count).astype(int).tolist(),
+            },
+        }
+    for name, column in profile.categorical.items():
+        total = column.top_k.total
+        if total == 0:
+            continue
+        top = column.top_k.top(SUMMARY_TOP_K)
+        frequencies = {str(value): count / total for value, count in top}
+        features[name] = {
+            "type": "categorical",
+            "count": total,
+            "frequencies": frequencies,
+            "other": max(0.0, 1.0 - sum(frequencies.values())),
+        }
+    timelines = {
+        name: {
+            "bucket_seconds": timeline.bucket_seconds,
+            "buckets": sorted(timeline.counts),
+            "counts": [timeline.counts[b] for b in sorted(timeline.counts)],
+        }
+        for name, timeline in profile.timelines.items()
+    }
+    return {"rows": profile.rows, "features": features, "timelines": timelines}
+
+
+def _cdf_from_quantiles(quantiles: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Step CDF P(X <= x) suy ra từ quantile points đều nhau (ổn định với ties)."""
+    n = quantiles.size
+    idx = np.searchsorted(quantiles, points, side="right")
+    return np.clip((idx - 1) / (n - 1), 0.0, 1.0)
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.clip(expected, _EPS, None)
+    actual = np.clip(actual, _EPS, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _js_divergence(p: np.ndarray, q: np.ndarray) -> float:
+    p = p / p.sum() if p.sum() > 0 else p
+    q = q / q.sum() if q.sum() > 0 else q
+    m = (p + q) / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_pm = np.where(p > 0, p * np.log2(p / m), 0.0).sum()
+        kl_qm = np.where(q > 0, q * np.log2(q / m), 0.0).sum()
+    return float(max(0.0, (kl_pm + kl_qm) / 2.0))
+
+
+def _numeric_bins(reference: np.ndarray, current: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mass của reference/current trên decile bins của reference."""
+    edges = np.unique(reference[np.linspace(0, reference.size - 1, PSI_BINS + 1).astype(int)[1:-1]])
+    expected = np.diff(np.concatenate(([0.0], _cdf_from_quantiles(reference, edges), [1.0])))
+    actual = np.diff(np.concatenate(([0.0], _cdf_from_quantiles(current, edges), [1.0])))
+    return expected, actual
+
+
+def compare_features(current: Dict[str, Any], reference: Dict[str, Any]) -> Dict[str, Any]:
+    """PSI / KS / JS cho một feature giữa hôm nay và một ngày tham chiếu."""
+    if current["type"] == "numeric":
+        cur_q = np.asarray(current["quantiles"])
+        ref_q = np.asarray(reference["quantiles"])
+        expected, actual = _numeric_bins(ref_q, cur_q)
+        grid = np.union1d(cur_q, ref_q)
+        ks = float(np.max(np.abs(_cdf_from_quantiles(cur_q, grid) - _cdf_from_quantiles(ref_q, grid))))
+    else:
+        categories = sorted(set(current["frequencies"]) | set(reference["frequencies"]))
+        expected = np.array([reference["frequencies"].get(c, 0.0) for c in categories] + [reference["other"]])
+        actual = np.array([current["frequencies"].get(c, 0.0) for c in categories] + [current["other"]])
+        ks = None
+    return {
+        "psi": round(_psi(expected, actual), 6),
+        "ks": round(ks, 6) if ks is not None else None,
+        "js_divergence": round(_js_divergence(expected, actual), 6),
+    }
+
+
+def summaries_key(date_prefix: str) -> str:
+    return f"eda/{date_prefix}/feature_summaries.json"
+
+
+def load_history(bucket: str, date_prefix: str, lookback_days: int) -> Dict[str, Dict[str, Any]]:
+    """Đọc cached summaries của ``lookback_days`` ngày trước (bỏ qua ngày không có)."""
+    day = datetime.strptime(date_prefix, "%Y-%m-%d")
+    history: Dict[str, Dict[str, Any]] = {}
+    for offset in range(1, lookback_days + 1):
+        previous = (day - timedelta(days=offset)).strftime("%Y-%m-%d")
+        if not exists(bucket, summaries_key(previous)):
+            continue
+        fs, path = resolve(bucket, summaries_key(previous))
+        with fs.open_input_stream(path) as stream:
+            history[previous] = json.loads(stream.read().decode("utf-8"))
+    return history
+
+
+def detect_drift(
+    summaries: Dict[str, Any],
+    history: Dict[str, Dict[str, Any]],
+    psi_threshold: float = PSI_DRIFT_THRESHOLD,
+    ks_threshold: float = KS_DRIFT_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    So sánh summaries hôm nay với từng ngày trong history.
+
+    Returns:
+        Dict với per-feature metrics (theo ngày + max), danh sách features bị drift
+    """
+    features: Dict[str, Any] = {}
+    drifted: List[str] = []
+    for name, current in summaries["features"].items():
+        by_date = {
+            date: compare_features(current, past["features"][name])
+            for date, past in sorted(history.items(), reverse=True)
+            if name in past["features"] and past["features"][name]["type"] == current["type"]
+        }
+        if not by_date:
+            continue
+        worst_psi = max(m["psi"] for m in by_date.values())
+        ks_values = [m["ks"] for m in by_date.values() if m["ks"] is not None]
+        worst_ks: Optional[float] = max(ks_values) if ks_values else None
+        features[name] = {
+            "by_date": by_date,
+            "max_psi": worst_psi,
+            "max_ks": worst_ks,
+            "max_js_divergence": max(m["js_divergence"] for m in by_date.values()),
+        }
+        if worst_psi > psi_threshold or (worst_ks is not None and worst_ks > ks_threshold):
+            drifted.append(name)
+
+    return {
+        "reference_dates": sorted(history, reverse=True),
+        "features": features,
+        "drifted_features": drifted,
+        "drift_detected": bool(drifted),
+        "thresholds": {"psi": psi_threshold, "ks": ks_threshold},
+    }
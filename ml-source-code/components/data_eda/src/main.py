@@ -7,24 +7,39 @@ Mục đích:
 
 Workflow:
     1. Load processed data từ S3 processed/{date}/ prefix
-    2. Statistical analysis: descriptive statistics, distributions
+    2. Statistical analysis: descriptive statistics, distributions (streaming, xem src/stats_engine.py)
     3. Correlation analysis: feature correlations, multicollinearity
-    4. Visualization: generate charts và plots
-    5. Anomaly detection: identify outliers và unusual patterns
-    6. Generate EDA report (HTML/PDF) và save lên S3
-    7. Save visualizations và statistics
+    4. Visualization: generate charts và plots (từ histograms đã tổng hợp, process pool)
+    5. Anomaly detection: identify outliers và unusual patterns (robust z-score + IsolationForest)
+    6. Drift detection: so sánh cached feature summaries với N ngày trước (PSI, KS, JS)
+    7. Generate EDA report (HTML/PDF) và save lên S3
+    8. Save visualizations và statistics
 
 Input:
-    - Processed data từ S3: s3://{bucket}/processed/{date}/processed_data_*.parquet
+    - Processed data từ S3: s3://{bucket}/processed/{date}/dataset/ (partitioned Parquet + _metadata)
 
 Output:
     - EDA report: s3://{bucket}/eda/{date}/eda_report_{timestamp}.html
     - Visualizations: s3://{bucket}/eda/{date}/visualizations/*.png
     - Statistics: s3://{bucket}/eda/{date}/statistics.json
-    - Summary: s3://{bucket}/eda/{date}/summary.json
+    - Summary (kèm drift metrics): s3://{bucket}/eda/{date}/summary.json
+    - Feature summaries (drift cache): s3://{bucket}/eda/{date}/feature_summaries.json
+    - Step telemetry (wall/CPU time, peak RSS, rows, I/O bytes; xem src/telemetry.py):
+      s3://{bucket}/telemetry/{date}/data_eda.json
 
 Environment Variables:
     - S3_DATA_LAKE_BUCKET: S3 bucket name for data lake
+    - EDA_WORKERS: Số threads profile song song theo file (default: CPU count)
+    - EDA_SAMPLE_SIZE: Kích thước reservoir sample (default: 100000)
+    - CORRELATION_MODE: "exact" (toàn bộ rows) hoặc "sample" (reservoir sample)
+    - ANOMALY_MULTIVARIATE: Bật IsolationForest detector (default: true)
+    - DRIFT_LOOKBACK_DAYS: Số ngày trước dùng để so sánh drift (default: 7)
+    - EDA_PLOTS_ENABLED: Render visualizations (default: true)
+    - EDA_PLOT_WORKERS: Số processes render plots (default: min(CPU count, số plots))
+    - DATE_PREFIX: Phân tích ngày này (YYYY-MM-DD) thay vì ngày hiện tại (backfill, local runs)
+    - DATA_LAKE_ROOT: Dùng local directory thay cho S3 (local dev)
+    - PROFILE_MODE: none | cprofile | sampling - profile từng step (default: none)
+    - PROFILE_STEPS / PROFILE_DIR / PROFILE_INTERVAL_MS: xem src/telemetry.py
     - LOG_LEVEL: Logging level
 
 Example:
@@ -43,7 +58,18 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
+
+import pyarrow as pa
+
+from .anomaly import detect_dataset_anomalies
+from .correlation import summarize_correlations
+from .drift import build_feature_summaries, detect_drift, load_history, summaries_key
+from .stats_engine import DatasetProfile, profile_dataset, summarize
+from .storage import (
+    Filters, open_processed_dataset, table_dataset, to_expression, write_bytes, write_json
+)
+from .telemetry import Telemetry
 
 # Setup logging
 logging.basicConfig(
@@ -52,69 +78,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+EDA_SAMPLE_SIZE = 100000
+DRIFT_LOOKBACK_DAYS = 7
 
-def load_processed_data(bucket: str, date_prefix: str) -> Dict[str, Any]:
+
+def load_processed_data(
+    bucket: str,
+    date_prefix: str,
+    columns: Optional[List[str]] = None,
+    filters: Filters = None,
+    table: Optional[pa.Table] = None
+) -> Dict[str, Any]:
     """
-    Mô phỏng load processed data từ S3.
+    Mở processed dataset từ S3 (lazy - chỉ đọc _metadata, chưa đọc data).
     
     Args:
         bucket: S3 bucket name
         date_prefix: Date prefix
+        columns: Chỉ đọc các columns này (default: tất cả)
+        filters: Arrow expression hoặc DNF list, e.g. [("category", "=", "shoes")];
+            partition và row groups không khớp sẽ bị bỏ qua khi đọc
+        table: Processed Arrow table đã có trong memory (in-process runner) - dùng trực
+            tiếp thay vì đọc S3
         
     Returns:
-        Processed data metadata
+        Processed data metadata và dataset handle
     """
-    logger.info(f"Loading processed data from s3://{bucket}/processed/{date_prefix}/")
+    if table is not None:
+        logger.info(f"Using in-memory processed data for {date_prefix} ({table.num_rows} records)")
+        dataset, s3_key = table_dataset(table), f"memory://processed/{date_prefix}"
+    else:
+        logger.info(f"Loading processed data from s3://{bucket}/processed/{date_prefix}/")
+        dataset, s3_key = open_processed_dataset(bucket, date_prefix)
+    filter_expr = to_expression(filters)
     
     return {
-        "s3_key": f"processed/{date_prefix}/processed_data_20250115_020000.parquet",
-        "record_count": 9500,
-        "features": [
-            "user_id", "item_id", "rating", "timestamp", "category", "price",
-            "price_normalized", "category_encoded", "user_activity_score", "item_popularity_score"
-        ]
+        "s3_key": s3_key,
+        "record_count": dataset.count_rows(filter=filter_expr),
+        "features": list(columns or dataset.schema.names),
+        "dataset": dataset,
+        "filter": filter_expr
     }
 
 
-def compute_statistics(data: Dict[str, Any]) -> Dict[str, Any]:
+def iter_batches(data: Dict[str, Any], columns: Optional[List[str]] = None) -> Iterator[pa.RecordBatch]:
     """
-    Mô phỏng tính toán statistical summary.
+    Stream RecordBatches từ processed dataset với column projection và filter pushdown.
+    
+    Args:
+        data: Output của load_processed_data
+        columns: Columns cần đọc (default: data["features"])
+        
+    Returns:
+        Iterator các RecordBatch
+    """
+    return data["dataset"].to_batches(columns=columns or data["features"], filter=data["filter"])
+
+
+def profile_data(data: Dict[str, Any]) -> DatasetProfile:
+    """
+    Duyệt processed data một lần (theo row groups, song song theo file) để build profile.
     
     Args:
         data: Processed data metadata
         
+    Returns:
+        DatasetProfile (mergeable accumulators cho từng feature)
+    """
+    logger.info("Profiling processed data (streaming row groups)...")
+    
+    return profile_dataset(
+        data["dataset"],
+        data["features"],
+        filter_expr=data["filter"],
+        max_workers=int(os.getenv("EDA_WORKERS", str(os.cpu_count() or 1))),
+        sample_size=int(os.getenv("EDA_SAMPLE_SIZE", str(EDA_SAMPLE_SIZE))),
+        exact_correlations=os.getenv("CORRELATION_MODE", "exact").lower() != "sample"
+    )
+
+
+def compute_statistics(data: Dict[str, Any], profile: Optional[DatasetProfile] = None) -> Dict[str, Any]:
+    """
+    Tính statistical summary từ streaming profile.
+    
+    Numeric features: Welford moments + KLL median; categorical features: Misra-Gries
+    top-k + KMV distinct count. Không load dataset vào memory.
+    
+    Args:
+        data: Processed data metadata
+        profile: Profile đã build (default: build mới qua profile_data)
+        
     Returns:
         Statistical summary
     """
     logger.info("Computing statistical summary...")
     
-    stats = {
-        "total_records": data["record_count"],
-        "total_features": len(data["features"]),
-        "numeric_features": {
-            "rating": {
-                "mean": 4.2,
-                "std": 0.8,
-                "min": 1.0,
-                "max": 5.0,
-                "median": 4.3
-            },
-            "price": {
-                "mean": 45.5,
-                "std": 15.2,
-                "min": 10.0,
-                "max": 200.0,
-                "median": 42.0
-            }
-        },
-        "categorical_features": {
-            "category": {
-                "unique_values": 15,
-                "most_common": "clothing",
-                "distribution": {"clothing": 0.35, "shoes": 0.25, "accessories": 0.40}
-            }
-        }
-    }
+    if profile is None:
+        profile = profile_data(data)
+    stats = summarize(profile, total_features=len(data["features"]))
     
     logger.info(f"  - Total records: {stats['total_records']}")
     logger.info(f"  - Numeric features: {len(stats['numeric_features'])}")
@@ -123,57 +184,71 @@ def compute_statistics(data: Dict[str, Any]) -> Dict[str, Any]:
     return stats
 
 
-def analyze_correlations(data: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_correlations(data: Dict[str, Any], profile: Optional[DatasetProfile] = None) -> Dict[str, Any]:
     """
-    Mô phỏng correlation analysis.
+    Correlation analysis từ blocked co-moment accumulators (float64, O(p^2) memory).
+    
+    CORRELATION_MODE=exact dùng toàn bộ rows; CORRELATION_MODE=sample dùng reservoir
+    sample. VIF cho multicollinearity tính từ cùng correlation matrix.
     
     Args:
         data: Processed data metadata
+        profile: Profile đã build (default: build mới qua profile_data)
         
     Returns:
         Correlation analysis results
     """
     logger.info("Analyzing feature correlations...")
     
-    correlations = {
-        "high_correlations": [
-            {"feature1": "price", "feature2": "price_normalized", "correlation": 0.95},
-            {"feature1": "user_activity_score", "feature2": "rating", "correlation": 0.72}
-        ],
-        "multicollinearity": False,
-        "recommendations": [
-            "Consider removing price_normalized (highly correlated with price)",
-            "user_activity_score và rating có correlation tốt cho model"
-        ]
-    }
+    if profile is None:
+        profile = profile_data(data)
+    correlations = summarize_correlations(profile.correlation_accumulator())
     
+    logger.info(f"  - Rows used: {correlations['rows_used']}")
     logger.info(f"  - High correlations found: {len(correlations['high_correlations'])}")
     logger.info(f"  - Multicollinearity detected: {correlations['multicollinearity']}")
     
     return correlations
 
 
-def detect_anomalies(data: Dict[str, Any]) -> Dict[str, Any]:
+def detect_anomalies(data: Dict[str, Any], profile: Optional[DatasetProfile] = None) -> Dict[str, Any]:
     """
-    Mô phỏng anomaly detection.
+    Anomaly detection: robust z-score/IQR per column + IsolationForest (multivariate).
+    
+    Median/IQR lấy từ quantile sketches của profile; IsolationForest fit trên reservoir
+    sample rồi score từng chunk song song theo file (xem src/anomaly.py).
     
     Args:
         data: Processed data metadata
+        profile: Profile đã build (default: build mới qua profile_data)
         
     Returns:
         Anomaly detection results
     """
     logger.info("Detecting anomalies...")
     
+    if profile is None:
+        profile = profile_data(data)
+    counts = detect_dataset_anomalies(
+        data["dataset"],
+        profile,
+        filter_expr=data["filter"],
+        max_workers=int(os.getenv("EDA_WORKERS", str(os.cpu_count() or 1))),
+        multivariate=os.getenv("ANOMALY_MULTIVARIATE", "true").lower() == "true"
+    )
+    
+    outlier_rate = counts["outlier_rows"] / counts["rows"] if counts["rows"] else 0.0
     anomalies = {
-        "outliers_detected": 45,
-        "outlier_rate": 0.0047,  # 0.47%
+        "outliers_detected": counts["outlier_rows"],
+        "outlier_rate": outlier_rate,
         "anomaly_types": {
-            "extreme_ratings": 12,
-            "price_outliers": 23,
-            "unusual_patterns": 10
+            "extreme_ratings": counts["per_feature"].get("rating", 0),
+            "price_outliers": counts["per_feature"].get("price", 0),
+            "unusual_patterns": counts["multivariate"]
         },
-        "severity": "low",
+        "per_feature": counts["per_feature"],
+        "log_scaled": counts["log_scaled"],
+        "severity": "low" if outlier_rate < 0.01 else "medium" if outlier_rate <= 0.05 else "high",
         "action_required": False
     }
     
@@ -187,25 +262,73 @@ def detect_anomalies(data: Dict[str, Any]) -> Dict[str, Any]:
     return anomalies
 
 
-def generate_visualizations(data: Dict[str, Any], date_prefix: str) -> List[str]:
+def detect_data_drift(summaries: Dict[str, Any], bucket: str, date_prefix: str) -> Dict[str, Any]:
     """
-    Mô phỏng generate visualizations.
+    Persist feature summaries của hôm nay và so sánh với N ngày trước.
+    
+    Drift metrics (PSI, KS xấp xỉ, Jensen-Shannon) chỉ tính từ cached summaries
+    eda/{date}/feature_summaries.json nên không phải đọc lại data của các ngày cũ.
     
     Args:
-        data: Processed data metadata
+        summaries: Feature summaries của hôm nay (build_feature_summaries)
+        bucket: S3 bucket name
+        date_prefix: Date prefix
+        
+    Returns:
+        Drift detection results
+    """
+    logger.info("Detecting data drift against previous days...")
+    
+    write_json(bucket, summaries_key(date_prefix), summaries)
+    
+    lookback_days = int(os.getenv("DRIFT_LOOKBACK_DAYS", str(DRIFT_LOOKBACK_DAYS)))
+    history = load_history(bucket, date_prefix, lookback_days)
+    drift = detect_drift(summaries, history)
+    
+    logger.info(f"  - Reference days: {len(drift['reference_dates'])}")
+    logger.info(f"  - Drifted features: {drift['drifted_features']}")
+    
+    if drift["drift_detected"]:
+        logger.warning("⚠️  Data drift detected!")
+    
+    return drift
+
+
+def generate_visualizations(
+    summaries: Dict[str, Any],
+    correlations: Dict[str, Any],
+    bucket: str,
+    date_prefix: str
+) -> List[str]:
+    """
+    Render visualizations từ dữ liệu đã tổng hợp và upload lên S3.
+    
+    Plots được vẽ từ histograms/frequencies/correlation matrix/downsampled time series
+    (không từ raw rows) trên process pool với Agg backend. EDA_PLOTS_ENABLED=false bỏ qua
+    bước này và matplotlib/seaborn không bao giờ được import.
+    
+    Args:
+        summaries: Feature summaries (build_feature_summaries)
+        correlations: Correlation analysis results
+        bucket: S3 bucket name
         date_prefix: Date prefix
         
     Returns:
         List of visualization file paths
     """
+    if os.getenv("EDA_PLOTS_ENABLED", "true").lower() != "true":
+        logger.info("Visualizations disabled, skipping")
+        return []
+    
     logger.info("Generating visualizations...")
     
+    from .visualization import build_plot_specs, render_plots
+    
+    specs = build_plot_specs(summaries, correlations)
+    images = render_plots(specs, max_workers=int(os.getenv("EDA_PLOT_WORKERS", "0")) or None)
     visualizations = [
-        f"eda/{date_prefix}/visualizations/distribution_rating.png",
-        f"eda/{date_prefix}/visualizations/distribution_price.png",
-        f"eda/{date_prefix}/visualizations/correlation_heatmap.png",
-        f"eda/{date_prefix}/visualizations/category_distribution.png",
-        f"eda/{date_prefix}/visualizations/time_series_analysis.png"
+        write_bytes(bucket, f"eda/{date_prefix}/visualizations/{name}.png", png)
+        for name, png in images.items()
     ]
     
     logger.info(f"  - Generated {len(visualizations)} visualizations")
@@ -213,8 +336,20 @@ def generate_visualizations(data: Dict[str, Any], date_prefix: str) -> List[str]
     return visualizations
 
 
-def main():
-    """Main entry point for data EDA component."""
+def run(
+    date_prefix: Optional[str] = None, processed_table: Optional[pa.Table] = None
+) -> Dict[str, Any]:
+    """
+    Chạy EDA cho một ngày.
+    
+    Args:
+        date_prefix: Date prefix (default: DATE_PREFIX hoặc ngày hiện tại UTC)
+        processed_table: Processed Arrow table trong memory (in-process runner); None thì
+            đọc processed/{date}/ từ S3
+        
+    Returns:
+        EDA report
+    """
     logger.info("=" * 60)
     logger.info("Data EDA Component - Starting")
     logger.info("=" * 60)
@@ -222,28 +357,49 @@ def main():
     # Get configuration
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
     component_name = os.getenv("COMPONENT_NAME", "data_eda")
-    date_prefix = datetime.utcnow().strftime("%Y-%m-%d")
+    date_prefix = date_prefix or os.getenv("DATE_PREFIX") or datetime.utcnow().strftime("%Y-%m-%d")
     
     logger.info(f"Component: {component_name}")
     logger.info(f"S3 Bucket: {bucket}")
     logger.info(f"Date Prefix: {date_prefix}")
     
+    telemetry = Telemetry(component_name)
+    
     # Step 1: Load processed data
-    processed_data = load_processed_data(bucket, date_prefix)
+    with telemetry.step("load_processed_data") as step:
+        processed_data = load_processed_data(bucket, date_prefix, table=processed_table)
+        step.rows = processed_data["record_count"]
+    rows = processed_data["record_count"]
     
     # Step 2: Compute statistics
-    statistics = compute_statistics(processed_data)
+    with telemetry.step("profile_data") as step:
+        profile = profile_data(processed_data)
+        step.rows = rows
+    with telemetry.step("compute_statistics") as step:
+        statistics = compute_statistics(processed_data, profile)
+        stats_s3_key = write_json(bucket, f"eda/{date_prefix}/statistics.json", statistics)
+        step.rows = rows
     
     # Step 3: Analyze correlations
-    correlations = analyze_correlations(processed_data)
+    with telemetry.step("analyze_correlations") as step:
+        correlations = analyze_correlations(processed_data, profile)
+        step.rows = rows
     
     # Step 4: Detect anomalies
-    anomalies = detect_anomalies(processed_data)
+    with telemetry.step("detect_anomalies") as step:
+        anomalies = detect_anomalies(processed_data, profile)
+        step.rows = rows
     
-    # Step 5: Generate visualizations
-    visualizations = generate_visualizations(processed_data, date_prefix)
+    # Step 5: Detect drift vs previous days
+    with telemetry.step("detect_data_drift"):
+        summaries = build_feature_summaries(profile)
+        drift = detect_data_drift(summaries, bucket, date_prefix)
     
-    # Step 6: Generate summary report
+    # Step 6: Generate visualizations
+    with telemetry.step("generate_visualizations"):
+        visualizations = generate_visualizations(summaries, correlations, bucket, date_prefix)
+    
+    # Step 7: Generate summary report
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     report = {
         "eda_date": datetime.utcnow().isoformat(),
@@ -252,21 +408,35 @@ def main():
         "statistics": statistics,
         "correlations": correlations,
         "anomalies": anomalies,
+        "drift": drift,
         "visualizations": visualizations,
         "summary": {
             "data_quality": "good",
             "ready_for_training": True,
-            "recommendations": correlations.get("recommendations", [])
-        }
+            "drift_detected": drift["drift_detected"],
+            "drifted_features": drift["drifted_features"],
+            "recommendations": correlations.get("recommendations", []) + [
+                f"Review drift in {name} (PSI {drift['features'][name]['max_psi']:.3f})"
+                for name in drift["drifted_features"]
+            ]
+        },
+        "telemetry": telemetry.summary()
     }
+    summary_s3_key = write_json(
+        bucket, f"eda/{date_prefix}/summary.json", {**report["summary"], "drift": drift}
+    )
     
+    telemetry_s3_key = write_json(
+        bucket, f"telemetry/{date_prefix}/{component_name}.json", report["telemetry"]
+    )
     report_s3_key = f"eda/{date_prefix}/eda_report_{timestamp}.html"
-    stats_s3_key = f"eda/{date_prefix}/statistics_{timestamp}.json"
     
     logger.info("=" * 60)
     logger.info("Data EDA Component - Completed")
     logger.info(f"✅ EDA Report: s3://{bucket}/{report_s3_key}")
     logger.info(f"✅ Statistics: s3://{bucket}/{stats_s3_key}")
+    logger.info(f"✅ Summary: s3://{bucket}/{summary_s3_key}")
+    logger.info(f"✅ Telemetry: s3://{bucket}/{telemetry_s3_key}")
     logger.info(f"📊 Summary:")
     logger.info(f"   - Data quality: {report['summary']['data_quality']}")
     logger.info(f"   - Ready for training: {report['summary']['ready_for_training']}")
@@ -275,5 +445,10 @@ def main():
     return report
 
 
+def main():
+    """Main entry point for data EDA component."""
+    return run()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,463 @@
+"""
+Streaming statistics engine cho EDA.
+
+Dataset được duyệt theo Parquet row groups (không load toàn bộ vào memory). Mỗi file
+được profile trên một thread riêng, mỗi column giữ accumulator mergeable:
+    - Numeric: Welford moments (count/mean/M2/min/max) + KLL quantile sketch
+    - Categorical: Misra-Gries top-k counts + KMV distinct-count sketch
+    - Numeric matrix: co-moment accumulator (correlations/VIF) + reservoir row sample
+
+Profiles của các file được merge lại thành ``DatasetProfile`` cho cả ngày.
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .correlation import CorrelationAccumulator, ReservoirSample
+
+ID_COLUMNS = ("user_id", "item_id")
+CATEGORICAL_OVERRIDES = ID_COLUMNS + ("category_encoded",)
+TOP_K = 10
+
+T = TypeVar("T")
+
+
+class Moments:
+    """Welford/Chan mergeable moments."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        batch = Moments()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch.m2 = float(np.square(values - batch.mean).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch: compactor levels với weight 2^level.
+
+    Khi một level vượt capacity, level đó được sort và giữ lại một nửa (offset ngẫu
+    nhiên) đẩy lên level kế tiếp. Merge = nối levels rồi compact.
+    """
+
+    def __init__(self, k: int = 256, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.levels[0] = np.concatenate((self.levels[0], values.astype(np.float64)))
+        self._compact()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        self.count += other.count
+        for level, items in enumerate(other.levels):
+            if level >= len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self._compact()
+        return self
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(8, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                keep_odd = items.size % 2
+                carry, items = items[:keep_odd], items[keep_odd:]
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level] = carry
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def quantile(self, qs: Sequence[float]) -> np.ndarray:
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(items.size, 2.0 ** level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        return values[np.minimum(idx, values.size - 1)]
+
+    def cdf(self, points: Sequence[float]) -> np.ndarray:
+        """Approximate CDF F(x) = P(X <= x) tại các điểm."""
+        points = np.asarray(points, dtype=np.float64)
+        if self.count == 0:
+            return np.zeros(points.shape)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(items.size, 2.0 ** level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        cum = np.cumsum(weights[order])
+        idx = np.searchsorted(values[order], points, side="right")
+        return np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1]
+
+
+class TopKCounter:
+    """
+    Misra-Gries heavy hitters (mergeable, exact khi số distinct <= capacity).
+
+    Khi số distinct vượt capacity, counts bị trừ đi (``reduced``) và chỉ còn là lower
+    bounds (sai số <= total / (capacity + 1)); với nhiều values cùng tần suất (e.g. ID
+    columns gần uniform), counts có thể rỗng dù total > 0.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Any, int] = {}
+        self.reduced = False
+
+    def update_counts(self, values: pa.Array, counts: np.ndarray) -> None:
+        """Cộng batch counts (exact, e.g. từ value_counts) vào summary."""
+        counts = np.asarray(counts, dtype=np.int64)
+        self.total += int(counts.sum())
+        if counts.size > self.capacity:
+            # Reduce batch trước (vectorized) để chỉ merge tối đa `capacity` items
+            threshold = np.partition(counts, counts.size - self.capacity - 1)[
+                counts.size - self.capacity - 1
+            ]
+            keep = np.flatnonzero(counts > threshold)
+            values, counts = values.take(pa.array(keep)), counts[keep] - threshold
+            self.reduced = True
+        for value, count in zip(values.to_pylist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+        self._reduce()
+
+    def merge(self, other: "TopKCounter") -> "TopKCounter":
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.total += other.total
+        self.reduced |= other.reduced
+        self._reduce()
+        return self
+
+    def _reduce(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = {v: c - threshold for v, c in self.counts.items() if c > threshold}
+        self.reduced = True
+
+    def top(self, k: int = TOP_K) -> List[Any]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class KMVSketch:
+    """K-minimum-values distinct counter trên 64-bit hashes."""
+
+    def __init__(self, k: int = 4096):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size:
+            self._keep(pd.util.hash_array(values, categorize=False))
+
+    def merge(self, other: "KMVSketch") -> "KMVSketch":
+        self._keep(other.hashes)
+        return self
+
+    def _keep(self, hashes: np.ndarray) -> None:
+        self.hashes = np.unique(np.concatenate((self.hashes, hashes)))[: self.k]
+
+    def estimate(self) -> int:
+        if self.hashes.size < self.k:
+            return int(self.hashes.size)
+        return int(round((self.k - 1) / (float(self.hashes[-1]) / 2.0 ** 64)))
+
+
+class TimeHistogram:
+    """Số interactions theo time bucket (mặc định theo giờ), mergeable."""
+
+    def __init__(self, bucket_seconds: int = 3600):
+        self.bucket_seconds = bucket_seconds
+        self.counts: Dict[int, int] = {}
+
+    def update(self, column: pa.ChunkedArray) -> None:
+        seconds = column.drop_null().cast(pa.timestamp("s"), safe=False).cast(pa.int64()).to_numpy()
+        buckets, counts = np.unique(seconds // self.bucket_seconds, return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other: "TimeHistogram") -> "TimeHistogram":
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        return self
+
+
+class ColumnProfile:
+    """Accumulators cho một column."""
+
+    def __init__(self, name: str, numeric: bool):
+        self.name = name
+        self.numeric = numeric
+        self.nulls = 0
+        if numeric:
+            self.moments = Moments()
+            self.quantiles = KLLSketch()
+        else:
+            self.top_k = TopKCounter()
+            self.distinct = KMVSketch()
+
+    def update(self, column: pa.ChunkedArray) -> None:
+        self.nulls += column.null_count
+        if self.numeric:
+            values = column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+            values = values[~np.isnan(values)]
+            self.moments.update(values)
+            self.quantiles.update(values)
+        else:
+            column = column.drop_null()
+            counts = pc.value_counts(column)
+            self.top_k.update_counts(counts.field("values"), counts.field("counts").to_numpy())
+            self.distinct.update(counts.field("values").to_numpy(zero_copy_only=False))
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        self.nulls += other.nulls
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.quantiles.merge(other.quantiles)
+        else:
+            self.top_k.merge(other.top_k)
+            self.distinct.merge(other.distinct)
+        return self
+
+
+class DatasetProfile:
+    """Mergeable profile của toàn bộ dataset (một ngày)."""
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        columns: Sequence[str],
+        sample_size: int = 0,
+        exact_correlations: bool = True,
+        seed: Optional[int] = None,
+    ):
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.timelines: Dict[str, TimeHistogram] = {}
+        for name in columns:
+            data_type = schema.field(name).type
+            if pa.types.is_timestamp(data_type):
+                # Thời gian chỉ được tổng hợp thành time series, không tính moments
+                self.timelines[name] = TimeHistogram()
+                continue
+            numeric = (
+                pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+            ) and name not in CATEGORICAL_OVERRIDES
+            self.columns[name] = ColumnProfile(name, numeric)
+        numeric_columns = list(self.numeric)
+        self.correlations = CorrelationAccumulator(numeric_columns) if exact_correlations else None
+        self.sample = ReservoirSample(numeric_columns, sample_size, seed) if sample_size else None
+
+    @property
+    def numeric(self) -> Dict[str, ColumnProfile]:
+        return {n: c for n, c in self.columns.items() if c.numeric}
+
+    @property
+    def categorical(self) -> Dict[str, ColumnProfile]:
+        return {n: c for n, c in self.columns.items() if not c.numeric}
+
+    def update(self, batch: pa.RecordBatch) -> "DatasetProfile":
+        self.rows += batch.num_rows
+        for name, profile in self.columns.items():
+            profile.update(batch.column(name))
+        for name, timeline in self.timelines.items():
+            timeline.update(batch.column(name))
+        if self.correlations is not None:
+            self.correlations.update(batch)
+        if self.sample is not None:
+            self.sample.update(batch)
+        return self
+
+    def merge(self, other: "DatasetProfile") -> "DatasetProfile":
+        self.rows += other.rows
+        for name, profile in other.columns.items():
+            self.columns[name].merge(profile)
+        for name, timeline in other.timelines.items():
+            self.timelines[name].merge(timeline)
+        if self.correlations is not None:
+            self.correlations.merge(other.correlations)
+        if self.sample is not None:
+            self.sample.merge(other.sample)
+        return self
+
+    def correlation_accumulator(self) -> CorrelationAccumulator:
+        """Exact accumulator nếu có, ngược lại tính từ reservoir sample."""
+        if self.correlations is not None:
+            return self.correlations
+        if self.sample is None:
+            raise ValueError("Profile has neither exact correlations nor a row sample")
+        return self.sample.accumulator()
+
+
+def profile_dataset(
+    dataset: ds.Dataset,
+    columns: Sequence[str],
+    filter_expr: Optional[ds.Expression] = None,
+    max_workers: Optional[int] = None,
+    sample_size: int = 0,
+    exact_correlations: bool = True,
+    seed: int = 0,
+) -> DatasetProfile:
+    """
+    Profile dataset trong một lần duyệt, song song theo file.
+
+    Args:
+        dataset: Arrow dataset (lazy)
+        columns: Columns cần profile
+        filter_expr: Filter pushdown xuống row groups
+        max_workers: Số threads (default: CPU count)
+        sample_size: Kích thước reservoir sample (0 = không sample)
+        exact_correlations: Accumulate co-moments trên toàn bộ rows
+        seed: Seed cho reservoir sampling
+
+    Returns:
+        DatasetProfile đã merge
+    """
+    schema = dataset.schema
+    columns = [c for c in columns if c in schema.names]
+
+    def new_profile(index: int) -> DatasetProfile:
+        return DatasetProfile(schema, columns, sample_size, exact_correlations, seed + index)
+
+    def profile_fragment(index: int, batches: Iterator[pa.RecordBatch]) -> DatasetProfile:
+        profile = new_profile(index + 1)
+        for batch in batches:
+            profile.update(batch)
+        return profile
+
+    result = new_profile(0)
+    for profile in scan_fragments(dataset, columns, profile_fragment, filter_expr, max_workers):
+        result.merge(profile)
+    return result
+
+
+def scan_fragments(
+    dataset: ds.Dataset,
+    columns: Sequence[str],
+    fn: Callable[[int, Iterator[pa.RecordBatch]], T],
+    filter_expr: Optional[ds.Expression] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[T]:
+    """
+    Chạy ``fn(index, batches)`` cho từng file của dataset trên thread pool.
+
+    Mỗi file được stream theo row groups với column projection và filter pushdown;
+    kết quả được yield theo thứ tự file.
+    """
+    schema = dataset.schema
+    fragments = list(dataset.get_fragments(filter=filter_expr))
+
+    def run(index: int, fragment: ds.Fragment) -> T:
+        # Partition columns (e.g. category) không nằm trong file -> đọc qua dataset schema
+        scanner = ds.Scanner.from_fragment(
+            fragment, schema=schema, columns=list(columns), filter=filter_expr, use_threads=False
+        )
+        return fn(index, scanner.to_batches())
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        yield from executor.map(run, range(len(fragments)), fragments)
+
+
+def summarize(profile: DatasetProfile, total_features: int) -> Dict[str, Any]:
+    """
+    Chuyển profile thành statistics.json (schema giữ nguyên như trước).
+
+    Với categorical columns có nhiều distinct values hơn capacity của TopKCounter, counts
+    chỉ là Misra-Gries lower bounds: ``distribution`` là None và counts được ghi vào
+    ``count_lower_bounds``; ``most_common`` là None nếu không còn heavy hitter nào.
+    """
+    numeric_features = {}
+    for name, column in profile.numeric.items():
+        moments = column.moments
+        if moments.count == 0:
+            continue
+        numeric_features[name] = {
+            "mean": moments.mean,
+            "std": moments.std,
+            "min": moments.min,
+            "max": moments.max,
+            "median": float(column.quantiles.quantile([0.5])[0]),
+        }
+
+    categorical_features = {}
+    for name, column in profile.categorical.items():
+        top = column.top_k.top()
+        total = column.top_k.total
+        if not total:
+            continue
+        feature: Dict[str, Any] = {
+            "unique_values": column.distinct.estimate(),
+            "most_common": _jsonable(top[0][0]) if top else None,
+            "distribution": None,
+        }
+        if column.top_k.reduced:
+            feature["count_lower_bounds"] = {str(_jsonable(v)): c for v, c in top}
+        else:
+            feature["distribution"] = {str(_jsonable(v)): c / total for v, c in top}
+        categorical_features[name] = feature
+
+    return {
+        "total_records": profile.rows,
+        "total_features": total_features,
+        "numeric_features": numeric_features,
+        "categorical_features": categorical_features,
+    }
+
+
+def _jsonable(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
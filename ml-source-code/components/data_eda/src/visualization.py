@@ -0,0 +1,147 @@
+"""
+EDA visualizations render từ dữ liệu đã tổng hợp.
+
+Plots được vẽ từ histograms / frequencies / correlation matrix / time series đã
+downsample trong feature summaries - không bao giờ từ raw rows - nên thời gian render
+không phụ thuộc vào data volume. Mỗi plot render trong một worker process với
+backend Agg; matplotlib/seaborn chỉ được import trong worker khi plotting được bật,
+nên container start không phải trả chi phí import này.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_SERIES_POINTS = 500
+MAX_CATEGORIES = 20
+
+
+def downsample_series(
+    buckets: List[int], counts: List[int], max_points: int = MAX_SERIES_POINTS
+) -> Tuple[List[int], List[int]]:
+    """Gộp các bucket liên tiếp (cộng counts) để series có tối đa ``max_points`` điểm."""
+    if len(buckets) <= max_points:
+        return list(buckets), list(counts)
+    step = -(-len(buckets) // max_points)
+    return (
+        [buckets[i] for i in range(0, len(buckets), step)],
+        [sum(counts[i:i + step]) for i in range(0, len(counts), step)],
+    )
+
+
+def build_plot_specs(
+    summaries: Dict[str, Any], correlations: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Chuẩn bị specs (plain dicts, picklable) cho các plots từ dữ liệu đã tổng hợp.
+
+    Args:
+        summaries: Feature summaries (histograms, frequencies, timelines)
+        correlations: Kết quả correlation analysis (matrix)
+
+    Returns:
+        List plot specs
+    """
+    features = summaries["features"]
+    specs: List[Dict[str, Any]] = []
+    for name in ("rating", "price"):
+        if name in features and features[name]["type"] == "numeric":
+            specs.append({
+                "name": f"distribution_{name}",
+                "kind": "histogram",
+                "title": f"Distribution of {name}",
+                "edges": features[name]["histogram"]["edges"],
+                "counts": features[name]["histogram"]["counts"],
+            })
+    matrix = correlations.get("matrix")
+    if matrix and matrix["features"]:
+        specs.append({
+            "name": "correlation_heatmap",
+            "kind": "heatmap",
+            "title": "Feature correlations",
+            "labels": matrix["features"],
+            "values": matrix["values"],
+        })
+    if "category" in features and features["category"]["type"] == "categorical":
+        frequencies = features["category"]["frequencies"]
+        top = sorted(frequencies.items(), key=lambda kv: -kv[1])[:MAX_CATEGORIES]
+        specs.append({
+            "name": "category_distribution",
+            "kind": "bar",
+            "title": "Category distribution",
+            "labels": [label for label, _ in top],
+            "values": [value for _, value in top],
+        })
+    timeline = summaries.get("timelines", {}).get("timestamp")
+    if timeline and timeline["buckets"]:
+        buckets, counts = downsample_series(timeline["buckets"], timeline["counts"])
+        specs.append({
+            "name": "time_series_analysis",
+            "kind": "line",
+            "title": "Interactions over time",
+            "x": [b * timeline["bucket_seconds"] for b in buckets],
+            "y": counts,
+        })
+    return specs
+
+
+def render_plot(spec: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Render một plot spec thành PNG bytes (chạy trong worker process)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    kind = spec["kind"]
+    if kind == "histogram":
+        edges = spec["edges"]
+        ax.stairs(spec["counts"], edges, fill=True)
+        ax.set_ylabel("count")
+    elif kind == "heatmap":
+        import seaborn as sns
+
+        sns.heatmap(
+            spec["values"], xticklabels=spec["labels"], yticklabels=spec["labels"],
+            vmin=-1.0, vmax=1.0, cmap="coolwarm", annot=len(spec["labels"]) <= 12, fmt=".2f", ax=ax
+        )
+    elif kind == "bar":
+        ax.bar(spec["labels"], spec["values"])
+        ax.set_ylabel("share")
+        ax.tick_params(axis="x", rotation=45)
+    elif kind == "line":
+        x = [datetime.fromtimestamp(t, tz=timezone.utc) for t in spec["x"]]
+        ax.plot(x, spec["y"])
+        ax.set_ylabel("interactions")
+        fig.autofmt_xdate()
+    else:
+        plt.close(fig)
+        raise ValueError(f"Unknown plot kind: {kind}")
+
+    ax.set_title(spec["title"])
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    plt.close(fig)
+    return spec["name"], buffer.getvalue()
+
+
+def render_plots(
+    specs: List[Dict[str, Any]], max_workers: Optional[int] = None
+) -> Dict[str, bytes]:
+    """
+    Render plots song song trên process pool.
+
+    Args:
+        specs: Plot specs từ build_plot_specs
+        max_workers: Số processes (default: min(CPU count, số plots))
+
+    Returns:
+        Dict name -> PNG bytes
+    """
+    if not specs:
+        return {}
+    workers = max_workers or min(os.cpu_count() or 1, len(specs))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(render_plot, specs))
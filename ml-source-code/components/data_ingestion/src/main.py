@@ -18,11 +18,15 @@ Input:
 
 Output:
     - Raw data files trong S3: s3://{bucket}/raw/{date}/{source}_{timestamp}.parquet
-    - Metadata log: s3://{bucket}/raw/{date}/metadata.json
+    - Metadata log: s3://{bucket}/raw/{date}/metadata.json (kèm step telemetry: wall/CPU
+      time, peak RSS, rows, I/O bytes; xem src/telemetry.py)
 
 Environment Variables:
     - S3_DATA_LAKE_BUCKET: S3 bucket name for data lake
     - DATA_SOURCE_CONFIG: JSON config for data sources
+    - DATE_PREFIX: Ingest cho ngày này (YYYY-MM-DD) thay vì ngày hiện tại (backfill, local runs)
+    - PROFILE_MODE: none | cprofile | sampling - profile từng step (default: none)
+    - PROFILE_STEPS / PROFILE_DIR / PROFILE_INTERVAL_MS: xem src/telemetry.py
     - LOG_LEVEL: Logging level (INFO, DEBUG, ERROR)
 
 Example:
@@ -42,7 +46,9 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from .telemetry import Telemetry
 
 # Setup logging
 logging.basicConfig(
@@ -52,13 +58,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def ingest_data_from_source(source_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+def ingest_data_from_source(
+    source_name: str, config: Dict[str, Any], date_prefix: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Mô phỏng việc ingest data từ một source.
     
     Args:
         source_name: Tên của data source (e.g., 'api_fashion', 'db_users')
         config: Configuration cho data source
+        date_prefix: Ngày cần ingest (default: ngày hiện tại UTC)
         
     Returns:
         Dict chứa metadata về data đã ingest
@@ -71,7 +80,7 @@ def ingest_data_from_source(source_name: str, config: Dict[str, Any]) -> Dict[st
     
     # Mô phỏng upload lên S3
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
-    date_prefix = datetime.utcnow().strftime("%Y-%m-%d")
+    date_prefix = date_prefix or datetime.utcnow().strftime("%Y-%m-%d")
     s3_key = f"raw/{date_prefix}/{source_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.parquet"
     
     logger.info(f"Simulated upload to s3://{bucket}/{s3_key}")
@@ -87,8 +96,16 @@ def ingest_data_from_source(source_name: str, config: Dict[str, Any]) -> Dict[st
     }
 
 
-def main():
-    """Main entry point for data ingestion component."""
+def run(date_prefix: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Chạy data ingestion cho một ngày.
+    
+    Args:
+        date_prefix: Date prefix (default: DATE_PREFIX hoặc ngày hiện tại UTC)
+        
+    Returns:
+        Ingestion metadata
+    """
     logger.info("=" * 60)
     logger.info("Data Ingestion Component - Starting")
     logger.info("=" * 60)
@@ -96,9 +113,11 @@ def main():
     # Get configuration
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
     component_name = os.getenv("COMPONENT_NAME", "data_ingestion")
+    date_prefix = date_prefix or os.getenv("DATE_PREFIX") or datetime.utcnow().strftime("%Y-%m-%d")
     
     logger.info(f"Component: {component_name}")
     logger.info(f"S3 Bucket: {bucket}")
+    logger.info(f"Date Prefix: {date_prefix}")
     
     # Mô phỏng ingest từ nhiều sources
     sources = [
@@ -107,10 +126,13 @@ def main():
         {"name": "file_products", "type": "file_system"}
     ]
     
+    telemetry = Telemetry(component_name)
     results = []
     for source in sources:
         try:
-            result = ingest_data_from_source(source["name"], source)
+            with telemetry.step(f"ingest_{source['name']}") as step:
+                result = ingest_data_from_source(source["name"], source, date_prefix)
+                step.rows = result["record_count"]
             results.append(result)
             logger.info(f"✅ Successfully ingested from {source['name']}")
         except Exception as e:
@@ -125,8 +147,10 @@ def main():
     metadata = {
         "ingestion_date": datetime.utcnow().isoformat(),
         "component": component_name,
+        "date_prefix": date_prefix,
         "sources": results,
-        "total_records": sum(r.get("record_count", 0) for r in results if r.get("status") == "success")
+        "total_records": sum(r.get("record_count", 0) for r in results if r.get("status") == "success"),
+        "telemetry": telemetry.summary()
     }
     
     logger.info(f"📊 Ingestion Summary:")
@@ -141,5 +165,10 @@ def main():
     return metadata
 
 
+def main():
+    """Main entry point for data ingestion component."""
+    return run()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,33 +7,45 @@ Mục đích:
 
 Workflow:
     1. Load raw data từ S3 raw/{date}/ prefix
-    2. Data cleaning: xử lý missing values, outliers, duplicates
-    3. Feature engineering: tạo features mới, encode categorical variables
-    4. Data validation: kiểm tra data quality, schema validation
+    2. Data validation trên raw data (trước cleaning): data quality, schema validation
+       (single-pass mergeable sketches, xem src/quality.py)
+    3. Data cleaning: xử lý missing values, outliers, duplicates
+    4. Feature engineering: tạo features mới, encode categorical variables
     5. Normalization/Standardization: chuẩn hóa dữ liệu
-    6. Save processed data lên S3 processed/{date}/ prefix
-    7. Generate data quality report
+    6. Generate data quality report (scores của raw data + số rows cleaning đã loại)
+    7. Save processed data lên S3 processed/{date}/ prefix
 
 Input:
     - Raw data từ S3: s3://{bucket}/raw/{date}/*.parquet
     - Processing config: feature definitions, validation rules
 
 Output:
-    - Processed data: s3://{bucket}/processed/{date}/processed_data_{timestamp}.parquet
+    - Processed data: s3://{bucket}/processed/{date}/dataset/category=*/part-*.parquet
+      (Hive-partitioned theo category, sorted theo user_id, zstd, kèm _metadata summary)
     - Data quality report: s3://{bucket}/processed/{date}/quality_report.json
+      (scores đo trên raw data, kèm số rows cleaning đã loại)
     - Feature statistics: s3://{bucket}/processed/{date}/feature_stats.json
+    - Step telemetry (wall/CPU time, peak RSS, rows, I/O bytes; xem src/telemetry.py):
+      s3://{bucket}/telemetry/{date}/data_processing.json
 
 Environment Variables:
     - S3_DATA_LAKE_BUCKET: S3 bucket name for data lake
     - S3_PROCESSED_PREFIX: Prefix for processed data (default: processed)
     - PROCESSING_CONFIG: JSON config for processing rules
+    - PARQUET_ROW_GROUP_SIZE: Số rows mỗi row group (default: 131072)
+    - PROCESSING_WORKERS: Số threads cho quality sketches (default: CPU count)
+    - DATE_PREFIX: Xử lý ngày này (YYYY-MM-DD) thay vì ngày hiện tại (backfill, local runs)
+    - DATA_LAKE_ROOT: Dùng local directory thay cho S3 (local dev)
+    - PROFILE_MODE: none | cprofile | sampling - profile từng step (default: none)
+    - PROFILE_STEPS / PROFILE_DIR / PROFILE_INTERVAL_MS: xem src/telemetry.py
     - LOG_LEVEL: Logging level
 
 Example:
     python -m src.main
     
     Output:
-    - s3://ml-fashion-data-lake/processed/2025-01-15/processed_data_20250115_020000.parquet
+    - s3://ml-fashion-data-lake/processed/2025-01-15/dataset/_metadata
+    - s3://ml-fashion-data-lake/processed/2025-01-15/dataset/category=shoes/part-0.parquet
     - s3://ml-fashion-data-lake/processed/2025-01-15/quality_report.json
 
 MLOps Integration:
@@ -45,7 +57,16 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .quality import QualitySketch, build_quality_sketch, hash_values, mix64
+from .storage import get_filesystem, list_files, write_json, write_partitioned_dataset
+from .telemetry import Telemetry
 
 # Setup logging
 logging.basicConfig(
@@ -54,35 +75,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+RAW_COLUMNS = ["user_id", "item_id", "rating", "timestamp", "category", "price"]
+QUALITY_THRESHOLD = 0.90
+QUALITY_CHUNK_ROWS = 65536
+PARTITION_COLUMNS = ["category"]
+SORT_COLUMNS = ["user_id"]
+PARQUET_ROW_GROUP_SIZE = 131072
+# Vocabulary cố định cho category_encoded (code = vị trí): EDA, drift và train đọc feature
+# qua nhiều ngày nên code không được phụ thuộc vào categories có mặt trong ngày. Chỉ thêm
+# category mới vào cuối, không đổi thứ tự; category ngoài vocabulary được encode -1.
+CATEGORY_VOCABULARY = (
+    "tops", "bottoms", "dresses", "outerwear", "shoes",
+    "bags", "accessories", "sportswear", "underwear", "swimwear",
+)
+UNKNOWN_CATEGORY = -1
 
-def load_raw_data(bucket: str, date_prefix: str) -> Dict[str, Any]:
+
+def load_raw_data(
+    bucket: str, date_prefix: str, table: Optional[pa.Table] = None
+) -> Dict[str, Any]:
     """
-    Mô phỏng load raw data từ S3.
+    Load raw data từ S3 raw/{date}/ thành Arrow table.
     
     Args:
         bucket: S3 bucket name
         date_prefix: Date prefix (YYYY-MM-DD)
+        table: Raw Arrow table đã có trong memory - dùng trực tiếp (zero-copy), không đọc S3
         
     Returns:
-        Dict chứa raw data metadata
+        Dict chứa raw data metadata và Arrow table (key "table")
     """
+    if table is not None:
+        logger.info(f"Using in-memory raw data for {date_prefix} ({table.num_rows} records)")
+        return {
+            "files": [],
+            "total_records": table.num_rows,
+            "columns": RAW_COLUMNS,
+            "table": table.select([c for c in RAW_COLUMNS if c in table.column_names])
+        }
+    
     logger.info(f"Loading raw data from s3://{bucket}/raw/{date_prefix}/")
     
-    # Mô phỏng: Giả sử đã load được data
+    files = list_files(bucket, f"raw/{date_prefix}", suffix=".parquet")
+    if not files:
+        raise FileNotFoundError(f"No raw parquet files under s3://{bucket}/raw/{date_prefix}/")
+    
+    fs, base = get_filesystem(bucket)
+    dataset = ds.dataset(files, format="parquet", filesystem=fs)
+    columns = [c for c in RAW_COLUMNS if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns)
+    
+    logger.info(f"  - Files: {len(files)}")
+    logger.info(f"  - Records: {table.num_rows}")
+    
     return {
-        "files": [
-            f"raw/{date_prefix}/api_fashion_20250115_020000.parquet",
-            f"raw/{date_prefix}/db_users_20250115_020000.parquet",
-            f"raw/{date_prefix}/file_products_20250115_020000.parquet"
-        ],
-        "total_records": 10000,
-        "columns": ["user_id", "item_id", "rating", "timestamp", "category", "price"]
+        "files": [path[len(base) + 1:] for path in files],
+        "total_records": table.num_rows,
+        "columns": RAW_COLUMNS,
+        "table": table
     }
 
 
+def _row_hashes(table: pa.Table) -> np.ndarray:
+    """64-bit hash của từng row trên mọi column (string columns qua dictionary indices)."""
+    combined = np.zeros(table.num_rows, dtype=np.uint64)
+    for column in table.columns:
+        column = column.combine_chunks()
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.dictionary_encode(column).indices
+        values = column.to_numpy(zero_copy_only=False)
+        with np.errstate(over="ignore"):
+            combined = mix64(combined * np.uint64(31) + hash_values(values))
+    return combined
+
+
+def _duplicate_rows(table: pa.Table, rows: np.ndarray) -> np.ndarray:
+    """
+    Mask các rows (trong ``rows``) trùng hoàn toàn với một row đứng trước (giữ lần đầu).
+    
+    Rows được nhóm theo hash; chỉ các nhóm có hash trùng mới được group_by trên giá trị
+    thật, nên hash collisions không làm mất rows và memory chỉ tỉ lệ với số candidates.
+    """
+    duplicates = np.zeros(table.num_rows, dtype=bool)
+    hashes = _row_hashes(table)[rows]
+    order = np.argsort(hashes, kind="stable")
+    same = hashes[order[1:]] == hashes[order[:-1]]
+    if not same.any():
+        return duplicates
+    candidates = np.unique(np.concatenate((order[1:][same], order[:-1][same])))
+    candidates = rows[candidates]
+    subset = table.take(pa.array(candidates)).append_column("_row", pa.array(candidates))
+    first = subset.group_by(table.column_names).aggregate([("_row", "min")])["_row_min"]
+    duplicates[candidates] = True
+    duplicates[first.to_numpy()] = False
+    return duplicates
+
+
 def clean_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Mô phỏng data cleaning process.
+    Data cleaning: loại bỏ records thiếu giá trị bắt buộc và duplicates.
+    
+    Không round-trip qua pandas: duplicates được tìm bằng 64-bit row hashes (chỉ rows
+    trùng hash mới được so sánh đầy đủ) và cả hai loại rows bị loại bằng một lần filter.
+    Rows thiếu giá trị không được tính là duplicates.
     
     Args:
         data: Raw data metadata
@@ -92,31 +187,51 @@ def clean_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     logger.info("Starting data cleaning...")
     
-    # Mô phỏng cleaning operations
-    original_count = data["total_records"]
-    removed_duplicates = int(original_count * 0.05)  # 5% duplicates
-    removed_missing = int(original_count * 0.02)  # 2% missing values
-    cleaned_count = original_count - removed_duplicates - removed_missing
+    table = data["table"]
+    original_count = table.num_rows
+    
+    valid = np.ones(original_count, dtype=bool)
+    for column in table.columns:
+        if column.null_count:
+            valid &= pc.is_valid(column).to_numpy(zero_copy_only=False)
+    duplicates = _duplicate_rows(table, np.flatnonzero(valid))
+    removed_missing = original_count - int(valid.sum())
+    removed_duplicates = int(duplicates.sum())
+    
+    valid[duplicates] = False
+    table = table.filter(pa.array(valid))
+    cleaned_count = table.num_rows
     
     logger.info(f"  - Original records: {original_count}")
-    logger.info(f"  - Removed duplicates: {removed_duplicates}")
     logger.info(f"  - Removed missing: {removed_missing}")
+    logger.info(f"  - Removed duplicates: {removed_duplicates}")
     logger.info(f"  - Cleaned records: {cleaned_count}")
     
     return {
         **data,
         "total_records": cleaned_count,
+        "table": table,
         "cleaning_stats": {
             "duplicates_removed": removed_duplicates,
             "missing_removed": removed_missing,
-            "cleaning_rate": cleaned_count / original_count
+            "cleaning_rate": cleaned_count / original_count if original_count else 0.0
         }
     }
 
 
+def _log_frequency(column: pa.ChunkedArray) -> pa.Array:
+    """log1p(số lần mỗi value xuất hiện) chia cho max, theo từng row (hash, không sort)."""
+    indices = pc.dictionary_encode(column.combine_chunks()).indices.to_numpy()
+    frequency = np.log1p(np.bincount(indices)[indices].astype(np.float64))
+    return pa.array(frequency / frequency.max() if frequency.size else frequency)
+
+
 def engineer_features(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Mô phỏng feature engineering process.
+    Feature engineering: normalize price, encode category, tính activity/popularity scores.
+    
+    Features được append vào Arrow table (các columns cũ dùng lại buffers, không copy).
+    category_encoded dùng ``CATEGORY_VOCABULARY`` cố định nên ổn định giữa các ngày.
     
     Args:
         data: Cleaned data metadata
@@ -126,19 +241,34 @@ def engineer_features(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     logger.info("Starting feature engineering...")
     
-    # Mô phỏng feature engineering
-    engineered_features = [
-        "user_id",
-        "item_id",
-        "rating",
-        "timestamp",
-        "category",
-        "price",
-        "price_normalized",  # New feature
-        "category_encoded",  # New feature
-        "user_activity_score",  # New feature
-        "item_popularity_score"  # New feature
-    ]
+    table = data["table"]
+    
+    price = table["price"]
+    price_std = pc.stddev(price, ddof=1).as_py()
+    if price_std:
+        price_normalized = pc.divide(pc.subtract(price, pc.mean(price)), price_std)
+    else:
+        price_normalized = pa.array(np.zeros(table.num_rows))
+    table = table.append_column("price_normalized", price_normalized)
+    
+    category_encoded = pc.index_in(
+        table["category"], value_set=pa.array(CATEGORY_VOCABULARY, type=table["category"].type)
+    )
+    unknown = pc.unique(pc.filter(table["category"], pc.is_null(category_encoded)))
+    if len(unknown):
+        logger.warning(
+            f"⚠️  Categories not in CATEGORY_VOCABULARY (encoded {UNKNOWN_CATEGORY}): "
+            f"{unknown.to_pylist()[:20]}"
+        )
+    table = table.append_column(
+        "category_encoded", pc.fill_null(category_encoded, UNKNOWN_CATEGORY).cast(pa.int32())
+    )
+    
+    # Log-scaled về [0, 1] để giảm ảnh hưởng của heavy users / best-sellers
+    for key, feature in (("user_id", "user_activity_score"), ("item_id", "item_popularity_score")):
+        table = table.append_column(feature, _log_frequency(table[key]))
+    
+    engineered_features = table.column_names
     
     logger.info(f"  - Original features: {len(data['columns'])}")
     logger.info(f"  - Engineered features: {len(engineered_features)}")
@@ -147,6 +277,7 @@ def engineer_features(data: Dict[str, Any]) -> Dict[str, Any]:
     return {
         **data,
         "columns": engineered_features,
+        "table": table,
         "feature_engineering": {
             "new_features": engineered_features[len(data['columns']):],
             "transformation_applied": True
@@ -154,42 +285,89 @@ def engineer_features(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _sketch_table(table: pa.Table, columns: List[str]) -> QualitySketch:
+    return build_quality_sketch(
+        table.to_batches(max_chunksize=QUALITY_CHUNK_ROWS),
+        table.schema,
+        columns,
+        max_workers=int(os.getenv("PROCESSING_WORKERS", str(os.cpu_count() or 1)))
+    )
+
+
 def validate_data_quality(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Mô phỏng data quality validation.
+    Data quality validation trong một lần duyệt bằng mergeable sketches.
+    
+    Chạy trên raw data (input của clean_data): nulls và duplicates mà cleaning sẽ loại
+    vẫn được tính vào completeness/consistency, nên gate đo data đúng như khi đến.
+    Null counts, HyperLogLog distinct counts, t-digest quantiles và range violations
+    được tính per chunk song song rồi merge (xem src/quality.py).
     
     Args:
-        data: Processed data metadata
+        data: Raw data metadata
         
     Returns:
-        Quality report
+        Quality report (kèm per-feature statistics trong key "feature_stats")
     """
     logger.info("Validating data quality...")
     
-    # Mô phỏng quality checks
-    quality_report = {
-        "schema_valid": True,
-        "completeness": 0.98,
-        "consistency": 0.95,
-        "accuracy": 0.97,
-        "overall_score": 0.97,
-        "passed": True
-    }
+    sketch = _sketch_table(data["table"], data["columns"])
+    quality_report = sketch.report()
+    quality_report["feature_stats"] = sketch.feature_stats()
     
     logger.info(f"  - Schema valid: {quality_report['schema_valid']}")
     logger.info(f"  - Completeness: {quality_report['completeness']:.2%}")
+    logger.info(f"  - Consistency: {quality_report['consistency']:.2%}")
+    logger.info(f"  - Accuracy: {quality_report['accuracy']:.2%}")
     logger.info(f"  - Overall score: {quality_report['overall_score']:.2%}")
     
-    if quality_report["overall_score"] < 0.90:
+    if quality_report["overall_score"] < QUALITY_THRESHOLD:
         logger.warning("⚠️  Data quality below threshold!")
         quality_report["passed"] = False
     
     return quality_report
 
 
+def engineered_feature_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Feature statistics cho các columns do engineer_features tạo ra."""
+    return _sketch_table(
+        data["table"], data["feature_engineering"]["new_features"]
+    ).feature_stats()
+
+
+def save_quality_reports(quality_report: Dict[str, Any], bucket: str, date_prefix: str) -> Dict[str, str]:
+    """
+    Save quality report và feature statistics lên S3.
+    
+    Args:
+        quality_report: Output của validate_data_quality
+        bucket: S3 bucket name
+        date_prefix: Date prefix
+        
+    Returns:
+        Dict các S3 keys đã ghi
+    """
+    report = {k: v for k, v in quality_report.items() if k != "feature_stats"}
+    keys = {
+        "quality_report": write_json(bucket, f"processed/{date_prefix}/quality_report.json", report),
+        "feature_stats": write_json(
+            bucket, f"processed/{date_prefix}/feature_stats.json", quality_report["feature_stats"]
+        )
+    }
+    
+    logger.info(f"Saved quality report to s3://{bucket}/{keys['quality_report']}")
+    logger.info(f"Saved feature stats to s3://{bucket}/{keys['feature_stats']}")
+    
+    return keys
+
+
 def save_processed_data(data: Dict[str, Any], bucket: str, date_prefix: str) -> str:
     """
-    Mô phỏng save processed data lên S3.
+    Save processed data lên S3 dạng partitioned Parquet dataset.
+    
+    Layout: processed/{date}/dataset/category=<value>/part-<i>.parquet + _metadata.
+    Trong mỗi partition rows được sort theo user_id; row groups có min/max statistics
+    và nén zstd để downstream (EDA, train) đọc đúng columns/row groups cần thiết.
     
     Args:
         data: Processed data
@@ -197,20 +375,46 @@ def save_processed_data(data: Dict[str, Any], bucket: str, date_prefix: str) ->
         date_prefix: Date prefix
         
     Returns:
-        S3 key của processed data
+        S3 key (prefix) của processed dataset
     """
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    s3_key = f"processed/{date_prefix}/processed_data_{timestamp}.parquet"
+    s3_key = f"processed/{date_prefix}/dataset"
+    row_group_size = int(os.getenv("PARQUET_ROW_GROUP_SIZE", str(PARQUET_ROW_GROUP_SIZE)))
+    
+    logger.info(f"Saving processed data to s3://{bucket}/{s3_key}/")
+    
+    write_stats = write_partitioned_dataset(
+        data["table"],
+        bucket,
+        s3_key,
+        partition_cols=PARTITION_COLUMNS,
+        sort_by=SORT_COLUMNS,
+        row_group_size=row_group_size
+    )
     
-    logger.info(f"Saving processed data to s3://{bucket}/{s3_key}")
     logger.info(f"  - Records: {data['total_records']}")
     logger.info(f"  - Features: {len(data['columns'])}")
+    logger.info(f"  - Files: {write_stats['files']}, row groups: {write_stats['row_groups']}")
     
     return s3_key
 
 
-def main():
-    """Main entry point for data processing component."""
+def run(
+    date_prefix: Optional[str] = None,
+    raw_table: Optional[pa.Table] = None,
+    persist: bool = True
+) -> Dict[str, Any]:
+    """
+    Chạy data processing cho một ngày.
+    
+    Args:
+        date_prefix: Date prefix (default: DATE_PREFIX hoặc ngày hiện tại UTC)
+        raw_table: Raw Arrow table đã có trong memory (in-process runner); None thì đọc
+            raw/{date}/ từ S3
+        persist: Ghi processed dataset lên S3 (quality reports và telemetry luôn được ghi)
+        
+    Returns:
+        Processing result; ``processed_data["table"]`` là processed Arrow table
+    """
     logger.info("=" * 60)
     logger.info("Data Processing Component - Starting")
     logger.info("=" * 60)
@@ -219,43 +423,78 @@ def main():
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
     processed_prefix = os.getenv("S3_PROCESSED_PREFIX", "processed")
     component_name = os.getenv("COMPONENT_NAME", "data_processing")
-    date_prefix = datetime.utcnow().strftime("%Y-%m-%d")
+    date_prefix = date_prefix or os.getenv("DATE_PREFIX") or datetime.utcnow().strftime("%Y-%m-%d")
     
     logger.info(f"Component: {component_name}")
     logger.info(f"S3 Bucket: {bucket}")
     logger.info(f"Date Prefix: {date_prefix}")
     
-    # Step 1: Load raw data
-    raw_data = load_raw_data(bucket, date_prefix)
+    telemetry = Telemetry(component_name)
     
-    # Step 2: Clean data
-    cleaned_data = clean_data(raw_data)
+    # Step 1: Load raw data
+    with telemetry.step("load_raw_data") as step:
+        raw_data = load_raw_data(bucket, date_prefix, raw_table)
+        step.rows = raw_data["total_records"]
     
-    # Step 3: Engineer features
-    processed_data = engineer_features(cleaned_data)
+    # Step 2: Validate quality trên raw data (trước cleaning)
+    with telemetry.step("validate_data_quality") as step:
+        quality_report = validate_data_quality(raw_data)
+        step.rows = raw_data["total_records"]
     
-    # Step 4: Validate quality
-    quality_report = validate_data_quality(processed_data)
+    # Step 3: Clean data
+    with telemetry.step("clean_data") as step:
+        cleaned_data = clean_data(raw_data)
+        step.rows = raw_data["total_records"]
+    del raw_data  # giải phóng raw table trước các steps sau
+    quality_report["cleaning"] = cleaned_data["cleaning_stats"]
     
     if not quality_report["passed"]:
+        save_quality_reports(quality_report, bucket, date_prefix)
         logger.error("❌ Data quality validation failed!")
         raise ValueError("Data quality below threshold")
     
+    # Step 4: Engineer features
+    with telemetry.step("engineer_features") as step:
+        processed_data = engineer_features(cleaned_data)
+        del cleaned_data
+        quality_report["feature_stats"].update(engineered_feature_stats(processed_data))
+        report_keys = save_quality_reports(quality_report, bucket, date_prefix)
+        step.rows = processed_data["total_records"]
+    
     # Step 5: Save processed data
-    s3_key = save_processed_data(processed_data, bucket, date_prefix)
+    s3_key = None
+    if persist:
+        with telemetry.step("save_processed_data") as step:
+            s3_key = save_processed_data(processed_data, bucket, date_prefix)
+            step.rows = processed_data["total_records"]
+    
+    step_telemetry = telemetry.summary()
+    report_keys["telemetry"] = write_json(
+        bucket, f"telemetry/{date_prefix}/{component_name}.json", step_telemetry
+    )
     
     logger.info("=" * 60)
     logger.info("Data Processing Component - Completed")
-    logger.info(f"✅ Processed data saved: s3://{bucket}/{s3_key}")
+    if s3_key:
+        logger.info(f"✅ Processed data saved: s3://{bucket}/{s3_key}")
+    else:
+        logger.info("ℹ️  Processed data kept in memory (not persisted)")
     logger.info("=" * 60)
     
     return {
         "status": "success",
         "s3_key": s3_key,
         "quality_report": quality_report,
+        "report_keys": report_keys,
+        "telemetry": step_telemetry,
         "processed_data": processed_data
     }
 
 
+def main():
+    """Main entry point for data processing component."""
+    return run()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
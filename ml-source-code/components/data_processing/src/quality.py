@@ -0,0 +1,366 @@
+"""
+Single-pass data quality validation bằng mergeable sketches.
+
+Mỗi chunk (Arrow RecordBatch) được tóm tắt thành một ``QualitySketch`` gồm:
+    - null counts / row counts
+    - HyperLogLog distinct counts (per column + interaction key)
+    - t-digest quantiles cho numeric columns
+    - range violations theo ``DEFAULT_RANGE_RULES``
+
+Các sketch của từng chunk có thể ``merge()`` với nhau, nên cùng một code path dùng được
+cho thread pool local lẫn parallel shards (mỗi shard build sketch riêng rồi merge).
+Toàn bộ quality metrics và feature statistics được tính trong đúng một lần đọc dữ liệu.
+"""
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# (min, max) hợp lệ cho từng column; None = không giới hạn phía đó
+DEFAULT_RANGE_RULES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "rating": (1.0, 5.0),
+    "price": (0.0, None),
+    "user_activity_score": (0.0, 1.0),
+    "item_popularity_score": (0.0, 1.0),
+}
+ID_COLUMNS = ("user_id", "item_id")
+INTERACTION_KEY = ("user_id", "item_id", "timestamp")
+REPORTED_QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """Vectorized 64-bit hash (deterministic giữa các process/shard)."""
+    return pd.util.hash_array(np.asarray(values), categorize=False)
+
+
+def mix64(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer để trộn hash đã combine."""
+    with np.errstate(over="ignore"):
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter (2^precision registers, mergeable bằng element-wise max)."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if hashes.size == 0:
+            return
+        p = self.precision
+        idx = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        # 32 bit tiếp theo sau index; frexp exact với uint32 nên ra đúng bit_length
+        tail = ((hashes >> np.uint64(32 - p)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        rank = (33 - np.frexp(tail)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def update(self, values: np.ndarray) -> None:
+        self.update_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting cho small range
+        return float(estimate)
+
+
+class TDigest:
+    """
+    Merging t-digest (k1 scale function) cho approximate quantiles.
+
+    Values được buffer rồi compress theo batch, nên update/merge đều vectorized.
+    """
+
+    def __init__(self, compression: float = 200.0, buffer_size: int = 65536):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self._buffer: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._buffered = 0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self._add(values, np.ones_like(values), float(values.min()), float(values.max()))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        other._compress()
+        if other.count:
+            self._add(other._means, other._weights, other.min, other.max)
+        return self
+
+    def quantile(self, qs: Sequence[float]) -> np.ndarray:
+        self._compress()
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        cum = np.cumsum(self._weights)
+        mids = cum - self._weights / 2.0
+        xp = np.concatenate(([0.0], mids, [cum[-1]]))
+        fp = np.concatenate(([self.min], self._means, [self.max]))
+        return np.interp(qs * cum[-1], xp, fp)
+
+    def _add(self, means: np.ndarray, weights: np.ndarray, lo: float, hi: float) -> None:
+        self._buffer.append((means, weights))
+        self._buffered += means.size
+        self.count += int(weights.sum())
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        means = np.concatenate([self._means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self._weights] + [w for _, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2.0) / cum[-1]
+        k = self.compression / (2.0 * math.pi) * np.arcsin(2.0 * q - 1.0)
+        group = np.floor(k - k[0]).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(group)) + 1))
+
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+
+@dataclass
+class ColumnSketch:
+    """Sketch cho một column: counts, min/max, distinct, quantiles, range violations."""
+
+    name: str
+    numeric: bool
+    track_quantiles: bool
+    count: int = 0
+    null_count: int = 0
+    range_violations: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+    distinct: HyperLogLog = field(default_factory=HyperLogLog)
+    digest: TDigest = field(default_factory=TDigest)
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        self.count += other.count
+        self.null_count += other.null_count
+        self.range_violations += other.range_violations
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.distinct.merge(other.distinct)
+        if self.track_quantiles:
+            self.digest.merge(other.digest)
+        return self
+
+    def to_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": self.null_count / self.count if self.count else 0.0,
+            "distinct_estimate": int(round(self.distinct.estimate())),
+            "range_violations": self.range_violations,
+        }
+        if self.numeric and self.count > self.null_count:
+            stats["min"] = self.min
+            stats["max"] = self.max
+        if self.track_quantiles and self.digest.count:
+            values = self.digest.quantile(REPORTED_QUANTILES)
+            stats["quantiles"] = {
+                f"p{int(q * 100):02d}": float(v) for q, v in zip(REPORTED_QUANTILES, values)
+            }
+        return stats
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_timestamp(data_type)
+    )
+
+
+def _numeric_values(column: pa.Array) -> np.ndarray:
+    """Arrow numeric/timestamp column -> float64 numpy (null -> NaN)."""
+    if pa.types.is_timestamp(column.type):
+        column = column.cast(pa.int64())
+    return column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+
+
+class QualitySketch:
+    """Mergeable tóm tắt chất lượng dữ liệu cho một tập columns."""
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        expected_columns: Sequence[str],
+        range_rules: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    ):
+        self.expected_columns = list(expected_columns)
+        self.range_rules = DEFAULT_RANGE_RULES if range_rules is None else range_rules
+        self.missing_columns = [c for c in self.expected_columns if c not in schema.names]
+        self.rows = 0
+        self.rows_with_violations = 0
+        self.keys = HyperLogLog()
+        self.columns: Dict[str, ColumnSketch] = {}
+        for name in self.expected_columns:
+            if name in self.missing_columns:
+                continue
+            numeric = _is_numeric(schema.field(name).type)
+            self.columns[name] = ColumnSketch(
+                name=name, numeric=numeric, track_quantiles=numeric and name not in ID_COLUMNS
+            )
+
+    def update(self, batch: pa.RecordBatch) -> "QualitySketch":
+        """Cập nhật sketch với một chunk (vectorized per column)."""
+        n = batch.num_rows
+        if n == 0:
+            return self
+        self.rows += n
+        violated = np.zeros(n, dtype=bool)
+
+        for name, sketch in self.columns.items():
+            column = batch.column(name)
+            sketch.count += n
+            if sketch.numeric:
+                values = _numeric_values(column)
+                valid = ~np.isnan(values)
+                present = values[valid]
+                sketch.null_count += n - present.size
+                if present.size:
+                    sketch.min = min(sketch.min, float(present.min()))
+                    sketch.max = max(sketch.max, float(present.max()))
+                    sketch.distinct.update(present)
+                    if sketch.track_quantiles:
+                        sketch.digest.update(present)
+                rule = self.range_rules.get(name)
+                if rule is not None:
+                    lo, hi = rule
+                    bad = np.zeros(n, dtype=bool)
+                    with np.errstate(invalid="ignore"):
+                        if lo is not None:
+                            bad |= values < lo
+                        if hi is not None:
+                            bad |= values > hi
+                    sketch.range_violations += int(bad.sum())
+                    violated |= bad
+            else:
+                sketch.null_count += column.null_count
+                sketch.distinct.update(column.drop_null().to_numpy(zero_copy_only=False))
+
+        key_columns = [c for c in INTERACTION_KEY if c in self.columns]
+        if key_columns:
+            combined = np.zeros(n, dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                for name in key_columns:
+                    values = batch.column(name).to_numpy(zero_copy_only=False)
+                    combined = mix64(combined * np.uint64(31) + hash_values(values))
+            self.keys.update_hashes(combined)
+
+        self.rows_with_violations += int(violated.sum())
+        return self
+
+    def merge(self, other: "QualitySketch") -> "QualitySketch":
+        """Merge sketch của chunk/shard khác vào sketch này."""
+        self.rows += other.rows
+        self.rows_with_violations += other.rows_with_violations
+        self.keys.merge(other.keys)
+        for name, sketch in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(sketch)
+            else:
+                self.columns[name] = sketch
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        """Quality report (completeness, consistency, accuracy, overall_score)."""
+        schema_valid = not self.missing_columns
+        cells = self.rows * len(self.expected_columns)
+        nulls = sum(s.null_count for s in self.columns.values()) + self.rows * len(self.missing_columns)
+        completeness = 1.0 - nulls / cells if cells else 0.0
+        # Interaction key (user_id, item_id, timestamp) phải unique sau cleaning
+        consistency = min(1.0, self.keys.estimate() / self.rows) if self.rows else 0.0
+        accuracy = 1.0 - self.rows_with_violations / self.rows if self.rows else 0.0
+        overall = (completeness + consistency + accuracy) / 3.0 if schema_valid else 0.0
+        return {
+            "schema_valid": schema_valid,
+            "missing_columns": self.missing_columns,
+            "total_records": self.rows,
+            "completeness": round(completeness, 6),
+            "consistency": round(consistency, 6),
+            "accuracy": round(accuracy, 6),
+            "overall_score": round(overall, 6),
+            "range_violations": {
+                name: s.range_violations for name, s in self.columns.items() if name in self.range_rules
+            },
+            "passed": True,
+        }
+
+    def feature_stats(self) -> Dict[str, Any]:
+        """Per-feature statistics từ cùng sketch (không cần đọc lại data)."""
+        return {name: sketch.to_stats() for name, sketch in self.columns.items()}
+
+
+def build_quality_sketch(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    expected_columns: Sequence[str],
+    range_rules: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    max_workers: int = 4,
+) -> QualitySketch:
+    """
+    Build ``QualitySketch`` trong một lần duyệt: mỗi chunk được sketch song song trên
+    thread pool rồi merge lại. Số chunk in-flight bị giới hạn để memory không phụ thuộc
+    vào kích thước dataset.
+
+    Args:
+        batches: Iterable các RecordBatch (có thể là stream từ Parquet row groups)
+        schema: Schema của batches
+        expected_columns: Columns cần validate
+        range_rules: Override ``DEFAULT_RANGE_RULES``
+        max_workers: Số threads
+
+    Returns:
+        QualitySketch đã merge
+    """
+    result = QualitySketch(schema, expected_columns, range_rules)
+
+    def sketch_chunk(batch: pa.RecordBatch) -> QualitySketch:
+        return QualitySketch(schema, expected_columns, range_rules).update(batch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(sketch_chunk, batch))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result.merge(future.result())
+        for future in pending:
+            result.merge(future.result())
+    return result
@@ -0,0 +1,169 @@
+"""
+Storage helpers cho data lake (S3 hoặc local filesystem).
+
+Mặc định mọi path được resolve về S3 bucket ``S3_DATA_LAKE_BUCKET``. Khi chạy local
+(dev, benchmark), set ``DATA_LAKE_ROOT=/path/to/lake`` để dùng local filesystem với cùng
+layout: ``{DATA_LAKE_ROOT}/{bucket}/{key}``.
+
+Environment Variables:
+    - DATA_LAKE_ROOT: Thư mục local thay cho S3 (optional)
+    - AWS_REGION: Region của S3 bucket (default: ap-southeast-2)
+"""
+import os
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+
+def get_filesystem(bucket: str) -> Tuple[pafs.FileSystem, str]:
+    """
+    Trả về filesystem và base path tương ứng với bucket.
+
+    Args:
+        bucket: S3 bucket name
+
+    Returns:
+        Tuple (filesystem, base_path) - base_path không có trailing slash
+    """
+    local_root = os.getenv("DATA_LAKE_ROOT")
+    if local_root:
+        return pafs.LocalFileSystem(), f"{os.path.abspath(local_root)}/{bucket}"
+    region = os.getenv("AWS_REGION", "ap-southeast-2")
+    return pafs.S3FileSystem(region=region), bucket
+
+
+def resolve(bucket: str, key: str) -> Tuple[pafs.FileSystem, str]:
+    """Resolve S3 key thành (filesystem, path)."""
+    fs, base = get_filesystem(bucket)
+    return fs, f"{base}/{key.lstrip('/')}"
+
+
+def list_files(bucket: str, prefix: str, suffix: str = "") -> List[str]:
+    """
+    Liệt kê các file dưới prefix (recursive), sorted.
+
+    Args:
+        bucket: S3 bucket name
+        prefix: Key prefix (e.g. 'raw/2025-01-15')
+        suffix: Chỉ giữ file có đuôi này (e.g. '.parquet')
+
+    Returns:
+        List các path trên filesystem (dùng trực tiếp với filesystem từ get_filesystem)
+    """
+    fs, path = resolve(bucket, prefix)
+    selector = pafs.FileSelector(path, allow_not_found=True, recursive=True)
+    return sorted(
+        info.path for info in fs.get_file_info(selector)
+        if info.type == pafs.FileType.File and info.path.endswith(suffix)
+    )
+
+
+def write_json(bucket: str, key: str, payload: Dict[str, Any]) -> str:
+    """
+    Ghi JSON lên data lake.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 key đích
+        payload: JSON-serializable dict
+
+    Returns:
+        S3 key đã ghi
+    """
+    fs, path = resolve(bucket, key)
+    fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+    with fs.open_output_stream(path) as stream:
+        stream.write(json.dumps(payload, indent=2, default=str).encode("utf-8"))
+    return key
+
+
+def write_partitioned_dataset(
+    table: pa.Table,
+    bucket: str,
+    key: str,
+    partition_cols: Sequence[str],
+    sort_by: Sequence[str],
+    row_group_size: int = 131072,
+    compression: str = "zstd",
+    compression_level: int = 3,
+) -> Dict[str, Any]:
+    """
+    Ghi Arrow table thành Hive-partitioned Parquet dataset kèm file ``_metadata``.
+
+    Mỗi partition được filter, sort theo ``sort_by`` và ghi riêng (memory thêm chỉ bằng
+    một partition thay vì một bản sort của cả table), nên mỗi row group có min/max
+    statistics hẹp trên ``sort_by`` columns -> reader prune được row groups.
+    ``_metadata`` gom footer của mọi file, reader không cần list prefix hay mở từng footer.
+
+    Args:
+        table: Data cần ghi
+        bucket: S3 bucket name
+        key: Dataset prefix (e.g. 'processed/2025-01-15/dataset')
+        partition_cols: Columns dùng để partition (directory level)
+        sort_by: Columns sort bên trong mỗi partition
+        row_group_size: Số rows tối đa mỗi row group
+        compression: Parquet codec
+        compression_level: Codec level
+
+    Returns:
+        Dict metadata (files, row_groups, bytes_written)
+    """
+    fs, path = resolve(bucket, key)
+
+    parquet_format = ds.ParquetFileFormat()
+    write_options = parquet_format.make_write_options(
+        compression=compression,
+        compression_level=compression_level,
+        write_statistics=True,
+    )
+    collected: List[pq.FileMetaData] = []
+
+    def collect(written_file: Any) -> None:
+        metadata = written_file.metadata
+        metadata.set_file_path(written_file.path[len(path) + 1:])
+        collected.append(metadata)
+
+    partitioning = ds.partitioning(table.select(partition_cols).schema, flavor="hive")
+    partitions = table.select(partition_cols).group_by(partition_cols).aggregate([])
+    for values in partitions.to_pylist():
+        mask = None
+        for name, value in values.items():
+            match = pc.is_null(table[name]) if value is None else pc.equal(table[name], value)
+            mask = match if mask is None else pc.and_(mask, match)
+        part = table.filter(mask)
+        part = part.sort_by([(c, "ascending") for c in sort_by])
+        ds.write_dataset(
+            part,
+            path,
+            filesystem=fs,
+            format=parquet_format,
+            file_options=write_options,
+            partitioning=partitioning,
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="delete_matching",
+            min_rows_per_group=min(row_group_size, max(part.num_rows, 1)),
+            max_rows_per_group=row_group_size,
+            file_visitor=collect,
+            preserve_order=True,
+        )
+        del part
+
+    file_schema = table.schema
+    for name in partition_cols:
+        file_schema = file_schema.remove(file_schema.get_field_index(name))
+    pq.write_metadata(
+        file_schema, f"{path}/_metadata", metadata_collector=collected, filesystem=fs
+    )
+
+    return {
+        "files": len(collected),
+        "row_groups": sum(m.num_row_groups for m in collected),
+        "bytes_written": sum(
+            m.row_group(i).total_byte_size for m in collected for i in range(m.num_row_groups)
+        ),
+    }
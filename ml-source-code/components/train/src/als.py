@@ -0,0 +1,332 @@
+"""
+Implicit-feedback matrix factorization bằng Alternating Least Squares (Hu, Koren, Volinsky 2008).
+
+Interactions được gom thành CSR matrix users x items (float32, duplicates cộng dồn) với
+confidence ``c_ui = 1 + alpha * r_ui`` và preference ``p_ui = 1`` trên các ô quan sát được.
+Mỗi half-step giải ``(Y^T C_u Y + lambda I) x_u = Y^T C_u p_u`` cho mọi user bằng vài bước
+conjugate gradient (warm start từ factors hiện tại), dùng trick
+``Y^T C_u Y = Y^T Y + Y^T (C_u - I) Y`` nên chỉ phải chạm vào nnz của từng row.
+
+Rows được chia thành blocks có ~``block_nnz`` nonzeros; mỗi block được giải vectorized
+(gather + sparse matmul, không có Python loop theo user) và các blocks chạy song song trên
+thread pool (numpy/scipy nhả GIL trong các kernels này). Memory ngoài CSR + transpose và
+factors chỉ là O(block_nnz * factors) mỗi thread.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+from scipy import sparse
+
+from .resources import available_cpus
+
+DEFAULT_FACTORS = 64
+DEFAULT_REGULARIZATION = 0.01
+DEFAULT_ITERATIONS = 15
+DEFAULT_ALPHA = 1.0
+DEFAULT_CG_STEPS = 3
+BLOCK_NNZ = 1 << 18
+
+
+@dataclass
+class InteractionMatrix:
+    """CSR matrix users x items cùng mapping index -> raw id (sorted)."""
+
+    user_ids: np.ndarray
+    item_ids: np.ndarray
+    matrix: sparse.csr_matrix
+
+    @property
+    def nnz(self) -> int:
+        return int(self.matrix.nnz)
+
+
+def build_interaction_matrices(
+    batches: Iterable[Tuple[pa.RecordBatch, np.ndarray]],
+    num_rows: int,
+    names: Sequence[str],
+    weight_column: Optional[str] = "rating",
+) -> Dict[str, InteractionMatrix]:
+    """
+    Gom interactions đang stream thành một CSR matrix cho mỗi split (chung index space).
+
+    Chỉ giữ các numpy arrays preallocated (user, item, weight, split code) thay vì
+    DataFrame hay một bản copy dataset cho mỗi split; ids được encode một lần bằng
+    ``np.unique`` (index int32), duplicates (user, item) được cộng dồn. Các splits sau
+    split đầu tiên (held-out) bỏ các cặp (user, item) đã có trong split đầu tiên.
+
+    Args:
+        batches: (RecordBatch có user_id, item_id [, weight_column], split codes int8)
+        num_rows: Số rows tối đa (để preallocate)
+        names: Tên các splits theo code (code i -> names[i])
+        weight_column: Column làm weight r_ui (None: mọi interaction weight 1)
+
+    Returns:
+        Dict split name -> InteractionMatrix
+    """
+    users = np.empty(num_rows, dtype=np.int64)
+    items = np.empty(num_rows, dtype=np.int64)
+    weights = np.ones(num_rows, dtype=np.float32)
+    codes = np.empty(num_rows, dtype=np.int8)
+    offset = 0
+    for batch, batch_codes in batches:
+        end = offset + batch.num_rows
+        users[offset:end] = batch.column("user_id").to_numpy(zero_copy_only=False)
+        items[offset:end] = batch.column("item_id").to_numpy(zero_copy_only=False)
+        if weight_column is not None:
+            weights[offset:end] = (
+                batch.column(weight_column).fill_null(1.0).to_numpy(zero_copy_only=False)
+            )
+        codes[offset:end] = batch_codes
+        offset = end
+
+    user_ids, user_index = np.unique(users[:offset], return_inverse=True)
+    del users
+    item_ids, item_index = np.unique(items[:offset], return_inverse=True)
+    del items
+    user_index = user_index.astype(np.int32)
+    item_index = item_index.astype(np.int32)
+    codes = codes[:offset]
+
+    matrices: Dict[str, InteractionMatrix] = {}
+    for code, name in enumerate(names):
+        mask = codes == code
+        matrix = sparse.csr_matrix(
+            (weights[:offset][mask], (user_index[mask], item_index[mask])),
+            shape=(user_ids.size, item_ids.size),
+            dtype=np.float32,
+        )
+        matrix.sum_duplicates()
+        if code > 0:
+            first = matrices[names[0]].matrix
+            matrix = matrix - matrix.multiply(first > 0)
+            matrix.eliminate_zeros()
+            matrix = matrix.tocsr()
+        matrices[name] = InteractionMatrix(user_ids=user_ids, item_ids=item_ids, matrix=matrix)
+    return matrices
+
+
+def build_interaction_matrix(
+    batches: Iterable[pa.RecordBatch],
+    num_rows: int,
+    weight_column: Optional[str] = "rating",
+) -> InteractionMatrix:
+    """Gom interactions đang stream thành một CSR matrix (không split)."""
+    source = ((batch, np.zeros(batch.num_rows, dtype=np.int8)) for batch in batches)
+    return build_interaction_matrices(source, num_rows, ["all"], weight_column)["all"]
+
+
+def row_blocks(indptr: np.ndarray, block_nnz: int = BLOCK_NNZ) -> List[Tuple[int, int]]:
+    """Chia rows thành các khoảng [start, end) có ~block_nnz nonzeros."""
+    n_rows = indptr.size - 1
+    cuts = np.searchsorted(indptr, np.arange(block_nnz, int(indptr[-1]), block_nnz))
+    edges = np.unique(np.concatenate(([0], cuts, [n_rows])))
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def _block(
+    confidence: sparse.csr_matrix, start: int, end: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(indptr local, column indices, c - 1) của rows [start, end)."""
+    lo, hi = confidence.indptr[start], confidence.indptr[end]
+    indptr = confidence.indptr[start:end + 1] - lo
+    return indptr, confidence.indices[lo:hi], confidence.data[lo:hi]
+
+
+class ImplicitALS:
+    """
+    Implicit ALS với blocked conjugate-gradient solves trên thread pool.
+
+    Args:
+        factors: Số latent factors
+        regularization: L2 regularization lambda
+        iterations: Số vòng alternating (users rồi items)
+        alpha: Confidence scaling, c_ui = 1 + alpha * r_ui
+        cg_steps: Số bước conjugate gradient mỗi half-step
+        block_nnz: Số nonzeros mỗi block (giới hạn memory mỗi thread)
+        max_workers: Số threads (default: available_cpus(), CPUs của pod theo cgroup quota)
+        seed: Random seed khởi tạo factors
+    """
+
+    def __init__(
+        self,
+        factors: int = DEFAULT_FACTORS,
+        regularization: float = DEFAULT_REGULARIZATION,
+        iterations: int = DEFAULT_ITERATIONS,
+        alpha: float = DEFAULT_ALPHA,
+        cg_steps: int = DEFAULT_CG_STEPS,
+        block_nnz: int = BLOCK_NNZ,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.factors = factors
+        self.regularization = regularization
+        self.iterations = iterations
+        self.alpha = alpha
+        self.cg_steps = cg_steps
+        self.block_nnz = block_nnz
+        self.max_workers = max_workers
+        self.seed = seed
+        self.user_ids: Optional[np.ndarray] = None
+        self.item_ids: Optional[np.ndarray] = None
+        self.user_factors: Optional[np.ndarray] = None
+        self.item_factors: Optional[np.ndarray] = None
+        self.history: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_hyperparameters(
+        cls, hyperparameters: Dict[str, Any], **overrides: Any
+    ) -> "ImplicitALS":
+        """Tạo model từ HYPERPARAMETERS dict (keys thiếu dùng defaults)."""
+        params = {
+            "factors": int(hyperparameters.get("factors", DEFAULT_FACTORS)),
+            "regularization": float(hyperparameters.get("regularization", DEFAULT_REGULARIZATION)),
+            "iterations": int(hyperparameters.get("iterations", DEFAULT_ITERATIONS)),
+            "alpha": float(hyperparameters.get("alpha", DEFAULT_ALPHA)),
+            "cg_steps": int(hyperparameters.get("cg_steps", DEFAULT_CG_STEPS)),
+            "seed": hyperparameters.get("seed"),
+        }
+        params.update(overrides)
+        return cls(**params)
+
+    def fit(
+        self,
+        interactions: InteractionMatrix,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> "ImplicitALS":
+        """
+        Train factors trên interaction matrix.
+
+        Factors đã có (warm start, checkpoint) được giữ nếu đúng shape; nếu ``history`` đã
+        có k iterations (resume từ checkpoint) thì chỉ chạy tiếp từ iteration k + 1.
+
+        Args:
+            interactions: CSR interactions (weights r_ui)
+            callback: Gọi sau mỗi iteration với {"iteration", "loss", "seconds"}
+
+        Returns:
+            self
+        """
+        self.user_ids, self.item_ids = interactions.user_ids, interactions.item_ids
+        # Lưu c - 1 = alpha * r: phần "I" của C_u đã nằm trong Y^T Y
+        cui = interactions.matrix.astype(np.float32, copy=True)
+        cui.data *= np.float32(self.alpha)
+        ciu = cui.T.tocsr()
+
+        rng = np.random.default_rng(self.seed)
+        n_users, n_items = cui.shape
+        initialized = False
+        if self.user_factors is None or self.user_factors.shape != (n_users, self.factors):
+            self.user_factors = self._init_factors(rng, n_users)
+            initialized = True
+        if self.item_factors is None or self.item_factors.shape != (n_items, self.factors):
+            self.item_factors = self._init_factors(rng, n_items)
+            initialized = True
+        if initialized and self.history:
+            # History thuộc về factors khác (không khớp shape) -> không resume, train từ đầu
+            self.history = []
+
+        user_blocks = row_blocks(cui.indptr, self.block_nnz)
+        item_blocks = row_blocks(ciu.indptr, self.block_nnz)
+        with ThreadPoolExecutor(max_workers=self.max_workers or available_cpus()) as executor:
+            for iteration in range(len(self.history) + 1, self.iterations + 1):
+                started = time.perf_counter()
+                self._solve(executor, cui, user_blocks, self.user_factors, self.item_factors)
+                self._solve(executor, ciu, item_blocks, self.item_factors, self.user_factors)
+                seconds = time.perf_counter() - started
+                step = {
+                    "iteration": iteration,
+                    "loss": self._loss(executor, cui, user_blocks),
+                    "seconds": round(seconds, 4),
+                }
+                self.history.append(step)
+                if callback is not None:
+                    callback(step)
+        return self
+
+    def _init_factors(self, rng: np.random.Generator, n_rows: int) -> np.ndarray:
+        return (rng.standard_normal((n_rows, self.factors), dtype=np.float32) * 0.01)
+
+    def _solve(
+        self,
+        executor: ThreadPoolExecutor,
+        confidence: sparse.csr_matrix,
+        blocks: List[Tuple[int, int]],
+        X: np.ndarray,
+        Y: np.ndarray,
+    ) -> None:
+        """Cập nhật X (in place) với Y cố định."""
+        gram = Y.T @ Y
+        gram[np.diag_indices_from(gram)] += np.float32(self.regularization)
+        list(executor.map(lambda b: self._solve_block(confidence, b, X, Y, gram), blocks))
+
+    def _solve_block(
+        self,
+        confidence: sparse.csr_matrix,
+        block: Tuple[int, int],
+        X: np.ndarray,
+        Y: np.ndarray,
+        gram: np.ndarray,
+    ) -> None:
+        start, end = block
+        indptr, indices, extra = _block(confidence, start, end)
+        n_rows = end - start
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        Yi = Y[indices]
+
+        def weighted(values: np.ndarray) -> np.ndarray:
+            # sum_i values_ui * y_i cho từng row u
+            return sparse.csr_matrix((values, indices, indptr), shape=(n_rows, Y.shape[0])) @ Y
+
+        def apply(v: np.ndarray) -> np.ndarray:
+            # (Y^T Y + lambda I + Y^T (C_u - I) Y) v_u
+            return v @ gram + weighted(extra * np.einsum("ij,ij->i", Yi, v[rows]))
+
+        x = X[start:end]
+        r = weighted(1.0 + extra) - apply(x)
+        p = r.copy()
+        rs = np.einsum("ij,ij->i", r, r)
+        for _ in range(self.cg_steps):
+            Ap = apply(p)
+            denom = np.einsum("ij,ij->i", p, Ap)
+            step = np.divide(rs, denom, out=np.zeros_like(rs), where=denom > 0)
+            x += step[:, None] * p
+            r -= step[:, None] * Ap
+            rs_next = np.einsum("ij,ij->i", r, r)
+            beta = np.divide(rs_next, rs, out=np.zeros_like(rs), where=rs > 0)
+            p = r + beta[:, None] * p
+            rs = rs_next
+        X[start:end] = x
+
+    def _loss(
+        self,
+        executor: ThreadPoolExecutor,
+        cui: sparse.csr_matrix,
+        blocks: List[Tuple[int, int]],
+    ) -> float:
+        """
+        Weighted squared loss + L2, chuẩn hóa theo tổng confidence.
+
+        sum_{u,i} c_ui (p_ui - x_u.y_i)^2 = sum_all (x_u.y_i)^2
+            + sum_nnz [c_ui (1 - s_ui)^2 - s_ui^2]
+        với sum_all tính bằng <X^T X, Y^T Y> nên không phải duyệt toàn bộ matrix.
+        """
+        X, Y = self.user_factors, self.item_factors
+
+        def observed(block: Tuple[int, int]) -> float:
+            start, end = block
+            indptr, indices, extra = _block(cui, start, end)
+            rows = np.repeat(np.arange(start, end), np.diff(indptr))
+            s = np.einsum("ij,ij->i", X[rows], Y[indices], dtype=np.float64)
+            return float(np.sum((1.0 + extra) * (1.0 - s) ** 2 - s * s))
+
+        gram_x = (X.T @ X).astype(np.float64)
+        gram_y = (Y.T @ Y).astype(np.float64)
+        total = float(np.sum(gram_x * gram_y)) + sum(executor.map(observed, blocks))
+        total += self.regularization * (float(np.trace(gram_x)) + float(np.trace(gram_y)))
+        n_users, n_items = cui.shape
+        mass = float(cui.data.sum()) + n_users * n_items
+        return round(total / mass, 8)
@@ -0,0 +1,200 @@
+"""
+Compact model artifact format (memory-mappable) với optional float16 / int8 quantization.
+
+Layout (little-endian):
+    [0:8)    magic ``b"ALSMODL1"``
+    [8:16)   uint64 độ dài JSON header
+    [16:..)  JSON header {"format_version", "quantization", "arrays", "metadata"}
+    padding tới bội số của ``ALIGNMENT`` rồi các raw arrays (C-contiguous), mỗi array bắt
+    đầu ở offset aligned; header ghi dtype/shape/offset/nbytes của từng array.
+
+Reader mmap file và trả về ``np.frombuffer`` views trên mmap - không copy, không unpickle,
+nhiều processes (inference workers) dùng chung page cache. Quantization áp dụng cho
+embedding matrices (user_factors, item_factors):
+    - float16: cast trực tiếp (1/2 size)
+    - int8: symmetric per-row, ``q = round(x / scale)`` với ``scale = max|x_row| / 127``
+      (1/4 size + một float32 scale mỗi row, lưu trong array ``{name}.scale``)
+"""
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .storage import resolve
+
+MAGIC = b"ALSMODL1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+QUANTIZATIONS = ("none", "float16", "int8")
+EMBEDDINGS = ("user_factors", "item_factors")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def quantize(matrix: np.ndarray, quantization: str) -> Dict[str, np.ndarray]:
+    """Quantize một embedding matrix; trả về các arrays cần lưu (``""`` = data chính)."""
+    if quantization == "none":
+        return {"": np.ascontiguousarray(matrix, dtype=np.float32)}
+    if quantization == "float16":
+        return {"": np.ascontiguousarray(matrix, dtype=np.float16)}
+    if quantization == "int8":
+        scale = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+        safe = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        values = np.clip(np.rint(matrix / safe[:, None]), -127, 127).astype(np.int8)
+        return {"": values, ".scale": scale}
+    raise ValueError(f"Unknown quantization: {quantization} (expected one of {QUANTIZATIONS})")
+
+
+def encode_header(
+    arrays: Dict[str, np.ndarray], quantization: str, metadata: Dict[str, Any]
+) -> Tuple[bytes, Dict[str, Dict[str, Any]]]:
+    """
+    Header bytes (magic + length + JSON, đã pad) và layout của từng array.
+
+    Offsets trong layout tương đối với đầu vùng data (ngay sau header đã pad) nên header
+    không phụ thuộc vào độ dài của chính nó.
+    """
+    layout: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": int(array.nbytes),
+        }
+        offset = _align(offset + array.nbytes)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "quantization": quantization,
+        "arrays": layout,
+        "metadata": metadata,
+    }
+    body = json.dumps(header, default=str).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(body)) + body
+    data_start = _align(len(prefix))
+    return prefix + b"\0" * (data_start - len(prefix)), layout
+
+
+def write_artifact(
+    bucket: str,
+    key: str,
+    arrays: Dict[str, np.ndarray],
+    metadata: Optional[Dict[str, Any]] = None,
+    quantization: str = "none",
+) -> Dict[str, Any]:
+    """
+    Ghi artifact lên data lake (stream từng array, không ghép toàn bộ file trong memory).
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 key đích
+        arrays: Arrays của model; EMBEDDINGS được quantize
+        metadata: JSON metadata nhúng trong header
+        quantization: "none", "float16" hoặc "int8"
+
+    Returns:
+        Dict key, quantization, bytes
+    """
+    stored: Dict[str, np.ndarray] = {}
+    for name, array in arrays.items():
+        if name in EMBEDDINGS:
+            for suffix, part in quantize(array, quantization).items():
+                stored[f"{name}{suffix}"] = part
+        else:
+            stored[name] = np.ascontiguousarray(array)
+
+    header, layout = encode_header(stored, quantization, metadata or {})
+    fs, path = resolve(bucket, key)
+    fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+    written = 0
+    with fs.open_output_stream(path) as stream:
+        stream.write(header)
+        written += len(header)
+        for name, array in stored.items():
+            padding = layout[name]["offset"] + len(header) - written
+            stream.write(b"\0" * padding)
+            stream.write(memoryview(array.reshape(-1)).cast("B"))
+            written += padding + array.nbytes
+    return {"key": key, "quantization": quantization, "bytes": written}
+
+
+class ModelArtifact:
+    """
+    Read-only view (mmap) của một artifact.
+
+    ``array(name)`` trả về zero-copy view; ``factors(name)`` trả về float32 embedding
+    (zero-copy khi không quantize, dequantize khi float16/int8).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != MAGIC:
+            raise ValueError(f"Not a model artifact: {path}")
+        (length,) = struct.unpack("<Q", self._mmap[8:16])
+        header = json.loads(self._mmap[16:16 + length].decode("utf-8"))
+        if header["format_version"] > FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format version {header['format_version']}")
+        self._data_start = _align(16 + length)
+        self.quantization: str = header["quantization"]
+        self.layout: Dict[str, Dict[str, Any]] = header["arrays"]
+        self.metadata: Dict[str, Any] = header["metadata"]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self.layout[name]
+        dtype = np.dtype(spec["dtype"])
+        count = spec["nbytes"] // dtype.itemsize
+        return np.frombuffer(
+            self._mmap, dtype=dtype, count=count, offset=self._data_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    def factors(self, name: str) -> np.ndarray:
+        values = self.array(name)
+        if self.quantization == "int8":
+            return values.astype(np.float32) * self.array(f"{name}.scale")[:, None]
+        if values.dtype != np.float32:
+            return values.astype(np.float32)
+        return values
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "ModelArtifact":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def open_artifact(bucket: str, key: str, cache_dir: Optional[str] = None) -> ModelArtifact:
+    """
+    Mở artifact để mmap: local data lake được map trực tiếp, S3 được tải một lần vào
+    ``cache_dir`` (default: ARTIFACT_CACHE_DIR hoặc /tmp/model-cache) rồi map.
+    """
+    fs, path = resolve(bucket, key)
+    if os.getenv("DATA_LAKE_ROOT"):
+        return ModelArtifact(path)
+    cache_dir = cache_dir or os.getenv("ARTIFACT_CACHE_DIR", "/tmp/model-cache")
+    local_path = os.path.join(cache_dir, bucket, key)
+    if not os.path.exists(local_path):
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        tmp = f"{local_path}.{os.getpid()}.tmp"
+        with fs.open_input_stream(path) as source, open(tmp, "wb") as target:
+            while True:
+                chunk = source.read(1 << 24)
+                if not chunk:
+                    break
+                target.write(chunk)
+        os.replace(tmp, local_path)
+    return ModelArtifact(local_path)
@@ -0,0 +1,174 @@
+"""
+Size / quality report của model artifact theo từng quantization.
+
+So sánh full-precision factors của một artifact với bản float16 / int8:
+    - bytes: kích thước artifact (header + arrays) nếu ghi với quantization đó
+    - reconstruction_error: ||Q - F|| / ||F|| trên user và item factors
+    - topk_overlap: |top-K(Q) ∩ top-K(F)| / K trung bình trên sample users
+    - ndcg / ndcg_delta (khi có --date): NDCG@K trên test split của ngày đó
+
+Usage:
+    python -m src.artifact_report --model-key artifacts/2025-01-15/models/model_...alsm \
+        [--date 2025-01-15] [--k 10] [--sample-users 2000]
+
+Report (JSON) được in ra stdout.
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .artifact import EMBEDDINGS, QUANTIZATIONS, encode_header, open_artifact, quantize
+from .evaluation import DEFAULT_K, evaluate_ranking
+
+
+def _dequantize(parts: Dict[str, np.ndarray]) -> np.ndarray:
+    values = parts[""].astype(np.float32)
+    if ".scale" in parts:
+        values *= parts[".scale"][:, None]
+    return values
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def quantization_report(
+    arrays: Dict[str, np.ndarray],
+    quantization: str,
+    k: int = DEFAULT_K,
+    sample_users: int = 2000,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Size và sai số của một quantization so với full-precision arrays.
+
+    Args:
+        arrays: user_ids, item_ids, user_factors, item_factors (float32)
+        quantization: "none", "float16" hoặc "int8"
+        k: Cutoff K cho top-K overlap
+        sample_users: Số users dùng để so sánh top-K
+
+    Returns:
+        Dict bytes, reconstruction_error, topk_overlap và dequantized factors
+    """
+    stored: Dict[str, np.ndarray] = {}
+    factors: Dict[str, np.ndarray] = {}
+    errors: Dict[str, float] = {}
+    for name, array in arrays.items():
+        if name not in EMBEDDINGS:
+            stored[name] = array
+            continue
+        parts = quantize(array, quantization)
+        stored.update({f"{name}{suffix}": part for suffix, part in parts.items()})
+        factors[name] = _dequantize(parts)
+        norm = float(np.linalg.norm(array)) or 1.0
+        errors[name] = float(np.linalg.norm(factors[name] - array)) / norm
+
+    header, layout = encode_header(stored, quantization, {})
+    last = max(layout.values(), key=lambda spec: spec["offset"])
+    size = len(header) + last["offset"] + last["nbytes"]
+
+    rng = np.random.default_rng(seed)
+    n_users = arrays["user_factors"].shape[0]
+    users = rng.choice(n_users, size=min(sample_users, n_users), replace=False)
+    k = min(k, arrays["item_factors"].shape[0])
+    reference = _top_k(arrays["user_factors"][users] @ arrays["item_factors"].T, k)
+    candidate = _top_k(factors["user_factors"][users] @ factors["item_factors"].T, k)
+    overlap = (candidate[:, :, None] == reference[:, None, :]).any(axis=2).sum(axis=1) / k
+
+    return {
+        "bytes": int(size),
+        "reconstruction_error": {name: round(value, 6) for name, value in errors.items()},
+        "topk_overlap": round(float(overlap.mean()) if users.size else 1.0, 6),
+        "factors": factors,
+    }
+
+
+def _test_split(bucket: str, date_prefix: str):
+    """(train InteractionMatrix, test CSR) của ngày ``date_prefix``."""
+    from .main import load_processed_data, split_data
+
+    matrices = split_data(load_processed_data(bucket, date_prefix))["matrices"]
+    return matrices["train"], matrices["test"].matrix
+
+
+def _aligned(source_ids: np.ndarray, factors: np.ndarray, target_ids: np.ndarray) -> np.ndarray:
+    """Factors theo target ids; ids không có trong model nhận vector 0."""
+    aligned = np.zeros((target_ids.size, factors.shape[1]), dtype=np.float32)
+    if source_ids.size:
+        position = np.minimum(np.searchsorted(source_ids, target_ids), source_ids.size - 1)
+        matched = source_ids[position] == target_ids
+        aligned[matched] = factors[position[matched]]
+    return aligned
+
+
+def build_report(
+    bucket: str,
+    model_key: str,
+    date_prefix: Optional[str] = None,
+    k: int = DEFAULT_K,
+    sample_users: int = 2000,
+) -> Dict[str, Any]:
+    """Report cho mọi QUANTIZATIONS của một artifact (NDCG@K trên test split nếu có date)."""
+    with open_artifact(bucket, model_key) as artifact:
+        source_quantization = artifact.quantization
+        arrays = {
+            "user_ids": np.array(artifact.array("user_ids")),
+            "item_ids": np.array(artifact.array("item_ids")),
+            "user_factors": np.array(artifact.factors("user_factors")),
+            "item_factors": np.array(artifact.factors("item_factors")),
+        }
+
+    split = _test_split(bucket, date_prefix) if date_prefix else None
+    report: Dict[str, Any] = {
+        "model_key": model_key,
+        "source_quantization": source_quantization,
+        "users": int(arrays["user_ids"].size),
+        "items": int(arrays["item_ids"].size),
+        "factors": int(arrays["item_factors"].shape[1]),
+        "k": k,
+        "quantizations": {},
+    }
+    for quantization in QUANTIZATIONS:
+        result = quantization_report(arrays, quantization, k=k, sample_users=sample_users)
+        factors = result.pop("factors")
+        if split is not None:
+            train, test = split
+            metrics = evaluate_ranking(
+                _aligned(arrays["user_ids"], factors["user_factors"], train.user_ids),
+                _aligned(arrays["item_ids"], factors["item_factors"], train.item_ids),
+                train.matrix, test, k=k,
+            )
+            result["ndcg"] = metrics["ndcg"]
+        report["quantizations"][quantization] = result
+
+    full = report["quantizations"]["none"]
+    for result in report["quantizations"].values():
+        result["size_ratio"] = round(result["bytes"] / full["bytes"], 4)
+        if "ndcg" in result:
+            result["ndcg_delta"] = round(result["ndcg"] - full["ndcg"], 6)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model artifact quantization report")
+    parser.add_argument("--model-key", required=True, help="S3 key của model artifact")
+    parser.add_argument(
+        "--bucket", default=os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
+    )
+    parser.add_argument("--date", help="Date prefix để đo NDCG@K trên test split")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--sample-users", type=int, default=2000)
+    args = parser.parse_args()
+
+    report = build_report(
+        args.bucket, args.model_key, args.date, k=args.k, sample_users=args.sample_users
+    )
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
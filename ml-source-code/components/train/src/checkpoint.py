@@ -0,0 +1,171 @@
+"""
+Checkpoint/resume và warm start cho ALS trainer.
+
+State của model (factors, id mappings, loss history) được serialize thành ``.npz``.
+    - Checkpoint: ghi mỗi ``CHECKPOINT_EVERY`` iterations vào
+      ``{artifacts}/{date}/checkpoints/als_{fingerprint}.npz`` (ghi file tạm rồi move để
+      không bao giờ để lại checkpoint dở dang). Fingerprint gồm hyperparameters, id
+      mappings của train matrix và warm-start source nên chỉ resume đúng lần train đó;
+      pod bị evict chạy lại sẽ tiếp tục từ iteration đã checkpoint.
+    - Warm start: factors của model nguồn (production) được căn theo ids của hôm nay -
+      users/items đã biết giữ factors cũ, users/items mới khởi tạo ngẫu nhiên - rồi chỉ
+      train thêm vài iterations.
+"""
+import hashlib
+import io
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .als import ImplicitALS, InteractionMatrix
+from .artifact import open_artifact
+from .storage import exists, resolve, read_bytes, write_bytes
+
+FINGERPRINT_KEYS = ("factors", "regularization", "alpha", "cg_steps", "seed")
+
+
+def serialize_model(model: ImplicitALS, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """Model state -> bytes (.npz, metadata JSON nhúng trong array ``state``)."""
+    state = {"history": model.history, "metadata": metadata or {}}
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        user_ids=model.user_ids,
+        item_ids=model.item_ids,
+        user_factors=model.user_factors,
+        item_factors=model.item_factors,
+        state=np.frombuffer(json.dumps(state, default=str).encode("utf-8"), dtype=np.uint8),
+    )
+    return buffer.getvalue()
+
+
+def deserialize_model(payload: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Bytes -> (arrays, state) với state = {"history", "metadata"}."""
+    with np.load(io.BytesIO(payload)) as archive:
+        arrays = {name: archive[name] for name in archive.files if name != "state"}
+        state = json.loads(archive["state"].tobytes().decode("utf-8"))
+    return arrays, state
+
+
+def fingerprint(
+    hyperparameters: Dict[str, Any],
+    interactions: InteractionMatrix,
+    warm_start_key: Optional[str] = None,
+) -> str:
+    """Fingerprint của một lần train (config + train matrix + warm-start source)."""
+    digest = hashlib.sha1()
+    config = {name: hyperparameters.get(name) for name in FINGERPRINT_KEYS}
+    digest.update(json.dumps([config, warm_start_key], sort_keys=True).encode("utf-8"))
+    digest.update(np.asarray(interactions.matrix.shape, dtype=np.int64).tobytes())
+    digest.update(np.int64(interactions.nnz).tobytes())
+    digest.update(interactions.user_ids.tobytes())
+    digest.update(interactions.item_ids.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def checkpoint_key(artifacts_prefix: str, date_prefix: str, run_fingerprint: str) -> str:
+    return f"{artifacts_prefix}/{date_prefix}/checkpoints/als_{run_fingerprint}.npz"
+
+
+def save_checkpoint(bucket: str, key: str, model: ImplicitALS) -> str:
+    """Ghi checkpoint (file tạm rồi move)."""
+    write_bytes(bucket, f"{key}.tmp", serialize_model(model))
+    fs, path = resolve(bucket, key)
+    fs.move(f"{path}.tmp", path)
+    return key
+
+
+def restore_checkpoint(bucket: str, key: str, model: ImplicitALS) -> bool:
+    """
+    Nạp checkpoint vào model nếu có.
+
+    Số factors của model được lấy theo checkpoint (checkpoint của một lần warm start có thể
+    mang số factors của model nguồn, khác hyperparameters).
+
+    Returns:
+        True nếu đã resume (factors + history được khôi phục)
+    """
+    if not exists(bucket, key):
+        return False
+    arrays, state = deserialize_model(read_bytes(bucket, key))
+    user_factors, item_factors = arrays["user_factors"], arrays["item_factors"]
+    if (
+        user_factors.shape[1] != item_factors.shape[1]
+        or user_factors.shape[0] != arrays["user_ids"].size
+        or item_factors.shape[0] != arrays["item_ids"].size
+    ):
+        raise ValueError(
+            f"Inconsistent checkpoint {key}: user factors {user_factors.shape}, "
+            f"item factors {item_factors.shape}"
+        )
+    model.user_ids, model.item_ids = arrays["user_ids"], arrays["item_ids"]
+    model.user_factors, model.item_factors = user_factors, item_factors
+    model.factors = user_factors.shape[1]
+    model.history = state["history"]
+    return True
+
+
+def align_factors(
+    source_ids: np.ndarray,
+    source_factors: np.ndarray,
+    target_ids: np.ndarray,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, int]:
+    """
+    Căn factors của model nguồn theo ids đích (cả hai sorted).
+
+    Returns:
+        Tuple (factors theo target_ids, số ids tìm thấy trong nguồn)
+    """
+    factors = (rng.standard_normal((target_ids.size, source_factors.shape[1]), dtype=np.float32)
+               * 0.01)
+    if source_ids.size == 0:
+        return factors, 0
+    position = np.minimum(np.searchsorted(source_ids, target_ids), source_ids.size - 1)
+    matched = source_ids[position] == target_ids
+    factors[matched] = source_factors[position[matched]]
+    return factors, int(matched.sum())
+
+
+def load_model_arrays(bucket: str, model_key: str) -> Dict[str, np.ndarray]:
+    """Ids + float32 factors của model artifact (``.npz`` cũ hoặc artifact format mới)."""
+    if model_key.endswith(".npz"):
+        arrays, _ = deserialize_model(read_bytes(bucket, model_key))
+        return arrays
+    with open_artifact(bucket, model_key) as artifact:
+        # Copy ra khỏi mmap trước khi đóng artifact
+        return {
+            "user_ids": np.array(artifact.array("user_ids")),
+            "item_ids": np.array(artifact.array("item_ids")),
+            "user_factors": np.array(artifact.factors("user_factors")),
+            "item_factors": np.array(artifact.factors("item_factors")),
+        }
+
+
+def warm_start(
+    model: ImplicitALS, bucket: str, model_key: str, interactions: InteractionMatrix
+) -> Dict[str, Any]:
+    """
+    Khởi tạo factors của model từ model nguồn (production).
+
+    Số factors của model được đổi theo model nguồn nếu khác hyperparameters.
+
+    Returns:
+        Dict source, users_matched, items_matched, factors
+    """
+    arrays = load_model_arrays(bucket, model_key)
+    rng = np.random.default_rng(model.seed)
+    model.user_factors, users_matched = align_factors(
+        arrays["user_ids"], arrays["user_factors"], interactions.user_ids, rng
+    )
+    model.item_factors, items_matched = align_factors(
+        arrays["item_ids"], arrays["item_factors"], interactions.item_ids, rng
+    )
+    model.factors = model.item_factors.shape[1]
+    return {
+        "source": model_key,
+        "users_matched": users_matched,
+        "items_matched": items_matched,
+        "factors": model.factors,
+    }
@@ -0,0 +1,192 @@
+"""
+Batched ranking evaluation (Recall@K, NDCG@K, MAP@K, catalogue coverage).
+
+Users được score theo batch bằng một matmul ``U_batch @ V^T``; các items đã có trong train
+bị mask (-inf), top-K lấy bằng ``argpartition`` rồi chỉ sort K phần tử. Hits được tra
+vectorized: key ``row * n_items + item`` của top-K được ``searchsorted`` trên keys (đã
+sorted) của held-out CSR nên không cần dense relevance matrix. Các batches chạy song song
+trên thread pool (default: ``available_cpus()``); batch size được giới hạn để tổng số phần
+tử score của mọi threads không vượt ``SCORE_BUDGET`` (mỗi thread còn giữ bản copy
+``-scores`` và kết quả ``argpartition`` cùng kích thước).
+
+Định nghĩa (trung bình trên users có held-out items):
+    - Recall@K = hits / min(K, |relevant|)
+    - NDCG@K = DCG / IDCG với gain nhị phân, discount 1 / log2(rank + 1)
+    - MAP@K = sum_k P@k * rel_k / min(K, |relevant|)
+    - Coverage = số items xuất hiện trong ít nhất một top-K / số items
+    - Sampled AUC = P(score(positive) > score(negative)) với negatives từ NegativeSampler
+      (ties tính 0.5), trung bình trên các held-out (user, item) pairs
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .resources import available_cpus
+from .sampling import NegativeSampler
+
+DEFAULT_K = 10
+DEFAULT_BATCH_SIZE = 2048
+SCORE_BUDGET = 1 << 24
+
+
+def _ranking_block(
+    user_factors: np.ndarray,
+    item_factors: np.ndarray,
+    train: sparse.csr_matrix,
+    heldout: sparse.csr_matrix,
+    users: np.ndarray,
+    k: int,
+    discounts: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Recall/NDCG/AP cho một batch users và các items được recommend."""
+    n_items = item_factors.shape[0]
+    scores = user_factors[users] @ item_factors.T
+
+    seen = train[users]
+    scores[np.repeat(np.arange(users.size), np.diff(seen.indptr)), seen.indices] = -np.inf
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+
+    relevant = heldout[users]
+    relevant.sort_indices()
+    relevant_keys = (
+        np.repeat(np.arange(users.size, dtype=np.int64), np.diff(relevant.indptr)) * n_items
+        + relevant.indices
+    )
+    top_keys = np.arange(users.size, dtype=np.int64)[:, None] * n_items + top
+    position = np.minimum(np.searchsorted(relevant_keys, top_keys), relevant_keys.size - 1)
+    hits = (relevant_keys[position] == top_keys).astype(np.float64)
+
+    n_relevant = np.diff(relevant.indptr)
+    denominator = np.minimum(n_relevant, k)
+    recall = hits.sum(axis=1) / denominator
+    dcg = (hits * discounts).sum(axis=1)
+    ndcg = dcg / np.cumsum(discounts)[denominator - 1]
+    precision_at = np.cumsum(hits, axis=1) / np.arange(1, k + 1)
+    average_precision = (precision_at * hits).sum(axis=1) / denominator
+    return recall, ndcg, average_precision, top.ravel()
+
+
+def evaluate_ranking(
+    user_factors: np.ndarray,
+    item_factors: np.ndarray,
+    train: sparse.csr_matrix,
+    heldout: sparse.csr_matrix,
+    k: int = DEFAULT_K,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sample_users: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Ranking metrics của factor model trên held-out interactions.
+
+    Args:
+        user_factors: (n_users, f) factors
+        item_factors: (n_items, f) factors
+        train: CSR interactions đã thấy khi train (bị mask khỏi ranking)
+        heldout: CSR interactions held-out (relevance)
+        k: Cutoff K
+        batch_size: Số users tối đa mỗi batch
+        sample_users: Chỉ đánh giá ngẫu nhiên N users (None: tất cả)
+        max_workers: Số threads (default: available_cpus())
+        seed: Random seed cho user sampling
+
+    Returns:
+        Dict recall, ndcg, map, coverage, k, users_evaluated
+    """
+    n_items = item_factors.shape[0]
+    k = min(k, n_items)
+    users = np.flatnonzero(np.diff(heldout.indptr) > 0)
+    if sample_users is not None and sample_users < users.size:
+        users = np.sort(np.random.default_rng(seed).choice(users, sample_users, replace=False))
+    if users.size == 0:
+        return {
+            "k": k, "recall": 0.0, "ndcg": 0.0, "map": 0.0, "coverage": 0.0, "users_evaluated": 0
+        }
+
+    workers = max_workers or available_cpus()
+    batch = max(1, min(batch_size, SCORE_BUDGET // (workers * max(n_items, 1))))
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    batches: List[np.ndarray] = [users[i:i + batch] for i in range(0, users.size, batch)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda b: _ranking_block(user_factors, item_factors, train, heldout, b, k, discounts),
+            batches,
+        ))
+
+    recall = np.concatenate([r[0] for r in results])
+    ndcg = np.concatenate([r[1] for r in results])
+    average_precision = np.concatenate([r[2] for r in results])
+    recommended = np.unique(np.concatenate([r[3] for r in results]))
+    return {
+        "k": k,
+        "recall": round(float(recall.mean()), 6),
+        "ndcg": round(float(ndcg.mean()), 6),
+        "map": round(float(average_precision.mean()), 6),
+        "coverage": round(recommended.size / n_items, 6),
+        "users_evaluated": int(users.size),
+    }
+
+
+def popularity_factors(train: sparse.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """Rank-1 factors của popularity baseline (mọi user cùng ranking theo số interactions)."""
+    popularity = np.asarray((train > 0).sum(axis=0), dtype=np.float32).reshape(-1, 1)
+    return np.ones((train.shape[0], 1), dtype=np.float32), popularity
+
+
+def sampled_auc(
+    user_factors: np.ndarray,
+    item_factors: np.ndarray,
+    heldout: sparse.csr_matrix,
+    sampler: NegativeSampler,
+    n_negatives: int = 100,
+    sample_pairs: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    AUC trên held-out positives với sampled negatives.
+
+    Args:
+        user_factors: (n_users, f) factors
+        item_factors: (n_items, f) factors
+        heldout: CSR interactions held-out (positives)
+        sampler: NegativeSampler (positives của nó bị loại khỏi negatives)
+        n_negatives: Số negatives mỗi positive
+        sample_pairs: Chỉ dùng ngẫu nhiên N held-out pairs (None: tất cả)
+
+    Returns:
+        Dict auc, negatives, pairs_evaluated
+    """
+    users = np.repeat(np.arange(heldout.shape[0], dtype=np.int64), np.diff(heldout.indptr))
+    items = heldout.indices.astype(np.int64)
+    if sample_pairs is not None and sample_pairs < users.size:
+        picked = np.sort(sampler.rng.choice(users.size, sample_pairs, replace=False))
+        users, items = users[picked], items[picked]
+    if users.size == 0:
+        return {"auc": 0.0, "negatives": n_negatives, "pairs_evaluated": 0}
+
+    # Chunk để (pairs x negatives x factors) không vượt SCORE_BUDGET; negatives được draw
+    # theo từng chunk nên memory là O(chunk x n_negatives), không phụ thuộc số pairs
+    chunk = max(1, SCORE_BUDGET // max(n_negatives * item_factors.shape[1], 1))
+    wins = 0.0
+    compared = 0
+    for start in range(0, users.size, chunk):
+        block_users = users[start:start + chunk]
+        u = user_factors[block_users]
+        positive = np.einsum("pf,pf->p", u, item_factors[items[start:start + chunk]])
+        block = sampler.sample(block_users, n_negatives)
+        valid = block >= 0
+        negative = np.einsum("pf,pnf->pn", u, item_factors[np.where(valid, block, 0)])
+        wins += float(
+            ((positive[:, None] > negative) + 0.5 * (positive[:, None] == negative))[valid].sum()
+        )
+        compared += int(valid.sum())
+    return {
+        "auc": round(wins / compared, 6) if compared else 0.0,
+        "negatives": n_negatives,
+        "pairs_evaluated": int(users.size),
+    }
@@ -8,7 +8,7 @@ Mục đích:
 Workflow:
     1. Load processed data từ S3 processed/{date}/ prefix
     2. Split data thành train/validation/test sets
-    3. Train model với hyperparameters được cấu hình
+    3. Train model với hyperparameters được cấu hình (optional: successive-halving search)
     4. Evaluate model trên validation và test sets
     5. Compare với baseline/production model
     6. Nếu model tốt hơn (metrics vượt threshold):
@@ -21,20 +21,24 @@ Workflow:
     8. Generate training report và metrics
 
 Input:
-    - Processed data từ S3: s3://{bucket}/processed/{date}/processed_data_*.parquet
-    - Hyperparameters: learning_rate, batch_size, epochs, etc.
+    - Processed data từ S3: s3://{bucket}/processed/{date}/dataset/ (partitioned Parquet + _metadata)
+    - Hyperparameters: factors, regularization, iterations, alpha (implicit ALS, xem src/als.py)
     - Baseline model metrics (để so sánh)
 
 Output:
-    - Model artifacts: s3://{bucket}/artifacts/{date}/models/model_{timestamp}.pkl
+    - Model artifacts: s3://{bucket}/artifacts/{date}/models/model_{timestamp}.alsm
+    - Checkpoints: s3://{bucket}/artifacts/{date}/checkpoints/als_{fingerprint}.npz
     - Model metadata: s3://{bucket}/artifacts/{date}/models/metadata.json
     - Training metrics: s3://{bucket}/artifacts/{date}/metrics.json
     - Training report: s3://{bucket}/artifacts/{date}/training_report.json
+    - Step telemetry (wall/CPU time, peak RSS, rows, I/O bytes; xem src/telemetry.py):
+      s3://{bucket}/telemetry/{date}/train.json
 
-Model Registry:
+Model Registry (s3://{bucket}/artifacts/model_registry/, xem src/registry.py):
+    - index.json giữ next_version và pointers latest theo status (lookup O(1))
     - Nếu model tốt: Register vào Model Registry với:
       - Model version (auto-increment)
-      - Metrics (accuracy, precision, recall, F1, etc.)
+      - Metrics (Recall@K, NDCG@K, MAP@K, coverage)
       - Model path trong S3
       - Training timestamp
       - Hyperparameters used
@@ -42,18 +46,51 @@ Model Registry:
 
 Environment Variables:
     - S3_DATA_LAKE_BUCKET: S3 bucket name for data lake
+    - DATE_PREFIX: Train trên ngày này (YYYY-MM-DD) thay vì ngày hiện tại (backfill, local runs)
+    - DATA_LAKE_ROOT: Dùng local directory thay cho S3 (local dev)
     - S3_ARTIFACTS_PREFIX: Prefix for model artifacts (default: artifacts)
     - HYPERPARAMETERS: JSON string với hyperparameters
+      (factors, regularization, iterations, alpha, cg_steps, seed)
+    - TRAIN_WORKERS: Số threads cho ALS solves và ranking evaluation (default: CPUs của pod theo
+      cgroup quota)
+    - SPLIT_MODE: "hash" (theo (user_id, timestamp), default) hoặc "time" (cutoffs)
+    - SPLIT_VALIDATION_START / SPLIT_TEST_START: ISO datetime cutoffs cho time mode
+      (default: điểm 70% / 85% của khoảng thời gian trong data)
+    - SPLIT_PREFETCH: Số batches đọc trước trên background thread (default: 4)
+    - CHECKPOINT_EVERY: Checkpoint model state mỗi N iterations, 0 để tắt (default: 5)
+    - MODEL_QUANTIZATION: Quantization của embeddings trong artifact: none | float16 | int8
+      (default: none)
+    - WARM_START: Warm start từ production model trong registry (default: false)
+    - WARM_START_MODEL_KEY: S3 key của model dùng để warm start (override WARM_START)
+    - WARM_START_ITERATIONS: Số iterations khi warm start (default: 3)
+    - SEARCH_SPACE: JSON search space, bật hyperparameter search (xem src/search.py), e.g.
+      {"factors": [32, 64, 128], "regularization": {"min": 0.001, "max": 1.0, "log": true}}
+    - SEARCH_TRIALS: Số configs được sample (default: 27)
+    - SEARCH_ETA: Hệ số successive halving (default: 3)
+    - SEARCH_MIN_ITERATIONS: Budget (ALS iterations) của rung đầu (default: 2)
+    - SEARCH_WORKERS: Số processes (default: CPUs của pod theo cgroup quota)
+    - SEARCH_SEED: Random seed khi sample configs (default: 0)
     - MODEL_REGISTRY_ENABLED: Enable model registry (default: true)
-    - BASELINE_METRICS: JSON string với baseline model metrics
+    - BASELINE_METRICS: JSON string với baseline model metrics ({"ndcg", "recall", "map"};
+      default: test metrics của production model trong registry, nếu chưa có thì
+      popularity baseline trên cùng test split)
+    - EVAL_TOP_K: Cutoff K cho ranking metrics (default: 10)
+    - EVAL_SAMPLE_USERS: Chỉ evaluate N users ngẫu nhiên (default: tất cả)
+    - EVAL_AUC_NEGATIVES: Số sampled negatives mỗi test positive cho sampled AUC
+      (default: 100, 0 để tắt)
+    - EVAL_AUC_MAX_PAIRS: Sampled AUC chỉ dùng tối đa N held-out pairs ngẫu nhiên
+      (default: 200000, 0 = tất cả)
+    - EVAL_NEGATIVE_SAMPLING: uniform | popularity (default: uniform, xem src/sampling.py)
     - METRIC_THRESHOLD: Minimum improvement threshold (default: 0.02 = 2%)
+    - PROFILE_MODE: none | cprofile | sampling - profile từng step (default: none)
+    - PROFILE_STEPS / PROFILE_DIR / PROFILE_INTERVAL_MS: xem src/telemetry.py
 
 Example:
     python -m src.main
     
     Output (nếu model tốt):
-    - s3://ml-fashion-data-lake/artifacts/2025-01-15/models/model_20250115_020000.pkl
-    - Model registered: v1.2.3 (production-ready)
+    - s3://ml-fashion-data-lake/artifacts/2025-01-15/models/model_20250115_020000.alsm
+    - Model registered: v12 (production-ready)
 
 MLOps Integration:
     - Chạy sau data processing và EDA trong Argo Workflow
@@ -64,8 +101,29 @@ MLOps Integration:
 import os
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import pyarrow as pa
+
+from .als import ImplicitALS, build_interaction_matrices
+from .artifact import write_artifact
+from .checkpoint import (
+    checkpoint_key, fingerprint, restore_checkpoint, save_checkpoint, warm_start
+)
+from .evaluation import DEFAULT_K, evaluate_ranking, popularity_factors, sampled_auc
+from .registry import ModelRegistry
+from .sampling import NegativeSampler
+from .search import (
+    DEFAULT_ETA, DEFAULT_MIN_ITERATIONS, DEFAULT_SAMPLE_USERS, DEFAULT_TRIALS,
+    sample_configs, successive_halving
+)
+from .splitter import DEFAULT_PREFETCH, SPLITS, SplitConfig, iter_split_batches
+from .storage import (
+    Filters, open_processed_dataset, table_dataset, to_expression, write_json
+)
+from .telemetry import Telemetry
 
 # Setup logging
 logging.basicConfig(
@@ -74,49 +132,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_HYPERPARAMETERS = {"factors": 64, "regularization": 0.01, "iterations": 15, "alpha": 1.0}
+INTERACTION_COLUMNS = ["user_id", "item_id", "rating", "timestamp"]
+RANKING_METRICS = ["ndcg", "recall", "map"]
+CHECKPOINT_EVERY = 5
+WARM_START_ITERATIONS = 3
+DEFAULT_AUC_MAX_PAIRS = 200_000
+
 
-def load_processed_data(bucket: str, date_prefix: str) -> Dict[str, Any]:
+def load_processed_data(
+    bucket: str,
+    date_prefix: str,
+    columns: Optional[List[str]] = None,
+    filters: Filters = None,
+    table: Optional[pa.Table] = None
+) -> Dict[str, Any]:
     """
-    Mô phỏng load processed data từ S3.
+    Mở processed dataset từ S3 (lazy - chỉ đọc _metadata, chưa đọc data).
     
     Args:
         bucket: S3 bucket name
         date_prefix: Date prefix
+        columns: Chỉ đọc các columns này (default: tất cả)
+        filters: Arrow expression hoặc DNF list, e.g. [("category", "=", "shoes")];
+            partition và row groups không khớp sẽ bị bỏ qua khi đọc
+        table: Processed Arrow table đã có trong memory (in-process runner) - dùng trực
+            tiếp thay vì đọc S3
         
     Returns:
-        Processed data metadata
+        Processed data metadata và dataset handle
     """
-    logger.info(f"Loading processed data from s3://{bucket}/processed/{date_prefix}/")
+    if table is not None:
+        logger.info(f"Using in-memory processed data for {date_prefix} ({table.num_rows} records)")
+        dataset, s3_key = table_dataset(table), f"memory://processed/{date_prefix}"
+    else:
+        logger.info(f"Loading processed data from s3://{bucket}/processed/{date_prefix}/")
+        dataset, s3_key = open_processed_dataset(bucket, date_prefix)
+    filter_expr = to_expression(filters)
+    features = list(columns or dataset.schema.names)
     
     return {
-        "s3_key": f"processed/{date_prefix}/processed_data_20250115_020000.parquet",
-        "record_count": 9500,
-        "features": 10
+        "s3_key": s3_key,
+        "record_count": dataset.count_rows(filter=filter_expr),
+        "features": len(features),
+        "columns": features,
+        "dataset": dataset,
+        "filter": filter_expr
     }
 
 
 def split_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Mô phỏng split data thành train/validation/test sets.
+    Split interactions thành train/validation/test sets.
+    
+    Split được gán on-the-fly cho từng batch trong lúc stream row groups (hash theo
+    (user_id, timestamp) hoặc time cutoff, xem src/splitter.py) với background prefetch
+    thread, rồi gom thành một CSR matrix users x items cho mỗi split (chung index space) -
+    không materialize ba bản copy của dataset.
     
     Args:
-        data: Processed data metadata
+        data: Processed data metadata (dataset handle từ load_processed_data)
         
     Returns:
-        Data splits metadata
+        Data splits metadata; ``matrices`` giữ InteractionMatrix cho từng split (in-memory)
     """
     logger.info("Splitting data into train/validation/test sets...")
     
-    total = data["record_count"]
-    train_size = int(total * 0.7)
-    val_size = int(total * 0.15)
-    test_size = total - train_size - val_size
+    config = SplitConfig(
+        mode=os.getenv("SPLIT_MODE", "hash"),
+        validation_start=_parse_datetime(os.getenv("SPLIT_VALIDATION_START")),
+        test_start=_parse_datetime(os.getenv("SPLIT_TEST_START"))
+    )
+    started = time.perf_counter()
+    batches = iter_split_batches(
+        data["dataset"], INTERACTION_COLUMNS, config, data["filter"],
+        prefetch=int(os.getenv("SPLIT_PREFETCH", str(DEFAULT_PREFETCH)))
+    )
+    matrices = build_interaction_matrices(batches, data["record_count"], SPLITS)
+    train = matrices["train"].matrix
+    logger.info(
+        f"  - Interaction matrix: {train.shape[0]} users x {train.shape[1]} items "
+        f"({config.mode} split, {time.perf_counter() - started:.2f}s)"
+    )
     
     splits = {
-        "train": train_size,
-        "validation": val_size,
-        "test": test_size,
-        "split_ratio": {"train": 0.7, "validation": 0.15, "test": 0.15}
+        "train": matrices["train"].nnz,
+        "validation": matrices["validation"].nnz,
+        "test": matrices["test"].nnz,
+        "split_ratio": config.ratios,
+        "mode": config.mode,
+        "matrices": matrices
     }
     
     logger.info(f"  - Train: {splits['train']} ({splits['split_ratio']['train']:.0%})")
@@ -126,81 +231,261 @@ def split_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return splits
 
 
-def train_model(data: Dict[str, Any], hyperparameters: Dict[str, Any]) -> Dict[str, Any]:
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def search_hyperparameters(
+    data: Dict[str, Any],
+    hyperparameters: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Hyperparameter search bằng successive halving (chỉ chạy khi SEARCH_SPACE được set).
+    
+    Trials chạy song song trên process pool sized theo CPUs của pod; trials yếu bị prune
+    sớm theo validation NDCG@K (xem src/search.py).
+    
+    Args:
+        data: Data splits (split_data)
+        hyperparameters: Base hyperparameters (iterations là budget của rung cuối)
+        
+    Returns:
+        Search results (best_config, rungs) hoặc None nếu search mode tắt
+    """
+    space_str = os.getenv("SEARCH_SPACE")
+    if not space_str:
+        return None
+    
+    logger.info("Running hyperparameter search (successive halving)...")
+    
+    space = json.loads(space_str)
+    base = {**DEFAULT_HYPERPARAMETERS, **hyperparameters}
+    configs = sample_configs(
+        space,
+        n_trials=int(os.getenv("SEARCH_TRIALS", str(DEFAULT_TRIALS))),
+        base=base,
+        seed=int(os.getenv("SEARCH_SEED", "0"))
+    )
+    started = time.perf_counter()
+    search_results = successive_halving(
+        data["matrices"]["train"],
+        data["matrices"]["validation"].matrix,
+        configs,
+        max_iterations=int(base["iterations"]),
+        eta=int(os.getenv("SEARCH_ETA", str(DEFAULT_ETA))),
+        min_iterations=int(os.getenv("SEARCH_MIN_ITERATIONS", str(DEFAULT_MIN_ITERATIONS))),
+        k=int(os.getenv("EVAL_TOP_K", str(DEFAULT_K))),
+        sample_users=int(os.getenv("EVAL_SAMPLE_USERS", str(DEFAULT_SAMPLE_USERS))) or None,
+        max_workers=int(os.getenv("SEARCH_WORKERS", "0")) or None
+    )
+    search_results["search_seconds"] = round(time.perf_counter() - started, 4)
+    
+    for rung in search_results["rungs"]:
+        logger.info(
+            f"  - Rung {rung['rung']}: {len(rung['results'])} trials x {rung['iterations']} "
+            f"iterations, best NDCG={rung['results'][0]['metrics']['ndcg']:.4f}"
+        )
+    logger.info(
+        f"  - Best config (trial {search_results['best_trial']}): {search_results['best_config']}"
+    )
+    logger.info(
+        f"  - Search completed in {search_results['search_seconds']:.2f}s "
+        f"({search_results['workers']} workers)"
+    )
+    
+    return search_results
+
+
+def train_model(
+    data: Dict[str, Any],
+    hyperparameters: Dict[str, Any],
+    bucket: Optional[str] = None,
+    date_prefix: Optional[str] = None,
+    artifacts_prefix: str = "artifacts",
+    warm_start_key: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    Mô phỏng training model.
+    Train implicit-feedback ALS recommender trên CSR matrix users x items.
+    
+    Factors được giải bằng blocked conjugate-gradient trên thread pool (xem src/als.py).
+    Khi có bucket/date_prefix, model state được checkpoint mỗi CHECKPOINT_EVERY iterations
+    và tự resume nếu step chạy lại. ``warm_start_key`` khởi tạo factors từ model nguồn
+    và chỉ train WARM_START_ITERATIONS iterations (xem src/checkpoint.py).
     
     Args:
-        data: Training data metadata
-        hyperparameters: Model hyperparameters
+        data: Data splits (split_data) - chỉ dùng train matrix
+        hyperparameters: Model hyperparameters (factors, regularization, iterations, alpha)
+        bucket: S3 bucket name (None: không checkpoint/warm start)
+        date_prefix: Date prefix của checkpoints
+        artifacts_prefix: Prefix for model artifacts
+        warm_start_key: S3 key của model nguồn để warm start (e.g. production model)
         
     Returns:
-        Training results
+        Training results (loss/wall time mỗi iteration và trained model)
     """
     logger.info("Starting model training...")
     logger.info(f"  - Hyperparameters: {hyperparameters}")
     
-    # Mô phỏng training process
+    started = time.perf_counter()
+    interactions = data["matrices"]["train"]
+    
+    workers = int(os.getenv("TRAIN_WORKERS", "0")) or None
+    model = ImplicitALS.from_hyperparameters(hyperparameters, max_workers=workers)
+    
+    warm_start_key = warm_start_key if bucket else None
+    if warm_start_key:
+        model.iterations = int(os.getenv("WARM_START_ITERATIONS", str(WARM_START_ITERATIONS)))
+    
+    checkpoint_every = int(os.getenv("CHECKPOINT_EVERY", str(CHECKPOINT_EVERY)))
+    ckpt_key = None
+    if bucket and date_prefix and checkpoint_every > 0:
+        ckpt_key = checkpoint_key(
+            artifacts_prefix, date_prefix,
+            fingerprint(hyperparameters, interactions, warm_start_key)
+        )
+    
+    resumed_from = 0
+    warm_start_info = None
+    if ckpt_key and restore_checkpoint(bucket, ckpt_key, model):
+        resumed_from = len(model.history)
+        logger.info(
+            f"  - Resumed from checkpoint s3://{bucket}/{ckpt_key} (iteration {resumed_from})"
+        )
+    elif warm_start_key:
+        warm_start_info = warm_start(model, bucket, warm_start_key, interactions)
+        logger.info(
+            f"  - Warm start from s3://{bucket}/{warm_start_key}: "
+            f"{warm_start_info['users_matched']} users, "
+            f"{warm_start_info['items_matched']} items matched"
+        )
+    
+    def on_iteration(step: Dict[str, Any]) -> None:
+        logger.info(
+            f"  - Iteration {step['iteration']}/{model.iterations}: "
+            f"loss={step['loss']:.6f} ({step['seconds']:.2f}s)"
+        )
+        if ckpt_key and (
+            step["iteration"] % checkpoint_every == 0 or step["iteration"] == model.iterations
+        ):
+            save_checkpoint(bucket, ckpt_key, model)
+    
+    model.fit(interactions, callback=on_iteration)
+    
     training_results = {
-        "epochs": hyperparameters.get("epochs", 10),
-        "training_time_seconds": 1200,  # 20 minutes
-        "loss_history": [0.5, 0.3, 0.2, 0.15, 0.12, 0.10, 0.09, 0.08, 0.075, 0.07],
-        "status": "completed"
+        "algorithm": "implicit_als",
+        "iterations": model.iterations,
+        "users": int(interactions.matrix.shape[0]),
+        "items": int(interactions.matrix.shape[1]),
+        "interactions": interactions.nnz,
+        "training_time_seconds": round(time.perf_counter() - started, 4),
+        "loss_history": [step["loss"] for step in model.history],
+        "iteration_seconds": [step["seconds"] for step in model.history],
+        "resumed_from_iteration": resumed_from,
+        "warm_start": warm_start_info,
+        "checkpoint_key": ckpt_key,
+        "status": "completed",
+        "model": model
     }
     
-    logger.info(f"  - Training completed in {training_results['training_time_seconds']}s")
-    logger.info(f"  - Final loss: {training_results['loss_history'][-1]:.4f}")
+    logger.info(f"  - Training completed in {training_results['training_time_seconds']:.2f}s")
+    if training_results["loss_history"]:
+        logger.info(f"  - Final loss: {training_results['loss_history'][-1]:.6f}")
     
     return training_results
 
 
-def evaluate_model(training_results: Dict[str, Any]) -> Dict[str, Any]:
+def evaluate_model(training_results: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Mô phỏng evaluate model trên validation và test sets.
+    Evaluate model trên validation và test sets bằng ranking metrics.
+    
+    Users được score theo batch (matmul), items trong train bị mask, top-K lấy bằng
+    argpartition (xem src/evaluation.py). Popularity baseline được đánh giá trên cùng split
+    để làm baseline mặc định khi không có BASELINE_METRICS. Test set có thêm sampled AUC
+    (negatives không nằm trong train/test positives, cùng negatives cho cả hai models).
     
     Args:
-        training_results: Training results
+        training_results: Training results (trained model)
+        data: Data splits (split_data)
         
     Returns:
         Evaluation metrics
     """
     logger.info("Evaluating model on validation and test sets...")
     
-    # Mô phỏng evaluation metrics
+    model = training_results["model"]
+    matrices = data["matrices"]
+    train = matrices["train"].matrix
+    k = int(os.getenv("EVAL_TOP_K", str(DEFAULT_K)))
+    sample_users = int(os.getenv("EVAL_SAMPLE_USERS", "0")) or None
+    workers = int(os.getenv("TRAIN_WORKERS", "0")) or None
+    
+    def evaluate(user_factors, item_factors, split: str) -> Dict[str, Any]:
+        return evaluate_ranking(
+            user_factors, item_factors, train, matrices[split].matrix,
+            k=k, sample_users=sample_users, max_workers=workers
+        )
+    
+    n_negatives = int(os.getenv("EVAL_AUC_NEGATIVES", "100"))
+    max_pairs = int(os.getenv("EVAL_AUC_MAX_PAIRS", str(DEFAULT_AUC_MAX_PAIRS))) or None
+    positives = (train + matrices["test"].matrix).tocsr()
+    
+    def auc(user_factors, item_factors) -> Dict[str, Any]:
+        sampler = NegativeSampler(
+            positives, mode=os.getenv("EVAL_NEGATIVE_SAMPLING", "uniform"),
+            popularity=train.getnnz(axis=0)
+        )
+        return sampled_auc(
+            user_factors, item_factors, matrices["test"].matrix, sampler, n_negatives,
+            sample_pairs=max_pairs
+        )
+    
+    started = time.perf_counter()
+    popularity = popularity_factors(train)
     metrics = {
-        "validation": {
-            "accuracy": 0.87,
-            "precision": 0.85,
-            "recall": 0.88,
-            "f1_score": 0.865,
-            "rmse": 0.32,
-            "mae": 0.25
-        },
-        "test": {
-            "accuracy": 0.86,
-            "precision": 0.84,
-            "recall": 0.87,
-            "f1_score": 0.855,
-            "rmse": 0.33,
-            "mae": 0.26
-        },
-        "overall_score": 0.86  # Weighted average
+        "validation": evaluate(model.user_factors, model.item_factors, "validation"),
+        "test": evaluate(model.user_factors, model.item_factors, "test"),
+        "popularity_baseline": evaluate(*popularity, "test")
     }
-    
-    logger.info(f"  - Validation Accuracy: {metrics['validation']['accuracy']:.2%}")
-    logger.info(f"  - Test Accuracy: {metrics['test']['accuracy']:.2%}")
-    logger.info(f"  - Overall Score: {metrics['overall_score']:.2%}")
+    if n_negatives > 0:
+        metrics["test"]["auc"] = auc(model.user_factors, model.item_factors)["auc"]
+        metrics["popularity_baseline"]["auc"] = auc(*popularity)["auc"]
+    # Metric chính: NDCG@K trên test set
+    metrics["overall_score"] = metrics["test"]["ndcg"]
+    metrics["evaluation_seconds"] = round(time.perf_counter() - started, 4)
+    
+    logger.info(
+        f"  - Validation NDCG@{k}: {metrics['validation']['ndcg']:.4f}, "
+        f"Recall@{k}: {metrics['validation']['recall']:.4f}"
+    )
+    logger.info(
+        f"  - Test NDCG@{k}: {metrics['test']['ndcg']:.4f}, "
+        f"Recall@{k}: {metrics['test']['recall']:.4f}, MAP@{k}: {metrics['test']['map']:.4f}, "
+        f"Coverage: {metrics['test']['coverage']:.2%}"
+    )
+    logger.info(f"  - Popularity baseline NDCG@{k}: {metrics['popularity_baseline']['ndcg']:.4f}")
+    if n_negatives > 0:
+        logger.info(
+            f"  - Sampled AUC ({n_negatives} negatives): {metrics['test']['auc']:.4f} "
+            f"(popularity: {metrics['popularity_baseline']['auc']:.4f})"
+        )
+    logger.info(f"  - Overall Score: {metrics['overall_score']:.4f}")
     
     return metrics
 
 
-def compare_with_baseline(metrics: Dict[str, Any], baseline_metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def compare_with_baseline(
+    metrics: Dict[str, Any],
+    baseline_metrics: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     So sánh model mới với baseline/production model.
     
+    Model tốt hơn khi NDCG@K cải thiện tương đối ít nhất METRIC_THRESHOLD và Recall@K,
+    MAP@K không giảm.
+    
     Args:
         metrics: New model metrics
-        baseline_metrics: Baseline model metrics
+        baseline_metrics: Baseline model metrics (default: popularity baseline trên cùng split)
         
     Returns:
         Comparison results
@@ -208,41 +493,39 @@ def compare_with_baseline(metrics: Dict[str, Any], baseline_metrics: Optional[Di
     logger.info("Comparing with baseline model...")
     
     if baseline_metrics is None:
-        # Default baseline metrics
+        # Default baseline: popularity recommender trên cùng test split
         baseline_metrics = {
-            "accuracy": 0.82,
-            "f1_score": 0.80,
-            "rmse": 0.38
+            name: metrics["popularity_baseline"][name] for name in RANKING_METRICS
         }
     
+    new_model = {name: metrics["test"][name] for name in RANKING_METRICS}
     comparison = {
         "baseline": baseline_metrics,
-        "new_model": {
-            "accuracy": metrics["overall_score"],
-            "f1_score": metrics["test"]["f1_score"],
-            "rmse": metrics["test"]["rmse"]
-        },
+        "new_model": new_model,
         "improvements": {
-            "accuracy": metrics["overall_score"] - baseline_metrics["accuracy"],
-            "f1_score": metrics["test"]["f1_score"] - baseline_metrics["f1_score"],
-            "rmse": baseline_metrics["rmse"] - metrics["test"]["rmse"]  # Lower is better
+            name: new_model[name] - baseline_metrics.get(name, 0.0) for name in RANKING_METRICS
         },
         "is_better": False
     }
     
     # Check if new model is better
     threshold = float(os.getenv("METRIC_THRESHOLD", "0.02"))  # 2% improvement
-    accuracy_improvement = comparison["improvements"]["accuracy"]
+    baseline_ndcg = baseline_metrics.get("ndcg", 0.0)
+    ndcg_improvement = (
+        comparison["improvements"]["ndcg"] / baseline_ndcg if baseline_ndcg > 0
+        else float(new_model["ndcg"] > 0)
+    )
+    comparison["relative_improvement"] = ndcg_improvement
     
     comparison["is_better"] = (
-        accuracy_improvement >= threshold and
-        comparison["improvements"]["f1_score"] >= 0 and
-        comparison["improvements"]["rmse"] >= 0
+        ndcg_improvement >= threshold and
+        comparison["improvements"]["recall"] >= 0 and
+        comparison["improvements"]["map"] >= 0
     )
     
-    logger.info(f"  - Baseline Accuracy: {baseline_metrics['accuracy']:.2%}")
-    logger.info(f"  - New Model Accuracy: {metrics['overall_score']:.2%}")
-    logger.info(f"  - Improvement: {accuracy_improvement:+.2%}")
+    logger.info(f"  - Baseline NDCG: {baseline_ndcg:.4f}")
+    logger.info(f"  - New Model NDCG: {new_model['ndcg']:.4f}")
+    logger.info(f"  - Improvement: {ndcg_improvement:+.2%}")
     logger.info(f"  - Is Better: {comparison['is_better']}")
     
     return comparison
@@ -250,10 +533,12 @@ def compare_with_baseline(metrics: Dict[str, Any], baseline_metrics: Optional[Di
 
 def save_model_artifacts(model_data: Dict[str, Any], bucket: str, date_prefix: str) -> str:
     """
-    Mô phỏng save model artifacts lên S3.
+    Save model artifacts lên S3 (memory-mappable format, xem src/artifact.py).
+    
+    Embedding matrices được quantize theo MODEL_QUANTIZATION (none | float16 | int8).
     
     Args:
-        model_data: Model data và metadata
+        model_data: Model data và metadata (training results)
         bucket: S3 bucket name
         date_prefix: Date prefix
         
@@ -261,9 +546,27 @@ def save_model_artifacts(model_data: Dict[str, Any], bucket: str, date_prefix: s
         S3 key của model artifacts
     """
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    s3_key = f"artifacts/{date_prefix}/models/model_{timestamp}.pkl"
+    s3_key = f"artifacts/{date_prefix}/models/model_{timestamp}.alsm"
+    quantization = os.getenv("MODEL_QUANTIZATION", "none")
+    
+    logger.info(f"Saving model artifacts to s3://{bucket}/{s3_key} (quantization: {quantization})")
+    
+    model = model_data["model"]
+    metadata = {k: v for k, v in model_data.items() if k != "model"}
+    result = write_artifact(
+        bucket,
+        s3_key,
+        {
+            "user_ids": model.user_ids,
+            "item_ids": model.item_ids,
+            "user_factors": model.user_factors,
+            "item_factors": model.item_factors
+        },
+        metadata=metadata,
+        quantization=quantization
+    )
     
-    logger.info(f"Saving model artifacts to s3://{bucket}/{s3_key}")
+    logger.info(f"  - Artifact size: {result['bytes'] / 1024 / 1024:.2f} MiB")
     
     return s3_key
 
@@ -272,16 +575,21 @@ def register_model(
     model_s3_key: str,
     metrics: Dict[str, Any],
     hyperparameters: Dict[str, Any],
-    comparison: Dict[str, Any]
+    comparison: Dict[str, Any],
+    registry: Optional[ModelRegistry] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Register model vào Model Registry nếu model tốt hơn baseline.
     
+    Version được cấp atomic (auto-increment) và pointer "latest production" được cập nhật
+    trong index của registry (xem src/registry.py).
+    
     Args:
         model_s3_key: S3 key của model artifacts
         metrics: Model evaluation metrics
         hyperparameters: Hyperparameters used
         comparison: Comparison với baseline
+        registry: ModelRegistry (default: registry trên S3_DATA_LAKE_BUCKET)
         
     Returns:
         Model registry entry nếu registered, None nếu không
@@ -298,35 +606,75 @@ def register_model(
     
     logger.info("Registering model to Model Registry...")
     
-    # Mô phỏng model registry
-    # Trong thực tế, có thể là MLflow, S3-based registry, hoặc database
-    model_version = "v1.2.3"  # Auto-increment từ registry
-    registry_entry = {
-        "model_version": model_version,
-        "model_s3_key": model_s3_key,
-        "metrics": metrics,
-        "hyperparameters": hyperparameters,
-        "training_timestamp": datetime.utcnow().isoformat(),
-        "status": "production-ready",  # hoặc "staging"
-        "comparison": comparison,
-        "registered_by": "ml-training-pipeline",
-        "notes": f"Model improved accuracy by {comparison['improvements']['accuracy']:.2%}"
-    }
-    
-    # Mô phỏng save registry entry
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
-    registry_s3_key = f"artifacts/model_registry/{model_version}/metadata.json"
+    registry = registry or ModelRegistry(bucket)
+    registry_entry = registry.register(
+        {
+            "model_s3_key": model_s3_key,
+            "metrics": metrics,
+            "hyperparameters": hyperparameters,
+            "training_timestamp": datetime.utcnow().isoformat(),
+            "comparison": comparison,
+            "registered_by": "ml-training-pipeline",
+            "notes": f"Model improved NDCG by {comparison['relative_improvement']:+.2%}"
+        },
+        status="production-ready"  # hoặc "staging"
+    )
+    model_version = registry_entry["model_version"]
     
     logger.info(f"✅ Model registered successfully!")
     logger.info(f"   - Version: {model_version}")
     logger.info(f"   - Status: {registry_entry['status']}")
-    logger.info(f"   - Registry entry: s3://{bucket}/{registry_s3_key}")
+    logger.info(f"   - Registry entry: s3://{bucket}/{ModelRegistry.entry_key(model_version)}")
     
     return registry_entry
 
 
-def main():
-    """Main entry point for training component."""
+def get_production_model(registry: Optional[ModelRegistry]) -> Optional[Dict[str, Any]]:
+    """
+    Model production hiện tại từ registry (index + một entry, không list prefix).
+    
+    Args:
+        registry: ModelRegistry (None nếu registry bị tắt)
+        
+    Returns:
+        Registry entry hoặc None nếu chưa có model production
+    """
+    if registry is None:
+        return None
+    production = registry.latest("production-ready")
+    if production:
+        logger.info(
+            f"Current production model: {production['model_version']} "
+            f"(s3://{registry.bucket}/{production['model_s3_key']})"
+        )
+    else:
+        logger.info("No production model in registry yet")
+    return production
+
+
+def production_baseline(production: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Test metrics của production model làm baseline (None nếu không dùng được)."""
+    test_metrics = (production or {}).get("metrics", {}).get("test", {})
+    if not all(name in test_metrics for name in RANKING_METRICS):
+        return None
+    return {name: test_metrics[name] for name in RANKING_METRICS}
+
+
+def run(
+    date_prefix: Optional[str] = None, processed_table: Optional[pa.Table] = None
+) -> Dict[str, Any]:
+    """
+    Chạy training cho một ngày.
+    
+    Args:
+        date_prefix: Date prefix (default: DATE_PREFIX hoặc ngày hiện tại UTC)
+        processed_table: Processed Arrow table trong memory (in-process runner); None thì
+            đọc processed/{date}/ từ S3
+        
+    Returns:
+        Training report
+    """
     logger.info("=" * 60)
     logger.info("Train Component - Starting")
     logger.info("=" * 60)
@@ -335,20 +683,20 @@ def main():
     bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
     artifacts_prefix = os.getenv("S3_ARTIFACTS_PREFIX", "artifacts")
     component_name = os.getenv("COMPONENT_NAME", "train")
-    date_prefix = datetime.utcnow().strftime("%Y-%m-%d")
+    date_prefix = date_prefix or os.getenv("DATE_PREFIX") or datetime.utcnow().strftime("%Y-%m-%d")
     
     # Parse hyperparameters
-    hyperparams_str = os.getenv("HYPERPARAMETERS", '{"learning_rate": 0.001, "batch_size": 32, "epochs": 10}')
+    hyperparams_str = os.getenv("HYPERPARAMETERS", json.dumps(DEFAULT_HYPERPARAMETERS))
     try:
         hyperparameters = json.loads(hyperparams_str)
     except json.JSONDecodeError:
         logger.warning("Invalid hyperparameters JSON, using defaults")
-        hyperparameters = {"learning_rate": 0.001, "batch_size": 32, "epochs": 10}
+        hyperparameters = dict(DEFAULT_HYPERPARAMETERS)
     
     # Parse baseline metrics
-    baseline_str = os.getenv("BASELINE_METRICS", '{"accuracy": 0.82, "f1_score": 0.80, "rmse": 0.38}')
+    baseline_str = os.getenv("BASELINE_METRICS")
     try:
-        baseline_metrics = json.loads(baseline_str)
+        baseline_metrics = json.loads(baseline_str) if baseline_str else None
     except json.JSONDecodeError:
         baseline_metrics = None
     
@@ -357,45 +705,81 @@ def main():
     logger.info(f"Date Prefix: {date_prefix}")
     logger.info(f"Hyperparameters: {hyperparameters}")
     
+    registry_enabled = os.getenv("MODEL_REGISTRY_ENABLED", "true").lower() == "true"
+    registry = ModelRegistry(bucket) if registry_enabled else None
+    production = get_production_model(registry)
+    if baseline_metrics is None:
+        baseline_metrics = production_baseline(production)
+    
+    warm_start_key = os.getenv("WARM_START_MODEL_KEY")
+    if not warm_start_key and production and os.getenv("WARM_START", "false").lower() == "true":
+        warm_start_key = production["model_s3_key"]
+    
+    telemetry = Telemetry(component_name)
+    
     # Step 1: Load processed data
-    processed_data = load_processed_data(bucket, date_prefix)
+    with telemetry.step("load_processed_data") as step:
+        processed_data = load_processed_data(bucket, date_prefix, table=processed_table)
+        step.rows = processed_data["record_count"]
     
     # Step 2: Split data
-    data_splits = split_data(processed_data)
-    
-    # Step 3: Train model
-    training_results = train_model(processed_data, hyperparameters)
+    with telemetry.step("split_data") as step:
+        data_splits = split_data(processed_data)
+        step.rows = sum(data_splits[name] for name in SPLITS)
+    
+    # Step 3: Hyperparameter search (optional) + train model với config tốt nhất
+    with telemetry.step("search_hyperparameters"):
+        search_results = search_hyperparameters(data_splits, hyperparameters)
+    if search_results is not None:
+        hyperparameters = search_results["best_config"]
+    with telemetry.step("train_model") as step:
+        training_results = train_model(
+            data_splits, hyperparameters, bucket, date_prefix, artifacts_prefix, warm_start_key
+        )
+        step.rows = data_splits["train"]
     
     # Step 4: Evaluate model
-    metrics = evaluate_model(training_results)
+    with telemetry.step("evaluate_model") as step:
+        metrics = evaluate_model(training_results, data_splits)
+        step.rows = data_splits["validation"] + data_splits["test"]
     
     # Step 5: Compare with baseline
     comparison = compare_with_baseline(metrics, baseline_metrics)
     
     # Step 6: Save model artifacts
-    model_s3_key = save_model_artifacts(training_results, bucket, date_prefix)
+    with telemetry.step("save_model_artifacts"):
+        model_s3_key = save_model_artifacts(training_results, bucket, date_prefix)
     
     # Step 7: Register model nếu tốt hơn baseline
-    registry_entry = register_model(model_s3_key, metrics, hyperparameters, comparison)
+    with telemetry.step("register_model"):
+        registry_entry = register_model(
+            model_s3_key, metrics, hyperparameters, comparison, registry
+        )
     
     # Generate training report
     report = {
         "training_date": datetime.utcnow().isoformat(),
         "component": component_name,
         "data_source": processed_data["s3_key"],
-        "data_splits": data_splits,
+        "data_splits": {k: v for k, v in data_splits.items() if k != "matrices"},
         "hyperparameters": hyperparameters,
-        "training_results": training_results,
+        "hyperparameter_search": search_results,
+        "training_results": {k: v for k, v in training_results.items() if k != "model"},
         "metrics": metrics,
         "comparison": comparison,
         "model_s3_key": model_s3_key,
         "model_registered": registry_entry is not None,
-        "registry_entry": registry_entry
+        "registry_entry": registry_entry,
+        "telemetry": telemetry.summary()
     }
+    telemetry_s3_key = write_json(
+        bucket, f"telemetry/{date_prefix}/{component_name}.json", report["telemetry"]
+    )
     
     logger.info("=" * 60)
     logger.info("Train Component - Completed")
     logger.info(f"✅ Model artifacts: s3://{bucket}/{model_s3_key}")
+    logger.info(f"✅ Telemetry: s3://{bucket}/{telemetry_s3_key}")
     if registry_entry:
         logger.info(f"✅ Model registered: {registry_entry['model_version']} ({registry_entry['status']})")
     else:
@@ -405,5 +789,10 @@ def main():
     return report
 
 
+def main():
+    """Main entry point for training component."""
+    return run()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
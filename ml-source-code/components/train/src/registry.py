@@ -0,0 +1,191 @@
+"""
+S3-based Model Registry với compact index và atomic version allocation.
+
+Layout dưới ``artifacts/model_registry/``:
+    - ``index.json``: {"next_version", "latest_version", "latest": {status: version}}
+    - ``{version}/metadata.json``: registry entry đầy đủ (metrics, hyperparameters, ...)
+
+"Latest production" / "latest by status" chỉ cần đọc index rồi một entry (2 GETs, O(1)),
+không bao giờ list prefix. Index được cập nhật bằng compare-and-swap:
+    - S3: conditional writes (``IfMatch`` ETag / ``IfNoneMatch="*"``), retry khi 412/409
+    - Local (DATA_LAKE_ROOT): ``fcntl`` lock + so sánh content hash + ``os.replace``
+
+Đăng ký một model gồm hai CAS: (1) cấp version ``next_version`` (duy nhất kể cả khi
+nhiều pipelines chạy song song), (2) ghi entry với ``IfNoneMatch`` rồi (3) dời pointer
+``latest[status]`` nếu version mới hơn - reader không bao giờ thấy pointer trỏ tới entry
+chưa tồn tại.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+REGISTRY_PREFIX = "artifacts/model_registry"
+INDEX_KEY = f"{REGISTRY_PREFIX}/index.json"
+MAX_RETRIES = 20
+
+
+def _empty_index() -> Dict[str, Any]:
+    return {"next_version": 1, "latest_version": None, "latest": {}}
+
+
+def _version_number(version: Optional[str]) -> int:
+    return int(version[1:]) if version else 0
+
+
+class _S3Backend:
+    """Conditional GET/PUT trên S3 (boto3)."""
+
+    def __init__(self, bucket: str):
+        import boto3
+
+        self.bucket = bucket
+        self.client = boto3.client("s3", region_name=os.getenv("AWS_REGION", "ap-southeast-2"))
+
+    def read(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            return None, None
+        return response["Body"].read(), response["ETag"]
+
+    def write(self, key: str, payload: bytes, expected: Optional[str]) -> bool:
+        """Ghi nếu ETag hiện tại == expected (None: object chưa tồn tại)."""
+        from botocore.exceptions import ClientError
+
+        condition = {"IfMatch": expected} if expected else {"IfNoneMatch": "*"}
+        try:
+            self.client.put_object(
+                Bucket=self.bucket, Key=key, Body=payload,
+                ContentType="application/json", **condition
+            )
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in (
+                "PreconditionFailed", "ConditionalRequestConflict"
+            ):
+                return False
+            raise
+        return True
+
+
+class _LocalBackend:
+    """Compare-and-swap trên local filesystem (``{DATA_LAKE_ROOT}/{bucket}/{key}``)."""
+
+    def __init__(self, root: str, bucket: str):
+        self.base = os.path.join(os.path.abspath(root), bucket)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base, key)
+
+    def read(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        try:
+            with open(self._path(key), "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None, None
+        return payload, hashlib.md5(payload).hexdigest()
+
+    def write(self, key: str, payload: bytes, expected: Optional[str]) -> bool:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                _, current = self.read(key)
+                if current != expected:
+                    return False
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+                return True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class ModelRegistry:
+    """
+    Model Registry trên data lake bucket.
+
+    Args:
+        bucket: S3 bucket name (local filesystem khi DATA_LAKE_ROOT được set)
+    """
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        local_root = os.getenv("DATA_LAKE_ROOT")
+        self._backend = _LocalBackend(local_root, bucket) if local_root else _S3Backend(bucket)
+
+    @staticmethod
+    def entry_key(version: str) -> str:
+        return f"{REGISTRY_PREFIX}/{version}/metadata.json"
+
+    def _read_json(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        payload, etag = self._backend.read(key)
+        return (json.loads(payload) if payload is not None else None), etag
+
+    def _update_index(self, mutate: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Read-modify-write index bằng CAS; ``mutate`` sửa index in place và trả kết quả."""
+        for attempt in range(MAX_RETRIES):
+            index, etag = self._read_json(INDEX_KEY)
+            index = index or _empty_index()
+            result = mutate(index)
+            payload = json.dumps(index, indent=2).encode("utf-8")
+            if self._backend.write(INDEX_KEY, payload, etag):
+                return result
+            time.sleep(random.uniform(0.0, 0.05 * (2 ** min(attempt, 5))))
+        raise RuntimeError(f"Could not update registry index after {MAX_RETRIES} attempts")
+
+    def index(self) -> Dict[str, Any]:
+        index, _ = self._read_json(INDEX_KEY)
+        return index or _empty_index()
+
+    def get(self, version: str) -> Optional[Dict[str, Any]]:
+        entry, _ = self._read_json(self.entry_key(version))
+        return entry
+
+    def latest(self, status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Entry mới nhất (theo status nếu có) - đọc index + một entry."""
+        index = self.index()
+        version = index["latest"].get(status) if status else index["latest_version"]
+        return self.get(version) if version else None
+
+    def register(self, entry: Dict[str, Any], status: str) -> Dict[str, Any]:
+        """
+        Cấp version mới (atomic auto-increment), ghi entry và dời latest pointers.
+
+        Args:
+            entry: Registry entry (model_s3_key, metrics, hyperparameters, ...)
+            status: "production-ready" hoặc "staging"
+
+        Returns:
+            Entry đã ghi (kèm model_version, status, registered_at)
+        """
+        def allocate(index: Dict[str, Any]) -> str:
+            version = f"v{index['next_version']}"
+            index["next_version"] += 1
+            return version
+
+        version = self._update_index(allocate)
+        entry = {
+            **entry,
+            "model_version": version,
+            "status": status,
+            "registered_at": datetime.utcnow().isoformat(),
+        }
+        payload = json.dumps(entry, indent=2, default=str).encode("utf-8")
+        if not self._backend.write(self.entry_key(version), payload, None):
+            raise RuntimeError(f"Registry entry {version} already exists")
+
+        def publish(index: Dict[str, Any]) -> None:
+            if _version_number(version) > _version_number(index["latest"].get(status)):
+                index["latest"][status] = version
+            if _version_number(version) > _version_number(index["latest_version"]):
+                index["latest_version"] = version
+
+        self._update_index(publish)
+        return entry
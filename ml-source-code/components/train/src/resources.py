@@ -0,0 +1,35 @@
+"""
+Resources thực sự dùng được trong container.
+
+``os.cpu_count()`` trả về số CPUs của node, không phải CPU quota của pod: pools có số
+workers theo node (e.g. 64 threads trên pod 4 CPUs) tranh CPU với nhau và nhân memory
+tạm của mỗi worker lên quá memory limit của pod. Các pools của train mặc định dùng
+``available_cpus()``.
+"""
+import math
+import os
+from typing import Optional
+
+
+def available_cpus() -> int:
+    """Số CPUs thực sự dùng được (cgroup CPU quota của pod, affinity, CPU count)."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    quota: Optional[float] = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()[:2]
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus or 1, max(1, math.floor(quota)))
+    return max(1, cpus or 1)
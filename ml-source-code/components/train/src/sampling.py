@@ -0,0 +1,160 @@
+"""
+Negative sampling cho implicit feedback (training và sampled evaluation).
+
+Items được draw bằng alias method (Walker/Vose): bảng ``prob``/``alias`` build một lần
+O(n_items), mỗi draw O(1) - một ``integers`` + một ``random`` + một ``where`` cho cả batch.
+Hai modes:
+    - uniform: mọi item cùng xác suất
+    - popularity: xác suất ∝ count(item)^power (power 0.75 như word2vec) - negatives khó hơn
+
+Positives của user bị loại bằng batch rejection vectorized: key ``row * n_items + item``
+của candidates được ``searchsorted`` trên keys của CSR positives (rows sorted, indices
+sorted trong mỗi row nên keys đã sorted toàn cục); chỉ các vị trí bị reject được draw lại.
+Mọi randomness đi qua một ``np.random.Generator`` seeded nên kết quả reproducible.
+"""
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+SAMPLING_MODES = ("uniform", "popularity")
+DEFAULT_POWER = 0.75
+MAX_ROUNDS = 32
+
+
+class AliasTable:
+    """
+    Alias table cho phân phối rời rạc theo ``weights`` (không cần chuẩn hoá).
+
+    Args:
+        weights: Trọng số không âm, tổng > 0
+    """
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = weights.size
+        if n == 0 or weights.sum() <= 0 or (weights < 0).any():
+            raise ValueError("Alias table cần weights không âm với tổng > 0")
+        scaled = weights * (n / weights.sum())
+        prob = np.ones(n, dtype=np.float64)
+        alias = np.arange(n, dtype=np.int64)
+
+        small = list(np.flatnonzero(scaled < 1.0))
+        large = list(np.flatnonzero(scaled >= 1.0))
+        while small and large:
+            s, g = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # Phần còn lại (sai số làm tròn) giữ prob = 1
+
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self) -> int:
+        return self.prob.size
+
+    def draw(self, size, rng: np.random.Generator) -> np.ndarray:
+        """Draw ``size`` indices (int64)."""
+        column = rng.integers(0, self.prob.size, size=size)
+        return np.where(rng.random(size) < self.prob[column], column, self.alias[column])
+
+
+class NegativeSampler:
+    """
+    Sample items mà user chưa tương tác.
+
+    Args:
+        positives: CSR users x items; nonzeros là positives bị loại khỏi negatives
+        mode: "uniform" hoặc "popularity"
+        power: Số mũ của popularity (mode popularity)
+        popularity: Counts theo item (default: số users mỗi item trong ``positives``)
+        seed: Random seed
+    """
+
+    def __init__(
+        self,
+        positives: sparse.csr_matrix,
+        mode: str = "uniform",
+        power: float = DEFAULT_POWER,
+        popularity: Optional[np.ndarray] = None,
+        seed: int = 0,
+    ):
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {mode} (expected one of {SAMPLING_MODES})")
+        positives = positives.tocsr()
+        if not positives.has_sorted_indices:
+            positives = positives.copy()
+            positives.sort_indices()
+        self.n_users, self.n_items = positives.shape
+        self.mode = mode
+        self.rng = np.random.default_rng(seed)
+        self._indptr = positives.indptr
+        self._keys = (
+            np.repeat(np.arange(self.n_users, dtype=np.int64), np.diff(positives.indptr))
+            * self.n_items + positives.indices
+        )
+
+        self._table: Optional[AliasTable] = None
+        if mode == "popularity":
+            if popularity is None:
+                popularity = np.bincount(positives.indices, minlength=self.n_items)
+            # +1 để items chưa có interaction vẫn có thể được chọn
+            self._table = AliasTable((np.asarray(popularity, dtype=np.float64) + 1.0) ** power)
+
+    def _draw(self, size) -> np.ndarray:
+        if self._table is None:
+            return self.rng.integers(0, self.n_items, size=size)
+        return self._table.draw(size, self.rng)
+
+    def _is_positive(self, users: np.ndarray, items: np.ndarray) -> np.ndarray:
+        if self._keys.size == 0:
+            return np.zeros(items.shape, dtype=bool)
+        keys = users * self.n_items + items
+        position = np.minimum(np.searchsorted(self._keys, keys), self._keys.size - 1)
+        return self._keys[position] == keys
+
+    def sample(
+        self, users: np.ndarray, n_negatives: int = 1, max_rounds: int = MAX_ROUNDS
+    ) -> np.ndarray:
+        """
+        Negatives cho từng user (row index, được phép lặp lại).
+
+        Args:
+            users: Row indices của users
+            n_negatives: Số negatives mỗi user
+            max_rounds: Số lần draw lại tối đa cho các vị trí bị reject
+
+        Returns:
+            (len(users), n_negatives) int64 item indices; -1 nếu sau ``max_rounds`` vẫn
+            chưa tìm được negative (user đã tương tác gần như mọi item)
+        """
+        users = np.asarray(users, dtype=np.int64)
+        row = np.broadcast_to(users[:, None], (users.size, n_negatives))
+        items = self._draw(row.shape)
+        pending = np.flatnonzero(self._is_positive(row, items).ravel())
+        flat_items, flat_users = items.reshape(-1), row.reshape(-1)
+        for _ in range(max_rounds):
+            if pending.size == 0:
+                break
+            flat_items[pending] = self._draw(pending.size)
+            pending = pending[self._is_positive(flat_users[pending], flat_items[pending])]
+        flat_items[pending] = -1
+        return items
+
+    def sample_pairs(self, n_samples: int) -> np.ndarray:
+        """
+        Triples (user, positive item, negative item) cho pairwise training (BPR-style).
+
+        Positives được chọn đều trên các interactions.
+
+        Returns:
+            (n_samples, 3) int64; rows có negative -1 đã bị loại
+        """
+        if self._keys.size == 0:
+            return np.empty((0, 3), dtype=np.int64)
+        picked = self._keys[self.rng.integers(0, self._keys.size, size=n_samples)]
+        users, positives = np.divmod(picked, self.n_items)
+        negatives = self.sample(users, 1)[:, 0]
+        triples = np.stack([users, positives, negatives], axis=1)
+        return triples[negatives >= 0]
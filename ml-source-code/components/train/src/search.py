@@ -0,0 +1,163 @@
+"""
+Hyperparameter search với successive halving trên process pool.
+
+N configs được sample từ search space; mỗi rung train các trials còn lại với budget
+(số ALS iterations) tăng dần ``min_iterations * eta^rung`` và chỉ giữ top ``1/eta`` theo
+validation NDCG@K. Trials trong một rung chạy song song trên process pool có số workers
+bằng số CPUs của pod (cgroup quota); mỗi worker nhận train/validation matrices một lần qua
+initializer và chạy ALS/BLAS single-threaded để các trials không tranh CPU.
+
+Mỗi rung train lại từ đầu với budget lớn hơn thay vì giữ factors của mọi trial trong
+memory, nên memory mỗi worker chỉ là một model.
+
+Search space (JSON), mỗi key là một hyperparameter:
+    - list: chọn ngẫu nhiên một giá trị, e.g. ``"factors": [32, 64, 128]``
+    - {"min", "max", "log"}: uniform (hoặc log-uniform); int nếu cả hai bounds là int
+    - giá trị khác: cố định
+"""
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .als import ImplicitALS, InteractionMatrix
+from .evaluation import DEFAULT_K, evaluate_ranking
+from .resources import available_cpus
+
+DEFAULT_TRIALS = 27
+DEFAULT_ETA = 3
+DEFAULT_MIN_ITERATIONS = 2
+DEFAULT_SAMPLE_USERS = 20000
+
+_worker_data: Dict[str, Any] = {}
+
+
+def sample_configs(
+    space: Dict[str, Any], n_trials: int, base: Dict[str, Any], seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Sample ``n_trials`` configs (base hyperparameters override bởi search space)."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_trials):
+        config = dict(base)
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                config[name] = spec[int(rng.integers(len(spec)))]
+            elif isinstance(spec, dict) and "min" in spec and "max" in spec:
+                low, high = spec["min"], spec["max"]
+                if spec.get("log"):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                if isinstance(low, int) and isinstance(high, int):
+                    value = int(round(value))
+                config[name] = value if isinstance(value, int) else float(value)
+            else:
+                config[name] = spec
+        configs.append(config)
+    return configs
+
+
+def rung_schedule(
+    n_trials: int, eta: int, min_iterations: int, max_iterations: int
+) -> List[Tuple[int, int]]:
+    """List (số trials, iterations) cho từng rung; rung cuối luôn train đủ max_iterations."""
+    schedule = []
+    trials, iterations = n_trials, min_iterations
+    while iterations < max_iterations and trials > 1:
+        schedule.append((trials, iterations))
+        trials = max(1, trials // eta)
+        iterations *= eta
+    schedule.append((trials, max_iterations))
+    return schedule
+
+
+def _init_worker(
+    train: InteractionMatrix, validation: sparse.csr_matrix, k: int, sample_users: Optional[int]
+) -> None:
+    try:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    _worker_data.update(train=train, validation=validation, k=k, sample_users=sample_users)
+
+
+def _run_trial(trial_id: int, config: Dict[str, Any], iterations: int) -> Dict[str, Any]:
+    """Train một trial với budget ``iterations`` và trả về validation metrics."""
+    started = time.perf_counter()
+    train = _worker_data["train"]
+    model = ImplicitALS.from_hyperparameters(config, iterations=iterations, max_workers=1)
+    model.fit(train)
+    metrics = evaluate_ranking(
+        model.user_factors, model.item_factors, train.matrix, _worker_data["validation"],
+        k=_worker_data["k"], sample_users=_worker_data["sample_users"], max_workers=1,
+    )
+    return {
+        "trial": trial_id,
+        "iterations": iterations,
+        "metrics": metrics,
+        "loss": model.history[-1]["loss"] if model.history else None,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def successive_halving(
+    train: InteractionMatrix,
+    validation: sparse.csr_matrix,
+    configs: List[Dict[str, Any]],
+    max_iterations: int,
+    eta: int = DEFAULT_ETA,
+    min_iterations: int = DEFAULT_MIN_ITERATIONS,
+    k: int = DEFAULT_K,
+    sample_users: Optional[int] = DEFAULT_SAMPLE_USERS,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Chạy successive halving trên process pool.
+
+    Args:
+        train: Train interactions
+        validation: CSR validation interactions
+        configs: Hyperparameter configs (sample_configs)
+        max_iterations: Budget của rung cuối
+        eta: Hệ số halving
+        min_iterations: Budget của rung đầu
+        k: Cutoff K cho validation NDCG
+        sample_users: Số validation users mỗi lần evaluate
+        max_workers: Số processes (default: available_cpus())
+
+    Returns:
+        Dict best config, rungs (kết quả mỗi trial), trial count
+    """
+    schedule = rung_schedule(len(configs), eta, min_iterations, max_iterations)
+    workers = max_workers or available_cpus()
+    alive = list(range(len(configs)))
+    rungs: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker,
+        initargs=(train, validation, k, sample_users),
+    ) as executor:
+        for rung, (_, iterations) in enumerate(schedule):
+            results = list(executor.map(
+                _run_trial, alive, [configs[t] for t in alive], [iterations] * len(alive)
+            ))
+            results.sort(key=lambda r: -r["metrics"]["ndcg"])
+            rungs.append({"rung": rung, "iterations": iterations, "results": results})
+            if rung + 1 < len(schedule):
+                alive = [r["trial"] for r in results[: schedule[rung + 1][0]]]
+
+    best = rungs[-1]["results"][0]
+    return {
+        "best_trial": best["trial"],
+        "best_config": configs[best["trial"]],
+        "best_metrics": best["metrics"],
+        "trials": len(configs),
+        "workers": workers,
+        "configs": configs,
+        "rungs": rungs,
+    }
@@ -0,0 +1,203 @@
+"""
+Streaming, deterministic train/validation/test splitter và prefetching loader.
+
+Split được gán on-the-fly cho từng RecordBatch trong lúc stream Parquet row groups nên
+không bao giờ có ba bản copy của dataset trong memory - chỉ một mảng split code (int8)
+mỗi row đi kèm các columns cần cho interaction matrix.
+
+Hai modes:
+    - hash: fraction = splitmix64(user_id, timestamp) / 2^64; cùng interaction luôn rơi
+      vào cùng split giữa các lần chạy và giữa các workers.
+    - time: rows có timestamp >= test cutoff là test, >= validation cutoff là validation;
+      cutoffs mặc định là các điểm 70% / 85% của khoảng thời gian trong dataset.
+
+``PrefetchIterator`` đọc batches trên background thread vào bounded queue để I/O và
+decode của batch tiếp theo overlap với compute trên batch hiện tại.
+"""
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+SPLITS = ("train", "validation", "test")
+HASH_SEED = 0x9E3779B97F4A7C15
+DEFAULT_PREFETCH = 4
+_SENTINEL = object()
+
+
+@dataclass
+class SplitConfig:
+    """Cấu hình split; ratios dùng cho hash mode và cutoffs mặc định của time mode."""
+
+    mode: str = "hash"
+    ratios: Dict[str, float] = field(
+        default_factory=lambda: {"train": 0.7, "validation": 0.15, "test": 0.15}
+    )
+    validation_start: Optional[datetime] = None
+    test_start: Optional[datetime] = None
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer (vectorized, uint64)."""
+    with np.errstate(over="ignore"):
+        z = values.astype(np.uint64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _timestamps(batch: pa.RecordBatch) -> np.ndarray:
+    """Timestamp column -> int64 microseconds (null -> 0)."""
+    column = batch.column("timestamp").cast(pa.timestamp("us"), safe=False)
+    return column.cast(pa.int64()).fill_null(0).to_numpy(zero_copy_only=False)
+
+
+def hash_assign(batch: pa.RecordBatch, ratios: Dict[str, float]) -> np.ndarray:
+    """Split code (index trong SPLITS) theo hash (user_id, timestamp)."""
+    users = batch.column("user_id").to_numpy(zero_copy_only=False).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        keys = _mix64(users * np.uint64(HASH_SEED) ^ _timestamps(batch).astype(np.uint64))
+    fraction = (keys >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    bounds = np.cumsum([ratios[name] for name in SPLITS])[:-1]
+    return np.searchsorted(bounds, fraction, side="right").astype(np.int8)
+
+
+def time_assign(batch: pa.RecordBatch, validation_start: int, test_start: int) -> np.ndarray:
+    """Split code theo timestamp cutoffs (int64 microseconds)."""
+    timestamps = _timestamps(batch)
+    return ((timestamps >= validation_start).astype(np.int8)
+            + (timestamps >= test_start).astype(np.int8))
+
+
+def time_cutoffs(
+    dataset: ds.Dataset, config: SplitConfig, filter_expr: Optional[ds.Expression] = None
+) -> Tuple[int, int]:
+    """
+    Cutoffs (int64 microseconds) cho time mode.
+
+    Cutoffs không được cấu hình sẽ lấy theo ratios trên [min, max] timestamp (pass chỉ
+    đọc timestamp column).
+    """
+    def micros(value: datetime) -> int:
+        return int(pa.scalar(value, type=pa.timestamp("us")).value)
+
+    if config.validation_start is not None and config.test_start is not None:
+        return micros(config.validation_start), micros(config.test_start)
+
+    bounds = pc.min_max(
+        dataset.to_table(columns=["timestamp"], filter=filter_expr)
+        .column("timestamp").cast(pa.timestamp("us"), safe=False)
+    )
+    low = bounds["min"].value or 0
+    high = bounds["max"].value or 0
+    span = high - low
+    validation_start = (
+        micros(config.validation_start) if config.validation_start is not None
+        else low + int(span * config.ratios["train"])
+    )
+    test_start = (
+        micros(config.test_start) if config.test_start is not None
+        else low + int(span * (config.ratios["train"] + config.ratios["validation"]))
+    )
+    return validation_start, test_start
+
+
+class PrefetchIterator:
+    """
+    Iterator chạy ``source`` trên background thread với bounded queue.
+
+    Exception trong thread được raise lại ở consumer; ``close()`` (hoặc dùng như context
+    manager) dừng producer khi consumer thoát sớm.
+    """
+
+    def __init__(self, source: Iterable[Any], depth: int = DEFAULT_PREFETCH):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(source,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, source: Iterable[Any]) -> None:
+        try:
+            for item in source:
+                if not self._put(item):
+                    return
+        except Exception as exc:
+            self._put(exc)
+            return
+        self._put(_SENTINEL)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        item = self._queue.get()
+        if item is _SENTINEL:
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self) -> "PrefetchIterator":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def iter_split_batches(
+    dataset: ds.Dataset,
+    columns: Iterable[str],
+    config: SplitConfig,
+    filter_expr: Optional[ds.Expression] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+) -> Iterator[Tuple[pa.RecordBatch, np.ndarray]]:
+    """
+    Stream (batch, split codes) từ dataset; batches được đọc trước trên background thread.
+
+    Args:
+        dataset: Arrow dataset
+        columns: Columns cần đọc (timestamp/user_id được thêm nếu split cần)
+        config: SplitConfig
+        filter_expr: Filter pushdown
+        prefetch: Số batches đọc trước
+
+    Yields:
+        Tuple (RecordBatch, int8 codes theo SPLITS)
+    """
+    names = list(dict.fromkeys([*columns, "user_id", "timestamp"]))
+    if config.mode == "time":
+        validation_start, test_start = time_cutoffs(dataset, config, filter_expr)
+
+        def assign(batch: pa.RecordBatch) -> np.ndarray:
+            return time_assign(batch, validation_start, test_start)
+    elif config.mode == "hash":
+        def assign(batch: pa.RecordBatch) -> np.ndarray:
+            return hash_assign(batch, config.ratios)
+    else:
+        raise ValueError(f"Unknown split mode: {config.mode}")
+
+    # Split codes cũng được tính trên prefetch thread, overlap với consumer
+    source = (
+        (batch, assign(batch)) for batch in dataset.to_batches(columns=names, filter=filter_expr)
+    )
+    with PrefetchIterator(source, prefetch) as batches:
+        yield from batches
@@ -0,0 +1,169 @@
+"""
+Storage helpers cho data lake (S3 hoặc local filesystem).
+
+Mặc định mọi path được resolve về S3 bucket ``S3_DATA_LAKE_BUCKET``. Khi chạy local
+(dev, benchmark), set ``DATA_LAKE_ROOT=/path/to/lake`` để dùng local filesystem với cùng
+layout: ``{DATA_LAKE_ROOT}/{bucket}/{key}``.
+
+Environment Variables:
+    - DATA_LAKE_ROOT: Thư mục local thay cho S3 (optional)
+    - AWS_REGION: Region của S3 bucket (default: ap-southeast-2)
+"""
+import os
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+IN_MEMORY_CHUNK_ROWS = 131072
+
+Filters = Union[ds.Expression, List[Tuple[str, str, Any]], None]
+
+
+def get_filesystem(bucket: str) -> Tuple[pafs.FileSystem, str]:
+    """
+    Trả về filesystem và base path tương ứng với bucket.
+
+    Args:
+        bucket: S3 bucket name
+
+    Returns:
+        Tuple (filesystem, base_path) - base_path không có trailing slash
+    """
+    local_root = os.getenv("DATA_LAKE_ROOT")
+    if local_root:
+        return pafs.LocalFileSystem(), f"{os.path.abspath(local_root)}/{bucket}"
+    region = os.getenv("AWS_REGION", "ap-southeast-2")
+    return pafs.S3FileSystem(region=region), bucket
+
+
+def resolve(bucket: str, key: str) -> Tuple[pafs.FileSystem, str]:
+    """Resolve S3 key thành (filesystem, path)."""
+    fs, base = get_filesystem(bucket)
+    return fs, f"{base}/{key.lstrip('/')}"
+
+
+def list_files(bucket: str, prefix: str, suffix: str = "") -> List[str]:
+    """
+    Liệt kê các file dưới prefix (recursive), sorted.
+
+    Args:
+        bucket: S3 bucket name
+        prefix: Key prefix (e.g. 'raw/2025-01-15')
+        suffix: Chỉ giữ file có đuôi này (e.g. '.parquet')
+
+    Returns:
+        List các path trên filesystem (dùng trực tiếp với filesystem từ get_filesystem)
+    """
+    fs, path = resolve(bucket, prefix)
+    selector = pafs.FileSelector(path, allow_not_found=True, recursive=True)
+    return sorted(
+        info.path for info in fs.get_file_info(selector)
+        if info.type == pafs.FileType.File and info.path.endswith(suffix)
+    )
+
+
+def write_bytes(bucket: str, key: str, payload: bytes) -> str:
+    """
+    Ghi raw bytes lên data lake.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 key đích
+        payload: Nội dung file
+
+    Returns:
+        S3 key đã ghi
+    """
+    fs, path = resolve(bucket, key)
+    fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+    with fs.open_output_stream(path) as stream:
+        stream.write(payload)
+    return key
+
+
+def read_bytes(bucket: str, key: str) -> bytes:
+    """Đọc toàn bộ object từ data lake."""
+    fs, path = resolve(bucket, key)
+    with fs.open_input_stream(path) as stream:
+        return stream.read()
+
+
+def write_json(bucket: str, key: str, payload: Dict[str, Any]) -> str:
+    """
+    Ghi JSON lên data lake.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 key đích
+        payload: JSON-serializable dict
+
+    Returns:
+        S3 key đã ghi
+    """
+    return write_bytes(bucket, key, json.dumps(payload, indent=2, default=str).encode("utf-8"))
+
+
+def exists(bucket: str, key: str) -> bool:
+    """Kiểm tra object tồn tại trên data lake."""
+    fs, path = resolve(bucket, key)
+    return fs.get_file_info(path).type == pafs.FileType.File
+
+
+def to_expression(filters: Filters) -> Optional[ds.Expression]:
+    """
+    Chuẩn hóa filters thành Arrow expression.
+
+    Chấp nhận Arrow expression hoặc DNF list kiểu pyarrow.parquet,
+    e.g. ``[("category", "in", ["shoes", "bags"]), ("price", ">", 10)]``.
+    """
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def open_processed_dataset(bucket: str, date_prefix: str) -> Tuple[ds.Dataset, str]:
+    """
+    Mở processed dataset của một ngày (lazy, chưa đọc data).
+
+    Ưu tiên ``processed/{date}/dataset/_metadata``: row-group statistics có sẵn trong
+    summary file nên filter được prune mà không cần list prefix hay đọc từng footer.
+    Fallback sang discover files (layout cũ ``processed_data_*.parquet``).
+
+    Args:
+        bucket: S3 bucket name
+        date_prefix: Date prefix
+
+    Returns:
+        Tuple (dataset, s3_key của dataset)
+    """
+    fs, base = get_filesystem(bucket)
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=False)
+    dataset_key = f"processed/{date_prefix}/dataset"
+    if exists(bucket, f"{dataset_key}/_metadata"):
+        dataset = ds.parquet_dataset(
+            f"{base}/{dataset_key}/_metadata", filesystem=fs, partitioning=partitioning
+        )
+        return dataset, dataset_key
+
+    files = list_files(bucket, f"processed/{date_prefix}", suffix=".parquet")
+    if not files:
+        raise FileNotFoundError(f"No processed data under s3://{bucket}/processed/{date_prefix}/")
+    dataset = ds.dataset(
+        files, format="parquet", filesystem=fs, partitioning=partitioning,
+        partition_base_dir=f"{base}/{dataset_key}"
+    )
+    return dataset, f"processed/{date_prefix}"
+
+
+def table_dataset(table: pa.Table, chunk_rows: int = IN_MEMORY_CHUNK_ROWS) -> ds.Dataset:
+    """
+    Arrow dataset trên một table trong memory (zero-copy).
+
+    Table được cắt thành các slices ``chunk_rows`` rows, mỗi slice là một fragment nên
+    các consumers song song theo fragment (EDA profiling) vẫn chia được việc.
+    """
+    return ds.dataset(table.to_batches(max_chunksize=chunk_rows), schema=table.schema)
@@ -0,0 +1,217 @@
+"""
+Instrumentation cho các pipeline steps (wall/CPU time, peak RSS, rows, process I/O).
+
+Mỗi component có một bản copy của module này (mỗi component là một Docker build
+context riêng). Dùng:
+
+    telemetry = Telemetry("data_processing")
+    with telemetry.step("clean_data") as step:
+        cleaned = clean_data(raw)
+        step.rows = cleaned["total_records"]
+    report["telemetry"] = telemetry.summary()
+
+Metrics của mỗi step:
+    - wall_seconds / cpu_seconds: ``perf_counter`` / ``process_time`` (CPU của mọi threads)
+    - peak_rss_mb: peak RSS trong step - VmHWM được reset đầu step qua
+      ``/proc/self/clear_refs`` (Linux); nếu không reset được thì là peak của cả process
+      (``peak_rss_scope: "process"``)
+    - process_bytes_read / process_bytes_written: delta ``rchar`` / ``wchar`` của
+      ``/proc/self/io`` trong thời gian step - I/O của cả process (mọi threads, gồm socket
+      tới S3, logging, imports), không phải số bytes step đọc/ghi qua storage; None khi
+      không có /proc
+    - rows: do caller gán
+
+Profiling (optional) cho từng step, output ghi vào ``{PROFILE_DIR}/{component}/``:
+    - cprofile: ``{step}.prof`` (pstats / snakeviz), chỉ thread gọi step
+    - sampling: ``{step}.folded`` - collapsed stacks của mọi threads lấy mẫu mỗi
+      PROFILE_INTERVAL_MS (flamegraph.pl / speedscope)
+
+Environment Variables:
+    - PROFILE_MODE: none | cprofile | sampling (default: none)
+    - PROFILE_STEPS: Danh sách steps cần profile, phân tách bởi dấu phẩy (default: tất cả)
+    - PROFILE_DIR: Thư mục output (default: /tmp/profiles)
+    - PROFILE_INTERVAL_MS: Chu kỳ lấy mẫu của sampling profiler (default: 10)
+"""
+import cProfile
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("none", "cprofile", "sampling")
+
+
+@dataclass
+class StepMetrics:
+    """Metrics của một pipeline step."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    peak_rss_scope: str = "step"
+    rows: Optional[int] = None
+    process_bytes_read: Optional[int] = None
+    process_bytes_written: Optional[int] = None
+    profile: Optional[str] = None
+    status: str = "success"
+
+
+def _read_io() -> Optional[Dict[str, int]]:
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return {"read": int(fields["rchar"]), "written": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM của process (Linux >= 4.0)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KiB trên Linux, bytes trên macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StackSampler:
+    """Sampling profiler: collapsed stacks của mọi threads trên background thread."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Telemetry:
+    """
+    Thu thập StepMetrics cho các steps của một component.
+
+    Args:
+        component: Tên component (dùng cho thư mục profile output)
+    """
+
+    def __init__(self, component: str):
+        self.component = component
+        self.steps: List[StepMetrics] = []
+        self.profile_mode = os.getenv("PROFILE_MODE", "none").lower()
+        if self.profile_mode not in PROFILE_MODES:
+            logger.warning(f"Unknown PROFILE_MODE {self.profile_mode}, profiling disabled")
+            self.profile_mode = "none"
+        steps = os.getenv("PROFILE_STEPS", "")
+        self.profile_steps = {s.strip() for s in steps.split(",") if s.strip()} or None
+        self.profile_dir = os.path.join(os.getenv("PROFILE_DIR", "/tmp/profiles"), component)
+        self.profile_interval = int(os.getenv("PROFILE_INTERVAL_MS", "10")) / 1000
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    def _profiling(self, name: str) -> bool:
+        return self.profile_mode != "none" and (
+            self.profile_steps is None or name in self.profile_steps
+        )
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[StepMetrics]:
+        """Đo một step; caller có thể gán ``rows`` trên StepMetrics được yield."""
+        metrics = StepMetrics(name=name)
+        if not _reset_peak_rss():
+            metrics.peak_rss_scope = "process"
+        io_started = _read_io()
+        profiler: Any = None
+        if self._profiling(name):
+            os.makedirs(self.profile_dir, exist_ok=True)
+            if self.profile_mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                profiler = StackSampler(self.profile_interval)
+                profiler.start()
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.status = "failed"
+            raise
+        finally:
+            metrics.wall_seconds = round(time.perf_counter() - wall_started, 4)
+            metrics.cpu_seconds = round(time.process_time() - cpu_started, 4)
+            metrics.peak_rss_mb = round(_peak_rss_mb(), 1)
+            io_finished = _read_io()
+            if io_started and io_finished:
+                metrics.process_bytes_read = io_finished["read"] - io_started["read"]
+                metrics.process_bytes_written = io_finished["written"] - io_started["written"]
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+                metrics.profile = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(metrics.profile)
+            elif profiler is not None:
+                profiler.stop()
+                metrics.profile = os.path.join(self.profile_dir, f"{name}.folded")
+                profiler.write(metrics.profile)
+            self.steps.append(metrics)
+            logger.info(
+                f"⏱️  {name}: {metrics.wall_seconds:.2f}s wall, {metrics.cpu_seconds:.2f}s CPU, "
+                f"peak RSS {metrics.peak_rss_mb:.0f} MiB"
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serializable summary (ghi vào report/metadata của component)."""
+        return {
+            "component": self.component,
+            "wall_seconds": round(time.perf_counter() - self._started, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_started, 4),
+            "peak_rss_mb": round(
+                max((s.peak_rss_mb or 0.0 for s in self.steps), default=_peak_rss_mb()), 1
+            ),
+            "profile_mode": self.profile_mode,
+            "steps": [asdict(s) for s in self.steps],
+        }
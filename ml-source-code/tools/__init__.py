@@ -0,0 +1 @@
+"""Developer tools chạy trên toàn bộ monorepo (không đóng gói vào component images)."""
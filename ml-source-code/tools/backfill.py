@@ -0,0 +1,297 @@
+"""
+Backfill pipeline components trên một khoảng ngày với bounded worker pool.
+
+Mỗi (ngày, stage) là một task chạy đúng entrypoint của container
+(``python -m src.main`` trong thư mục component, ``DATE_PREFIX={date}``) trên một
+subprocess riêng - memory được giải phóng sau mỗi task và một task lỗi không kéo theo
+các task khác. Tasks chạy song song tối đa ``--workers``; mỗi task nhận
+``cpus // workers`` threads (PROCESSING_WORKERS, EDA_WORKERS, TRAIN_WORKERS, BLAS, ...)
+để không oversubscribe CPU, trừ khi các biến đó đã được set.
+
+Dependencies:
+    - data_processing(d) sau data_ingestion(d)
+    - data_eda(d) sau data_processing(d) và data_eda của DRIFT_LOOKBACK_DAYS ngày trước
+      trong khoảng backfill (drift đọc feature_summaries.json của các ngày đó)
+    - train(d) sau data_processing(d) và train(d - 1) (registry / warm start theo thứ tự)
+
+Task có output đã tồn tại trên data lake được bỏ qua (``--force`` để chạy lại); task có
+dependency lỗi bị đánh dấu ``blocked``.
+
+data_ingestion hiện chỉ mô phỏng sources và không ghi raw/{date}/, nên không nằm trong
+stages mặc định: raw data phải có sẵn trên data lake, hoặc được sinh bằng
+``--synthetic-rows`` (tools.synthetic, chỉ cho local data lake ``DATA_LAKE_ROOT``). Ngày
+nào thiếu raw data thì data_processing của ngày đó fail ngay, không chạy subprocess.
+Chạy từ thư mục ml-source-code:
+
+    DATA_LAKE_ROOT=/tmp/lake python -m tools.backfill --start 2025-01-01 --end 2025-03-31 \
+        --synthetic-rows 1e6 --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .components import COMPONENTS_DIR, PIPELINE_COMPONENTS, load_component
+from .synthetic import SyntheticConfig, write_raw
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = ("data_processing", "data_eda")
+DRIFT_LOOKBACK_DAYS = 7
+THREAD_VARIABLES = (
+    "PROCESSING_WORKERS", "EDA_WORKERS", "EDA_PLOT_WORKERS", "TRAIN_WORKERS", "SEARCH_WORKERS",
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+)
+
+Task = Tuple[str, str]
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """Các ngày YYYY-MM-DD từ start tới end (inclusive)."""
+    day = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    if last < day:
+        raise ValueError(f"End date {end} is before start date {start}")
+    dates = []
+    while day <= last:
+        dates.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return dates
+
+
+def _shift(date_prefix: str, days: int) -> str:
+    return (datetime.strptime(date_prefix, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def build_tasks(
+    dates: Sequence[str], stages: Sequence[str], lookback_days: int = DRIFT_LOOKBACK_DAYS
+) -> Dict[Task, List[Task]]:
+    """DAG (date, stage) -> dependencies (chỉ các tasks nằm trong backfill)."""
+    tasks: Dict[Task, List[Task]] = {}
+    for date_prefix in dates:
+        for stage in stages:
+            if stage == "data_processing":
+                dependencies = [(date_prefix, "data_ingestion")]
+            elif stage == "data_eda":
+                dependencies = [(date_prefix, "data_processing")] + [
+                    (_shift(date_prefix, -offset), "data_eda")
+                    for offset in range(1, lookback_days + 1)
+                ]
+            elif stage == "train":
+                dependencies = [
+                    (date_prefix, "data_processing"), (_shift(date_prefix, -1), "train")
+                ]
+            else:
+                dependencies = []
+            tasks[(date_prefix, stage)] = dependencies
+    return {
+        task: [dependency for dependency in dependencies if dependency in tasks]
+        for task, dependencies in tasks.items()
+    }
+
+
+def output_exists(bucket: str, date_prefix: str, stage: str) -> bool:
+    """Output của stage cho ngày này đã có trên data lake chưa."""
+    storage = load_component("data_processing", "storage")
+    if stage == "data_ingestion":
+        return bool(storage.list_files(bucket, f"raw/{date_prefix}", suffix=".parquet"))
+    if stage == "data_processing":
+        return bool(storage.list_files(bucket, f"processed/{date_prefix}/dataset", "_metadata"))
+    if stage == "data_eda":
+        return bool(storage.list_files(bucket, f"eda/{date_prefix}", "feature_summaries.json"))
+    if stage == "train":
+        return bool(storage.list_files(bucket, f"telemetry/{date_prefix}", "train.json"))
+    return False
+
+
+def generate_missing_raw(bucket: str, dates: Sequence[str], rows: int) -> List[str]:
+    """
+    Sinh synthetic raw data (tools.synthetic) cho các ngày chưa có raw/{date}/.
+
+    Seed lấy theo ngày nên mỗi ngày có data khác nhau nhưng reproducible. Chỉ chạy trên
+    local data lake để không ghi synthetic data vào S3.
+
+    Returns:
+        Các ngày đã được sinh data
+    """
+    if not os.getenv("DATA_LAKE_ROOT"):
+        raise ValueError("Synthetic raw data requires a local data lake (set DATA_LAKE_ROOT)")
+    generated = []
+    for date_prefix in dates:
+        if output_exists(bucket, date_prefix, "data_ingestion"):
+            continue
+        seed = int(date_prefix.replace("-", ""))
+        result = write_raw(SyntheticConfig(rows=rows, seed=seed), bucket, date_prefix)
+        logger.info(f"📦 {date_prefix}: generated {result['rows']:,} synthetic raw rows")
+        generated.append(date_prefix)
+    return generated
+
+
+def run_task(
+    date_prefix: str, stage: str, log_dir: Path, threads: int
+) -> Dict[str, Any]:
+    """Chạy một component cho một ngày trên subprocess; stdout/stderr ghi vào log file."""
+    env = dict(os.environ, DATE_PREFIX=date_prefix, COMPONENT_NAME=stage)
+    for name in THREAD_VARIABLES:
+        env.setdefault(name, str(threads))
+    log_path = log_dir / date_prefix / f"{stage}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        completed = subprocess.run(
+            [sys.executable, "-m", "src.main"], cwd=COMPONENTS_DIR / stage, env=env,
+            stdout=log, stderr=subprocess.STDOUT,
+        )
+    return {
+        "status": "success" if completed.returncode == 0 else "failed",
+        "returncode": completed.returncode,
+        "seconds": round(time.perf_counter() - started, 2),
+        "log": str(log_path),
+    }
+
+
+def backfill(
+    dates: Sequence[str],
+    stages: Sequence[str] = DEFAULT_STAGES,
+    workers: Optional[int] = None,
+    bucket: Optional[str] = None,
+    force: bool = False,
+    log_dir: str = "/tmp/backfill-logs",
+    synthetic_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Chạy backfill theo DAG với tối đa ``workers`` tasks song song.
+
+    Args:
+        dates: Các ngày cần backfill
+        stages: Components cần chạy
+        workers: Số tasks song song (default: CPU count // 2)
+        bucket: Data lake bucket (default: S3_DATA_LAKE_BUCKET)
+        force: Chạy lại cả các ngày đã có output
+        log_dir: Thư mục log của từng task
+        synthetic_rows: Sinh synthetic raw data (số rows mỗi ngày) cho các ngày chưa có
+            raw data trước khi chạy (chỉ local data lake)
+
+    Returns:
+        Dict tasks {date: {stage: result}}, counts theo status, wall_seconds
+    """
+    unknown = set(stages) - set(PIPELINE_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)} (expected {PIPELINE_COMPONENTS})")
+    bucket = bucket or os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
+    cpus = os.cpu_count() or 1
+    workers = workers or max(1, cpus // 2)
+    threads = max(1, cpus // workers)
+    lookback_days = int(os.getenv("DRIFT_LOOKBACK_DAYS", str(DRIFT_LOOKBACK_DAYS)))
+    ordered = [stage for stage in PIPELINE_COMPONENTS if stage in stages]
+    dependencies = build_tasks(dates, ordered, lookback_days)
+    if synthetic_rows:
+        generate_missing_raw(bucket, dates, synthetic_rows)
+
+    results: Dict[Task, Dict[str, Any]] = {}
+    for task in dependencies:
+        if not force and output_exists(bucket, *task):
+            results[task] = {"status": "skipped"}
+        elif (
+            task[1] == "data_processing"
+            and "data_ingestion" not in ordered
+            and not output_exists(bucket, task[0], "data_ingestion")
+        ):
+            error = f"No raw data under raw/{task[0]}/ (use --synthetic-rows or ingest first)"
+            logger.error(f"{task[0]} data_processing: {error}")
+            results[task] = {"status": "failed", "error": error}
+    logger.info(
+        f"Backfill {dates[0]}..{dates[-1]}: {len(dependencies)} tasks "
+        f"({sum(r['status'] == 'skipped' for r in results.values())} already done), "
+        f"{workers} workers x {threads} threads"
+    )
+
+    started = time.perf_counter()
+    running: Dict[Future, Task] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            for task, requires in dependencies.items():
+                if task in results or task in running.values():
+                    continue
+                states = [results.get(dependency, {}).get("status") for dependency in requires]
+                if any(state in ("failed", "blocked") for state in states):
+                    results[task] = {"status": "blocked"}
+                elif all(state in ("success", "skipped") for state in states):
+                    running[executor.submit(run_task, *task, Path(log_dir), threads)] = task
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                results[task] = future.result()
+                level = logging.INFO if results[task]["status"] == "success" else logging.ERROR
+                logger.log(
+                    level, f"{task[0]} {task[1]}: {results[task]['status']} "
+                    f"({results[task]['seconds']:.1f}s, {results[task]['log']})"
+                )
+
+    counts: Dict[str, int] = {}
+    tasks: Dict[str, Dict[str, Any]] = {}
+    for (date_prefix, stage), result in sorted(results.items()):
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        tasks.setdefault(date_prefix, {})[stage] = result
+    return {
+        "start": dates[0],
+        "end": dates[-1],
+        "stages": ordered,
+        "workers": workers,
+        "wall_seconds": round(time.perf_counter() - started, 2),
+        "counts": counts,
+        "tasks": tasks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill pipeline components over a date range")
+    parser.add_argument("--start", required=True, help="Ngày đầu YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Ngày cuối YYYY-MM-DD (inclusive)")
+    parser.add_argument(
+        "--stages", default=",".join(DEFAULT_STAGES),
+        help=f"Comma-separated stages (default: {','.join(DEFAULT_STAGES)})"
+    )
+    parser.add_argument("--workers", type=int, help="Số tasks song song (default: CPUs // 2)")
+    parser.add_argument("--force", action="store_true", help="Chạy lại cả ngày đã có output")
+    parser.add_argument("--log-dir", default="/tmp/backfill-logs")
+    parser.add_argument(
+        "--synthetic-rows",
+        help="Sinh synthetic raw data (rows mỗi ngày, e.g. 1e6) cho ngày chưa có raw data",
+    )
+    parser.add_argument("--output", help="Ghi summary JSON vào file này (default: stdout)")
+    args = parser.parse_args()
+
+    report = backfill(
+        date_range(args.start, args.end),
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        workers=args.workers,
+        force=args.force,
+        log_dir=args.log_dir,
+        synthetic_rows=int(float(args.synthetic_rows)) if args.synthetic_rows else None,
+    )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    if report["counts"].get("failed") or report["counts"].get("blocked"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
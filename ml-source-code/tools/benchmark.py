@@ -0,0 +1,227 @@
+"""
+Scale benchmark của pipeline trên synthetic data (xem ``tools.synthetic``).
+
+Với mỗi scale (số rows), benchmark sinh raw data vào một local data lake riêng
+(``{lake}/rows_{n}``), rồi chạy từng component đúng như container
+(``python -m src.main`` trên subprocess, xem ``tools.backfill.run_task``) và ghi lại mỗi
+stage:
+    - wall_seconds và throughput (input rows / giây)
+    - cpu_seconds và peak_rss_mb từ telemetry/{date}/{component}.json của component
+
+Import time (cold start) của các stages được đo và so với budgets của
+``tools.import_time``; vượt budget cũng làm benchmark fail.
+
+So sánh với một report trước (``--baseline``): stage nào chậm hơn hoặc dùng nhiều memory
+hơn ``--max-regression`` (default 25%) bị đánh dấu và command exit 1 - dùng trong CI hoặc
+trước khi release để scaling regressions lộ ra trước production. Chạy từ thư mục
+ml-source-code:
+
+    python -m tools.benchmark --scales 1e5,1e6 --output /tmp/bench.json
+    python -m tools.benchmark --scales 1e5,1e6 --baseline /tmp/bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .backfill import run_task
+from .components import PIPELINE_COMPONENTS, load_component
+from .import_time import import_report
+from .synthetic import SyntheticConfig, write_raw
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = ("data_processing", "data_eda", "train")
+BENCHMARK_DATE = "2025-01-15"
+BUCKET = "ml-fashion-data-lake"
+# Stages ngắn hơn ngưỡng này không được so wall time (noise của process startup)
+MIN_COMPARABLE_SECONDS = 1.0
+COMPARED_METRICS = ("wall_seconds", "peak_rss_mb")
+
+
+def _read_telemetry(date_prefix: str, stage: str) -> Optional[Dict[str, Any]]:
+    storage = load_component("data_processing", "storage")
+    fs, path = storage.resolve(BUCKET, f"telemetry/{date_prefix}/{stage}.json")
+    try:
+        with fs.open_input_stream(path) as f:
+            return json.loads(f.read())
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def run_scale(
+    rows: int,
+    stages: Sequence[str],
+    lake: Path,
+    seed: int = 0,
+    keep_data: bool = False,
+) -> Dict[str, Any]:
+    """
+    Sinh ``rows`` synthetic rows và chạy các stages trên một local data lake riêng.
+
+    Returns:
+        Dict stage -> {status, wall_seconds, rows_per_second, cpu_seconds, peak_rss_mb}
+    """
+    root = lake / f"rows_{rows}"
+    shutil.rmtree(root, ignore_errors=True)
+    os.environ["DATA_LAKE_ROOT"] = str(root)
+    os.environ["S3_DATA_LAKE_BUCKET"] = BUCKET
+    os.environ.setdefault("EDA_PLOTS_ENABLED", "false")
+    threads = os.cpu_count() or 1
+
+    generated = write_raw(SyntheticConfig(rows=rows, seed=seed), BUCKET, BENCHMARK_DATE)
+    results: Dict[str, Any] = {
+        "generate": {
+            "status": "success",
+            "wall_seconds": generated["seconds"],
+            "rows_per_second": generated["rows_per_second"],
+            "bytes": generated["bytes"],
+        }
+    }
+    logger.info(f"📦 {rows:,} rows: generated in {generated['seconds']:.2f}s")
+
+    for stage in (name for name in PIPELINE_COMPONENTS if name in stages):
+        task = run_task(BENCHMARK_DATE, stage, root / "logs", threads)
+        telemetry = _read_telemetry(BENCHMARK_DATE, stage) or {}
+        wall = telemetry.get("wall_seconds", task["seconds"])
+        results[stage] = {
+            "status": task["status"],
+            "wall_seconds": wall,
+            "process_seconds": task["seconds"],
+            "rows_per_second": round(rows / wall) if task["status"] == "success" and wall else None,
+            "cpu_seconds": telemetry.get("cpu_seconds"),
+            "peak_rss_mb": telemetry.get("peak_rss_mb"),
+            "log": task["log"],
+        }
+        logger.info(
+            f"⏱️ {rows:,} rows {stage}: {task['status']} in {wall:.2f}s, "
+            f"peak RSS {results[stage]['peak_rss_mb']} MB"
+        )
+        if task["status"] != "success":
+            break
+
+    if not keep_data:
+        shutil.rmtree(root / BUCKET, ignore_errors=True)
+    return results
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float
+) -> List[Dict[str, Any]]:
+    """
+    Các (scale, stage, metric) tệ hơn baseline quá ``max_regression`` (tỉ lệ).
+
+    Stages failed trong report hiện tại luôn được tính là regression.
+    """
+    regressions = []
+    for scale, stages in report["scales"].items():
+        for stage, current in stages.items():
+            if current.get("status") != "success":
+                regressions.append({"scale": scale, "stage": stage, "metric": "status"})
+                continue
+            previous = baseline.get("scales", {}).get(scale, {}).get(stage)
+            if not previous or previous.get("status") != "success":
+                continue
+            for metric in COMPARED_METRICS:
+                before, after = previous.get(metric), current.get(metric)
+                if not before or after is None:
+                    continue
+                if metric == "wall_seconds" and before < MIN_COMPARABLE_SECONDS:
+                    continue
+                change = after / before - 1.0
+                if change > max_regression:
+                    regressions.append({
+                        "scale": scale, "stage": stage, "metric": metric,
+                        "baseline": before, "current": after, "change": round(change, 4),
+                    })
+    return regressions
+
+
+def benchmark(
+    scales: Sequence[int],
+    stages: Sequence[str] = DEFAULT_STAGES,
+    lake: str = "/tmp/pipeline-benchmark",
+    seed: int = 0,
+    keep_data: bool = False,
+    check_imports: bool = True,
+) -> Dict[str, Any]:
+    """
+    Chạy benchmark trên tất cả scales (tăng dần).
+
+    Returns:
+        Dict cpus, stages, wall_seconds, scales {rows: {stage: metrics}} và imports
+        (import-time report của các stages, nếu ``check_imports``)
+    """
+    unknown = set(stages) - set(PIPELINE_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)} (expected {PIPELINE_COMPONENTS})")
+    started = time.perf_counter()
+    report: Dict[str, Any] = {
+        "cpus": os.cpu_count(),
+        "stages": [stage for stage in PIPELINE_COMPONENTS if stage in stages],
+        "scales": {},
+    }
+    if check_imports:
+        report["imports"] = import_report(report["stages"])
+    for rows in sorted(scales):
+        report["scales"][str(rows)] = run_scale(rows, stages, Path(lake), seed, keep_data)
+    report["wall_seconds"] = round(time.perf_counter() - started, 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline components on synthetic data")
+    parser.add_argument("--scales", default="1e5,1e6", help="Comma-separated số rows, e.g. 1e5,1e6")
+    parser.add_argument(
+        "--stages", default=",".join(DEFAULT_STAGES),
+        help=f"Comma-separated stages (default: {','.join(DEFAULT_STAGES)})"
+    )
+    parser.add_argument("--lake", default="/tmp/pipeline-benchmark", help="Local data lake root")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-data", action="store_true", help="Giữ data lake sau khi chạy")
+    parser.add_argument("--skip-imports", action="store_true", help="Không đo import time")
+    parser.add_argument("--baseline", help="Report JSON trước đó để so sánh")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--output", help="Ghi report JSON vào file này (default: stdout)")
+    args = parser.parse_args()
+
+    report = benchmark(
+        [int(float(s)) for s in args.scales.split(",") if s.strip()],
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        lake=args.lake,
+        seed=args.seed,
+        keep_data=args.keep_data,
+        check_imports=not args.skip_imports,
+    )
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.max_regression)
+        for regression in report["regressions"]:
+            logger.error(f"📉 Regression: {regression}")
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    if report.get("imports", {}).get("violations"):
+        logger.error(f"📉 Import-time budget exceeded: {report['imports']['violations']} violations")
+    if report.get("regressions") or report.get("imports", {}).get("violations") or any(
+        result.get("status") != "success"
+        for stages in report["scales"].values() for result in stages.values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
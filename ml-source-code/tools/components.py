@@ -0,0 +1,45 @@
+"""
+Import các components trong cùng một process.
+
+Mỗi component là một Docker build context riêng với package ``src`` của nó, nên bốn
+package cùng tên ``src`` không thể import song song theo cách thông thường. Loader này nạp
+``components/{name}/src`` dưới tên package riêng (``components_{name}``) - relative imports
+bên trong component vẫn hoạt động như khi chạy ``python -m src.main`` trong container.
+"""
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+COMPONENTS_DIR = Path(__file__).resolve().parents[1] / "components"
+PIPELINE_COMPONENTS = ("data_ingestion", "data_processing", "data_eda", "train")
+
+
+def package_name(component: str) -> str:
+    return f"components_{component}"
+
+
+def load_component(component: str, module: str = "main") -> ModuleType:
+    """
+    Import ``components/{component}/src/{module}.py``.
+
+    Args:
+        component: Tên thư mục component (e.g. "data_processing")
+        module: Module trong package ``src`` (default: main)
+
+    Returns:
+        Module đã import
+    """
+    package = package_name(component)
+    if package not in sys.modules:
+        source = COMPONENTS_DIR / component / "src"
+        if not source.is_dir():
+            raise ValueError(f"Unknown component: {component}")
+        spec = importlib.util.spec_from_file_location(
+            package, source / "__init__.py", submodule_search_locations=[str(source)]
+        )
+        package_module = importlib.util.module_from_spec(spec)
+        sys.modules[package] = package_module
+        spec.loader.exec_module(package_module)
+    return importlib.import_module(f"{package}.{module}")
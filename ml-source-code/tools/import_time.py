@@ -0,0 +1,168 @@
+"""
+Import-time report cho cold start của các components.
+
+Mỗi component được import trên một interpreter mới (``python -X importtime -c "import
+src.main"`` trong thư mục component, giống container vừa start) và output của
+``-X importtime`` được gộp theo top-level package:
+    - cumulative_ms: thời gian import package (gồm cả dependencies nó kéo theo)
+    - self_ms: tổng self time của các modules thuộc package
+
+Kết quả được so với ``DEFAULT_BUDGETS`` (ms): ``total`` là budget cho ``import src.main``,
+các key còn lại là budget per package. Budget 0 nghĩa là package phải được import lazy
+(không được load lúc start, e.g. scikit-learn trong data_eda chỉ cần khi fit
+IsolationForest). Mỗi component chạy ``--repeat`` lần và lấy lần nhanh nhất để giảm noise.
+Chạy từ thư mục ml-source-code:
+
+    python -m tools.import_time --components data_eda,train
+    python -m tools.import_time --budgets budgets.json --output /tmp/imports.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from .components import COMPONENTS_DIR
+
+COMPONENTS = ("data_ingestion", "data_processing", "data_eda", "train", "inference")
+DEFAULT_BUDGETS: Dict[str, Dict[str, float]] = {
+    "data_ingestion": {"total": 250},
+    "data_processing": {"total": 1500, "sklearn": 0, "matplotlib": 0},
+    "data_eda": {"total": 1500, "sklearn": 0, "matplotlib": 0, "seaborn": 0, "scipy": 0},
+    "train": {"total": 2000, "sklearn": 0, "matplotlib": 0, "boto3": 0},
+    "inference": {"total": 1000, "pandas": 0, "numpy": 0, "boto3": 0},
+}
+TOP_MODULES = 15
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """
+    Gộp output của ``-X importtime`` theo top-level package.
+
+    Returns:
+        Dict total_ms (cumulative của src.main) và modules {package: {self_ms, cumulative_ms}}
+    """
+    modules: Dict[str, Dict[str, float]] = {}
+    total_ms = None
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header
+        name = fields[2].strip()
+        if name == "src.main":
+            total_ms = cumulative_us / 1000.0
+        package = name.split(".")[0]
+        if package in ("src", "__main__"):
+            continue
+        entry = modules.setdefault(package, {"self_ms": 0.0, "cumulative_ms": 0.0})
+        entry["self_ms"] += self_us / 1000.0
+        if name == package:
+            # Mỗi module chỉ import một lần -> dòng của package chứa toàn bộ subtree
+            entry["cumulative_ms"] = cumulative_us / 1000.0
+    for entry in modules.values():
+        entry["self_ms"] = round(entry["self_ms"], 2)
+        entry["cumulative_ms"] = round(max(entry["cumulative_ms"], entry["self_ms"]), 2)
+    return {"total_ms": round(total_ms, 2) if total_ms is not None else None, "modules": modules}
+
+
+def measure(component: str, repeat: int = 3) -> Dict[str, Any]:
+    """Import ``src.main`` của component trên interpreter mới ``repeat`` lần, giữ lần nhanh nhất."""
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.main"],
+            cwd=COMPONENTS_DIR / component, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            return {"status": "error", "error": error[-1] if error else "import failed"}
+        parsed = parse_importtime(completed.stderr)
+        if best is None or (parsed["total_ms"] or 0) < (best["total_ms"] or 0):
+            best = parsed
+    return {"status": "success", **best}
+
+
+def check_budget(result: Dict[str, Any], budget: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Các vi phạm budget (``total`` hoặc per package) của một component."""
+    if result["status"] != "success":
+        return [{"module": "src.main", "error": result["error"]}]
+    violations = []
+    for module, limit in budget.items():
+        if module == "total":
+            actual = result["total_ms"]
+        elif module in result["modules"]:
+            actual = result["modules"][module]["cumulative_ms"]
+        else:
+            continue
+        if actual is not None and (actual > limit or limit == 0):
+            violations.append({"module": module, "ms": actual, "budget_ms": limit})
+    return violations
+
+
+def import_report(
+    components: Sequence[str] = COMPONENTS,
+    budgets: Optional[Dict[str, Dict[str, float]]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """
+    Đo import time của các components và so với budgets.
+
+    Args:
+        components: Các components cần đo
+        budgets: Override DEFAULT_BUDGETS theo component (merge theo key)
+        repeat: Số lần đo mỗi component
+
+    Returns:
+        Dict components {name: {status, total_ms, modules (top TOP_MODULES), budget,
+        violations}} và violations (tổng số)
+    """
+    report: Dict[str, Any] = {"components": {}, "violations": 0}
+    for component in components:
+        budget = {**DEFAULT_BUDGETS.get(component, {}), **(budgets or {}).get(component, {})}
+        result = measure(component, repeat)
+        if result["status"] == "success":
+            result["modules"] = dict(sorted(
+                result["modules"].items(), key=lambda item: item[1]["cumulative_ms"], reverse=True
+            )[:TOP_MODULES])
+        violations = check_budget(result, budget)
+        report["components"][component] = {**result, "budget": budget, "violations": violations}
+        report["violations"] += len(violations)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report component import times against a budget")
+    parser.add_argument(
+        "--components", default=",".join(COMPONENTS),
+        help=f"Comma-separated components (default: {','.join(COMPONENTS)})"
+    )
+    parser.add_argument("--budgets", help="JSON {component: {total|package: ms}} override budgets")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Ghi report JSON vào file này (default: stdout)")
+    args = parser.parse_args()
+
+    budgets = None
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+    report = import_report(
+        [c.strip() for c in args.components.split(",") if c.strip()],
+        budgets=budgets,
+        repeat=args.repeat,
+    )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    if report["violations"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+In-process end-to-end pipeline runner (ingestion → processing → EDA → training).
+
+Thay vì bốn Argo pods với một lần ghi/đọc Parquet trên S3 giữa mỗi step, runner gọi
+``run()`` của từng component trong cùng một process và chuyển Arrow table trực tiếp:
+processed table từ data_processing được EDA và train đọc qua in-memory dataset
+(zero-copy, xem ``table_dataset`` trong storage của component). Processed dataset chỉ
+được ghi xuống data lake khi có ``--persist-intermediates``; reports, telemetry và model
+artifacts vẫn được ghi như khi chạy trong workflow.
+
+Dùng cho local development, backfills và tenants nhỏ. Chạy từ thư mục ml-source-code:
+
+    DATA_LAKE_ROOT=/tmp/lake python -m tools.pipeline --date 2025-01-15
+    python -m tools.pipeline --date 2025-01-15 --stages data_processing,train \
+        --persist-intermediates --output /tmp/pipeline.json
+
+Stages bị bỏ qua thì stage sau đọc input từ data lake như bình thường (e.g. chỉ chạy train
+sẽ đọc processed/{date}/ đã có).
+
+data_ingestion hiện chỉ mô phỏng sources (không trả về hay ghi raw data) nên không nằm
+trong stages mặc định. Raw data của data_processing lấy từ ``raw_table``, hoặc
+``--synthetic-rows`` (sinh bằng tools.synthetic trong memory, thay cho output của
+ingestion), hoặc raw/{date}/ đã có trên data lake:
+
+    DATA_LAKE_ROOT=/tmp/lake python -m tools.pipeline --date 2025-01-15 --synthetic-rows 1e6
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import pyarrow as pa
+
+from .components import PIPELINE_COMPONENTS, load_component
+from .synthetic import SyntheticConfig, generate_table
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = ("data_processing", "data_eda", "train")
+
+
+def _stage_summary(result: Dict[str, Any], seconds: float) -> Dict[str, Any]:
+    return {
+        "wall_seconds": round(seconds, 4),
+        "telemetry": result.get("telemetry"),
+    }
+
+
+def run_pipeline(
+    date_prefix: str,
+    stages: Sequence[str] = DEFAULT_STAGES,
+    raw_table: Optional[pa.Table] = None,
+    persist_intermediates: bool = False,
+    synthetic_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Chạy các stages của pipeline cho một ngày trong process hiện tại.
+
+    Args:
+        date_prefix: Date prefix (YYYY-MM-DD)
+        stages: Các components cần chạy (thứ tự theo PIPELINE_COMPONENTS)
+        raw_table: Raw Arrow table cho data_processing (None: đọc raw/{date}/ từ data lake)
+        persist_intermediates: Ghi processed dataset xuống data lake
+        synthetic_rows: Khi không có raw_table, sinh N rows synthetic raw data (seed theo
+            ngày) làm input của data_processing
+
+    Returns:
+        Dict date_prefix, wall_seconds, stages (wall_seconds + telemetry mỗi stage) và
+        results (output đầy đủ của từng component)
+    """
+    unknown = set(stages) - set(PIPELINE_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)} (expected {PIPELINE_COMPONENTS})")
+
+    if "data_processing" in stages and raw_table is None:
+        if synthetic_rows:
+            seed = int(date_prefix.replace("-", ""))
+            raw_table = generate_table(SyntheticConfig(rows=synthetic_rows, seed=seed), date_prefix)
+            logger.info(f"📦 Generated {raw_table.num_rows:,} synthetic raw rows in memory")
+        else:
+            bucket = os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
+            storage = load_component("data_processing", "storage")
+            if not storage.list_files(bucket, f"raw/{date_prefix}", suffix=".parquet"):
+                raise FileNotFoundError(
+                    f"No raw data under s3://{bucket}/raw/{date_prefix}/ - pass --synthetic-rows "
+                    f"or generate it first (python -m tools.synthetic)"
+                )
+
+    started = time.perf_counter()
+    summary: Dict[str, Any] = {}
+    results: Dict[str, Any] = {}
+    processed_table: Optional[pa.Table] = None
+    for stage in (name for name in PIPELINE_COMPONENTS if name in stages):
+        component = load_component(stage)
+        stage_started = time.perf_counter()
+        if stage == "data_ingestion":
+            result = component.run(date_prefix)
+        elif stage == "data_processing":
+            result = component.run(date_prefix, raw_table=raw_table, persist=persist_intermediates)
+            raw_table = None
+            processed_table = result["processed_data"]["table"]
+        else:
+            result = component.run(date_prefix, processed_table=processed_table)
+        summary[stage] = _stage_summary(result, time.perf_counter() - stage_started)
+        results[stage] = result
+        logger.info(f"🏁 {stage} finished in {summary[stage]['wall_seconds']:.2f}s")
+
+    return {
+        "date_prefix": date_prefix,
+        "wall_seconds": round(time.perf_counter() - started, 4),
+        "persist_intermediates": persist_intermediates,
+        "stages": summary,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ML pipeline in a single process")
+    parser.add_argument(
+        "--date", default=datetime.utcnow().strftime("%Y-%m-%d"), help="Date prefix YYYY-MM-DD"
+    )
+    parser.add_argument(
+        "--stages", default=",".join(DEFAULT_STAGES),
+        help=f"Comma-separated stages (default: {','.join(DEFAULT_STAGES)})"
+    )
+    parser.add_argument(
+        "--persist-intermediates", action="store_true",
+        help="Ghi processed dataset xuống data lake"
+    )
+    parser.add_argument(
+        "--synthetic-rows", help="Sinh synthetic raw data trong memory (số rows, e.g. 1e6)"
+    )
+    parser.add_argument("--output", help="Ghi summary JSON vào file này (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_pipeline(
+        args.date,
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        persist_intermediates=args.persist_intermediates,
+        synthetic_rows=int(float(args.synthetic_rows)) if args.synthetic_rows else None,
+    )
+    payload = json.dumps({k: v for k, v in report.items() if k != "results"}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
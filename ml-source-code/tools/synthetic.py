@@ -0,0 +1,232 @@
+"""
+Seeded synthetic fashion interaction generator (raw layout của data_processing).
+
+Sinh đúng các columns ``load_raw_data()`` đọc - user_id, item_id, rating, timestamp,
+category, price - với phân phối gần dữ liệu thật:
+    - item popularity Zipfian (exponent ``item_exponent``), user activity Zipfian
+      (``user_exponent``); ranks được hoán vị ngẫu nhiên nên id không tương quan với
+      popularity
+    - mỗi item có category cố định (fashion categories có trọng số) và giá lognormal theo
+      category
+    - rating 1-5, timestamp đều trong ``days`` ngày kể từ date_prefix
+    - một tỉ lệ nhỏ nulls (rating/price) và duplicate rows để exercise data cleaning
+
+Data được sinh theo chunks ``chunk_rows`` rows, mỗi chunk có RNG riêng
+(``default_rng([seed, chunk])``) nên cùng config luôn cho cùng data và memory không phụ
+thuộc tổng số rows (10^5 tới 10^8). Chạy từ thư mục ml-source-code:
+
+    DATA_LAKE_ROOT=/tmp/lake python -m tools.synthetic --rows 1e7 --date 2025-01-15
+"""
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .components import load_component
+
+# Cùng thứ tự với CATEGORY_VOCABULARY của data_processing
+CATEGORIES = (
+    "tops", "bottoms", "dresses", "outerwear", "shoes",
+    "bags", "accessories", "sportswear", "underwear", "swimwear",
+)
+CATEGORY_WEIGHTS = (0.22, 0.16, 0.12, 0.07, 0.12, 0.06, 0.11, 0.07, 0.04, 0.03)
+# Giá trung vị (lognormal) theo category
+CATEGORY_PRICES = (19.0, 29.0, 39.0, 79.0, 59.0, 45.0, 12.0, 35.0, 9.0, 25.0)
+RATING_PROBABILITIES = (0.05, 0.08, 0.17, 0.35, 0.35)
+MAX_ITEMS = 2_000_000
+MICROS_PER_DAY = 86_400_000_000
+
+RAW_SCHEMA = pa.schema([
+    ("user_id", pa.int64()),
+    ("item_id", pa.int64()),
+    ("rating", pa.float64()),
+    ("timestamp", pa.timestamp("us")),
+    ("category", pa.string()),
+    ("price", pa.float64()),
+])
+
+
+@dataclass
+class SyntheticConfig:
+    """Cấu hình generator; users/items mặc định tăng theo số rows."""
+
+    rows: int
+    users: Optional[int] = None
+    items: Optional[int] = None
+    item_exponent: float = 0.9
+    user_exponent: float = 0.7
+    days: int = 1
+    null_rate: float = 0.0005
+    duplicate_rate: float = 0.001
+    chunk_rows: int = 1_000_000
+    seed: int = 0
+
+    @property
+    def n_users(self) -> int:
+        return self.users or max(1_000, self.rows // 20)
+
+    @property
+    def n_items(self) -> int:
+        return self.items or min(MAX_ITEMS, max(100, self.rows // 200))
+
+
+class ZipfSampler:
+    """Draw ids với P(rank k) ∝ k^-exponent trên ``n`` ids (inverse CDF)."""
+
+    def __init__(self, n: int, exponent: float, rng: np.random.Generator):
+        weights = np.arange(1, n + 1, dtype=np.float64) ** -exponent
+        self.cdf = np.cumsum(weights)
+        self.cdf /= self.cdf[-1]
+        self.ids = rng.permutation(n).astype(np.int64)
+
+    def draw(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        ranks = np.minimum(np.searchsorted(self.cdf, rng.random(size)), self.cdf.size - 1)
+        return self.ids[ranks]
+
+
+class SyntheticGenerator:
+    """
+    Generator theo chunks cho một ngày bắt đầu.
+
+    Args:
+        config: SyntheticConfig
+        start: Thời điểm bắt đầu của timestamps
+    """
+
+    def __init__(self, config: SyntheticConfig, start: datetime):
+        self.config = config
+        self.start = int(pa.scalar(start, type=pa.timestamp("us")).value)
+        rng = np.random.default_rng([config.seed, 0xCA7A])
+        self.users = ZipfSampler(config.n_users, config.user_exponent, rng)
+        self.items = ZipfSampler(config.n_items, config.item_exponent, rng)
+        self.item_category = rng.choice(
+            len(CATEGORIES), size=config.n_items, p=np.asarray(CATEGORY_WEIGHTS)
+        ).astype(np.int32)
+        median = np.asarray(CATEGORY_PRICES)[self.item_category]
+        self.item_price = np.round(median * rng.lognormal(0.0, 0.5, config.n_items), 2)
+
+    def chunk(self, index: int, rows: int) -> pa.RecordBatch:
+        """Chunk thứ ``index`` (deterministic theo seed và index)."""
+        config = self.config
+        rng = np.random.default_rng([config.seed, index])
+        items = self.items.draw(rows, rng)
+        columns: Dict[str, Any] = {
+            "user_id": self.users.draw(rows, rng),
+            "item_id": items,
+            "rating": rng.choice(5, size=rows, p=np.asarray(RATING_PROBABILITIES)) + 1.0,
+            "timestamp": self.start + rng.integers(0, config.days * MICROS_PER_DAY, size=rows),
+            "category": self.item_category[items],
+            "price": self.item_price[items],
+        }
+
+        duplicates = rng.random(rows) < config.duplicate_rate
+        if duplicates.any():
+            source = rng.integers(0, rows, size=int(duplicates.sum()))
+            for name in columns:
+                columns[name][duplicates] = columns[name][source]
+
+        def with_nulls(values: np.ndarray, arrow_type: pa.DataType) -> pa.Array:
+            mask = rng.random(rows) < config.null_rate
+            return pa.array(values, type=arrow_type, mask=mask if mask.any() else None)
+
+        return pa.RecordBatch.from_arrays([
+            pa.array(columns["user_id"]),
+            pa.array(columns["item_id"]),
+            with_nulls(columns["rating"], pa.float64()),
+            pa.array(columns["timestamp"]).cast(pa.timestamp("us")),
+            pa.DictionaryArray.from_arrays(
+                pa.array(columns["category"]), pa.array(CATEGORIES)
+            ).cast(pa.string()),
+            with_nulls(columns["price"], pa.float64()),
+        ], schema=RAW_SCHEMA)
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        remaining, index = self.config.rows, 0
+        while remaining > 0:
+            rows = min(self.config.chunk_rows, remaining)
+            yield self.chunk(index, rows)
+            remaining -= rows
+            index += 1
+
+
+def generate_table(config: SyntheticConfig, date_prefix: str) -> pa.Table:
+    """Toàn bộ data trong memory (cho in-process runner ở scale nhỏ)."""
+    generator = SyntheticGenerator(config, datetime.strptime(date_prefix, "%Y-%m-%d"))
+    return pa.Table.from_batches(list(generator.batches()), schema=RAW_SCHEMA)
+
+
+def write_raw(
+    config: SyntheticConfig,
+    bucket: str,
+    date_prefix: str,
+    file_rows: int = 10_000_000,
+) -> Dict[str, Any]:
+    """
+    Ghi data vào raw/{date}/synthetic_{i}.parquet (streaming, mỗi file ``file_rows`` rows).
+
+    Returns:
+        Dict rows, files, bytes, seconds, rows_per_second
+    """
+    storage = load_component("data_processing", "storage")
+    generator = SyntheticGenerator(config, datetime.strptime(date_prefix, "%Y-%m-%d"))
+    started = time.perf_counter()
+    files, written, total_bytes = [], 0, 0
+    writer: Optional[pq.ParquetWriter] = None
+    fs = None
+    try:
+        for batch in generator.batches():
+            if writer is None or written >= file_rows * len(files):
+                if writer is not None:
+                    writer.close()
+                key = f"raw/{date_prefix}/synthetic_{len(files):05d}.parquet"
+                fs, path = storage.resolve(bucket, key)
+                fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+                writer = pq.ParquetWriter(path, RAW_SCHEMA, filesystem=fs, compression="zstd")
+                files.append(path)
+            writer.write_batch(batch)
+            written += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    for path in files:
+        total_bytes += fs.get_file_info(path).size
+    seconds = time.perf_counter() - started
+    return {
+        "rows": written,
+        "files": len(files),
+        "bytes": total_bytes,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(written / seconds) if seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic fashion interactions")
+    parser.add_argument("--rows", required=True, help="Số rows, e.g. 1e6")
+    parser.add_argument("--date", default=datetime.utcnow().strftime("%Y-%m-%d"))
+    parser.add_argument(
+        "--bucket", default=os.getenv("S3_DATA_LAKE_BUCKET", "ml-fashion-data-lake")
+    )
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--items", type=int)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        rows=int(float(args.rows)), users=args.users, items=args.items,
+        days=args.days, seed=args.seed,
+    )
+    result = write_raw(config, args.bucket, args.date)
+    print(json.dumps({"config": asdict(config), **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()